@@ -1,16 +1,31 @@
+from typing import Iterator
 import numpy as np
 from grille import Grille
 from bataille import Bataille
-from random import randint
+from placements import ProbaSimpleIncrementale, dtype_grilles_proba
+from jeux_lot import jouer_aleatoire_lot, jouer_heuristique_lot, jouer_proba_simple_lot
+from reserve_cases import ReserveCases
+from monte_carlo import EchantillonsFlotte
+from alea import Alea, vers_alea
 from constants import *
-from typing import Dict
 
 
 class Joueur:
-    def __init__(self, nom: str):
+    def __init__(self, nom: str, cls_grille: type[Grille] = Grille, cls_bataille: type[Bataille] = Bataille,
+                 rng: Alea | np.random.Generator | int | None = None):
         self.nom = nom
         self.score = 0
 
+        # Générateur aléatoire du joueur, partagé par ses grilles et ses tirs (voir 'alea.vers_alea')
+        self.alea = vers_alea(rng)
+
+        # Moteur de la grille utilisé pour les jeux (Grille/Bataille ou GrilleBits/BatailleBits)
+        self.cls_grille = cls_grille
+        self.cls_bataille = cls_bataille
+
+        # Espace de travail des grilles-probas de 'jouer_proba_simple', réutilisé d'un jeu à l'autre
+        self._grilles_proba: np.ndarray | None = None
+
     def jouer(self, taille_grille: int) -> int:
         """Joue un jeu de bataille navale jusqu'à la victore, i.e. jusqu'à couler tous les bateaux.
             La grille est générée aléatoirement. Elle contient 5 bateaux (un de chaque type).
@@ -24,96 +39,74 @@ class Joueur:
         """
 
         # on génère une grille de jeu
-        grille = Grille.genere_grille(taille_grille)
-        bataille = Bataille(grille)
+        grille = self.cls_grille.genere_grille(taille_grille, self.alea)
+        bataille = self.cls_bataille(grille)
         nb_coups = 0
 
+        # cases non encore tirées
+        reserve = ReserveCases(taille_grille, self.alea)
+
         while not bataille.victoire():
-            ligne, col = randint(0, taille_grille - 1), randint(0, taille_grille - 1)
-            # Si la case n'était pas encore tirée
-            if grille.grille[ligne][col] not in {BAT_TOUCHE, RATE}:
-                bataille.joue((ligne, col))
-                nb_coups += 1
+            bataille.joue(reserve.tirer())
+            nb_coups += 1
 
         self.score += 1
         return nb_coups
 
-    def _cases_connexes(self, bataille: Bataille, position: tuple[int, int], nb_coupe: int = 0) -> tuple[np.ndarray, int]:
+    def jouer_lot(self, taille_grille: int, nb_jeux: int, rng: np.random.Generator | None = None) -> np.ndarray:
+        """Joue nb_jeux jeux avec la stratégie de 'jouer' (aucune) en une seule passe vectorisée.
+            Voir 'jeux_lot.jouer_aleatoire_lot'. Augmente le score du joueur de nb_jeux points.
+
+        Args:
+            taille_grille : taille de la grille du jeu
+            nb_jeux : nombre de jeux
+            rng : générateur aléatoire de numpy. Default = None (générateur du joueur).
+
+        Returns:
+            Tableau des nombres de coups qu'il fallait faire pour couler tous les bateaux, un par jeu.
+        """
+
+        nb_coups = jouer_aleatoire_lot(taille_grille, nb_jeux, rng if rng is not None else self.alea.generateur)
+        self.score += nb_jeux
+        return nb_coups
+
+    def _cases_connexes(self, bataille: Bataille, position: tuple[int, int], reserve: ReserveCases) -> tuple[np.ndarray, int]:
         """Joue les cases connexes de la case position non jouées si possible,
             au maximum peut jouer 4 coups sur les 4 cases connexes. Fonction auxiliaire de jouer_heuristique().
-            Si une case connexe est une case bateau, alors récursion de la fonction sur la case connexe.
+            Si une case connexe est une case bateau, alors on continue sur la case connexe (les autres cases connexes
+            de la case courante ne sont pas jouées). Les cases à traiter sont gardées dans une file explicite,
+            sans récursion.
 
         Args:
             bataille: la grille de jeu
             position: (ligne, col) représentant la position de la case jouée
-            nb_coup: nombre de coup pour la récursion, à 0 par défaut
+            reserve: les cases non encore tirées, les cases jouées en sont retirées
 
         Returns:
             La grille modifiée et le nombre de coups jouées
         """
 
-        ligne, col = position
-        grille_jeu = bataille.plat.grille
-        n = bataille.plat.n
-        nb_coup = nb_coupe
+        cibles = [position]
+        nb_coup = 0
 
-        # case connexe droite
-        if col < n-1:
-            if grille_jeu[ligne][col+1] not in {BAT_TOUCHE, RATE}:
-                # si case vide
-                if grille_jeu[ligne][col+1] == 0:
-                    bataille.joue((ligne, col+1))
-                    nb_coup += 1
+        while cibles:
+            ligne, col = cibles.pop()
 
-                # sinon case bateau
-                else:
-                    bataille.joue((ligne, col+1))
-                    nb_coup += 1
-                    return self._cases_connexes(bataille, (ligne, col+1), nb_coup)
-
-        # case connexe gauche
-        if 0 < col:
-            if grille_jeu[ligne][col-1] not in {BAT_TOUCHE, RATE}:
-                # si case vide
-                if grille_jeu[ligne][col-1] == 0:  # si vide
-                    bataille.joue((ligne, col-1))
-                    nb_coup += 1
-
-                # sinon case bateau
-                else:
-                    bataille.joue((ligne, col-1))
-                    nb_coup += 1
-                    return self._cases_connexes(bataille, (ligne, col-1), nb_coup)
-
-        # case connexe haut
-        if 0 < ligne:
-            if grille_jeu[ligne - 1][col] not in {BAT_TOUCHE, RATE}:
-                # si case vide
-                if grille_jeu[ligne-1][col] == 0:
-                    bataille.joue((ligne-1, col))
-                    nb_coup += 1
-
-                # sinon case bateau
-                else:
-                    bataille.joue((ligne-1, col))
-                    nb_coup += 1
-                    return self._cases_connexes(bataille, (ligne-1, col), nb_coup)
-
-        # case connexe bas
-        if ligne < n-1:
-            if grille_jeu[ligne + 1][col] not in {BAT_TOUCHE, RATE}:
-                # si case vide
-                if grille_jeu[ligne+1][col] == 0:  # si vide
-                    bataille.joue((ligne+1, col))
-                    nb_coup += 1
-
-                # sinon case bateau
-                else:
-                    bataille.joue((ligne+1, col))
-                    nb_coup += 1
-                    return self._cases_connexes(bataille, (ligne+1, col), nb_coup)
+            # cases connexes : droite, gauche, haut, bas
+            for case in ((ligne, col+1), (ligne, col-1), (ligne-1, col), (ligne+1, col)):
+                # hors de la grille ou déjà jouée
+                if case not in reserve:
+                    continue
+
+                reserve.retirer(case)
+                nb_coup += 1
+
+                # si case bateau, on continue sur cette case
+                if bataille.joue(case) == BAT_TOUCHE:
+                    cibles.append(case)
+                    break
 
-        return (grille_jeu, nb_coup)
+        return (bataille.plat.grille, nb_coup)
 
     def jouer_heuristique(self, taille_grille: int) -> int:
         """Joue un jeu de bataille navale jusqu'à la victore, i.e. jusqu'à couler tous les bateaux.
@@ -134,73 +127,80 @@ class Joueur:
             return 0
 
         # on génère une grille de jeu
-        grille = Grille.genere_grille(taille_grille)
-        bataille = Bataille(grille)
+        grille = self.cls_grille.genere_grille(taille_grille, self.alea)
+        bataille = self.cls_bataille(grille)
         nb_coups = 0
 
+        # cases non encore tirées
+        reserve = ReserveCases(taille_grille, self.alea)
+
         while not bataille.victoire():
-            # choix aléatoire
-            ligne, col = randint(0, taille_grille - 1), randint(0, taille_grille - 1)
-
-            # Si la case n'était pas encore tirée
-            if grille.grille[ligne][col] not in {BAT_TOUCHE, RATE}:
-                # cas vide
-                if grille.grille[ligne][col] == VIDE:
-                    bataille.joue((ligne, col))
-                    nb_coups += 1
-                # cas bateau
-                else:
-                    bataille.joue((ligne, col))
-                    # on joue les cases connexes
-                    grille.grille, coup_addi = self._cases_connexes(bataille, (ligne, col))
-                    nb_coups += coup_addi + 1
+            # choix aléatoire parmi les cases non encore tirées
+            ligne, col = reserve.tirer()
+
+            # cas vide (la case n'a pas encore été tirée : RATE ssi elle était vide)
+            if bataille.joue((ligne, col)) == RATE:
+                nb_coups += 1
+            # cas bateau
+            else:
+                # on joue les cases connexes
+                _, coup_addi = self._cases_connexes(bataille, (ligne, col), reserve)
+                nb_coups += coup_addi + 1
+        return nb_coups
+
+    def jouer_heuristique_lot(self, taille_grille: int, nb_jeux: int,
+                              rng: np.random.Generator | None = None) -> np.ndarray:
+        """Joue nb_jeux jeux avec la stratégie de 'jouer_heuristique', tous les jeux avancent d'un tir à chaque pas.
+            Voir 'jeux_lot.jouer_heuristique_lot'. Augmente le score du joueur de nb_jeux points.
+
+        Args:
+            taille_grille : taille de la grille du jeu
+            nb_jeux : nombre de jeux
+            rng : générateur aléatoire de numpy. Default = None (générateur du joueur).
+
+        Returns:
+            Tableau des nombres de coups qu'il fallait faire pour couler tous les bateaux, un par jeu.
+        """
+
+        nb_coups = jouer_heuristique_lot(taille_grille, nb_jeux, rng if rng is not None else self.alea.generateur)
+        self.score += nb_jeux
         return nb_coups
 
-    def _init_bateaux_grilles(self, bateaux: list[int], taille_grille: int) -> Dict[int, np.ndarray]:
-        """Initialise pour chaque bateau dans une liste 'bateaux' un tableau (2D).
-            Chaque case de la grille (nommée grille-probabilité) contiendra le nombre de configurations
-            qui passent par cette case. Fonction auxilière pour 'jouer_proba_simple'.
+    def _init_bateaux_grilles(self, taille_grille: int) -> np.ndarray:
+        """Renvoie l'espace de travail (len(BATEAUX), n, n) rempli de 0 : une grille-probabilité par bateau,
+            dans l'ordre de BATEAUX. Chaque case d'une grille (nommée grille-probabilité) contiendra le nombre
+            de configurations qui passent par cette case. L'espace est alloué une seule fois par taille de grille
+            et réutilisé par les jeux suivants. Fonction auxilière pour 'jouer_proba_simple'.
 
         Args:
-            bateaux : liste des constantes associées aux bateaux.
             taille_grille : taille de la grille du jeu.
 
         Returns:
-            Un tableau (2D) de numpy repmpli de 0.
+            Un tableau (3D) de numpy rempli de 0, dont le type contient la valeur maximale d'une grille-probabilité.
         """
 
-        bateaux_grilles = dict()
-        for bateau in bateaux:
-            bateaux_grilles[bateau] = np.zeros((taille_grille, taille_grille), dtype=np.int8)
-        return bateaux_grilles
+        if self._grilles_proba is None or self._grilles_proba.shape[1] != taille_grille:
+            self._grilles_proba = np.zeros((len(BATEAUX), taille_grille, taille_grille),
+                                           dtype=dtype_grilles_proba(BATEAUX, taille_grille))
+        self._grilles_proba.fill(0)
+        return self._grilles_proba
 
-    def _choisir_max(self, bateaux_grilles: Dict[int, np.ndarray],
-                     bateaux_pos_max: Dict[int, tuple[int, int]]) -> tuple[int, int]:
+    def _choisir_max(self, bateaux_grilles: np.ndarray) -> tuple[int, int]:
         """Choisit la position qui correpond au nombre maximal parmi toutes les grilles associées aux bateaux.
+            En cas d'égalité, on garde le premier bateau (dans l'ordre de BATEAUX) puis la première case.
             Fonction auxilière pour 'jouer_proba_simple'.
 
         Args:
-            bateaux_grilles : dictionnaire associant une constante du bateau sa grille-probabilité.
-            bateaux_pos_max : dictionnaire associant une constante du bateau la position (ligne, col) telle que 
-                pour la grille associée au bateau on a grille[ligne][col] contient au nombre maximal parmi toutes les autres cases.
+            bateaux_grilles : espace de travail (len(BATEAUX), n, n) des grilles-probabilités.
 
         Returns:
             Une position qui correspond au nombre maximale parmi toutes les grilles associées aux bateaux.
         """
 
-        mx = 0
-        pos_max = (0, 0)
-
-        for bateau, (ligne, col) in bateaux_pos_max.items():
-            grille = bateaux_grilles[bateau]
-            valeur = grille[ligne][col]
-            if valeur > mx:
-                mx = valeur
-                pos_max = (ligne, col)
-
-        return pos_max
+        n = bateaux_grilles.shape[1]
+        return divmod(int(np.argmax(bateaux_grilles)) % (n * n), n)
 
-    def jouer_proba_simple(self, taille_grille: int) -> int:
+    def jouer_proba_simple(self, taille_grille: int, incremental: bool = False) -> int:
         """Joue un jeu de bataille navale jusqu'à la victore, i.e. jusqu'à couler tous les bateaux.
             La grille est générée aléatoirement. Elle contient 5 bateaux (un de chaque type).
             Stratégie: On considère que les positions des bateaux sont indépendantes.
@@ -210,6 +210,8 @@ class Joueur:
 
         Args:
             taille_grille : taille de la grille du jeu. Doit être supérieure ou égale à 5.
+            incremental : si True, les grilles-probas ne sont pas recalculées à chaque tour, seuls les placements
+                qui passent par la case jouée sont mis à jour (voir 'ProbaSimpleIncrementale'). Default = False.
 
         Returns:
             Le nombre de coups qu'il fallait faire pour couler tous les bateaux.
@@ -220,58 +222,122 @@ class Joueur:
             return 0
 
         nb_coups = 0
+        for nb_coups in self._tours_proba_simple(taille_grille, incremental):
+            pass
+
+        self.score += 1
+        return nb_coups
+
+    def _tours_proba_simple(self, taille_grille: int, incremental: bool) -> Iterator[int]:
+        """Joue un jeu de la stratégie proba simple tour par tour. Fonction auxiliaire de 'jouer_proba_simple'.
+            Générateur : rend le nombre de coups joués après chaque tour, jusqu'à la victoire.
+
+        Args:
+            taille_grille : taille de la grille du jeu.
+            incremental : voir 'jouer_proba_simple'.
+        """
+
         # Grille avec 5 bateaux
-        grille_remplie = Grille.genere_grille(taille_grille)
-        bataille = Bataille(grille_remplie)
+        grille_remplie = self.cls_grille.genere_grille(taille_grille, self.alea)
+        bataille = self.cls_bataille(grille_remplie)
 
         # Grille vide
-        grille_vide = Grille(taille_grille)
+        grille_vide = self.cls_grille(taille_grille)
 
         # Bateau non encore coulés
-        bateaux_restants = {bat for bat in BATEAUX}
-
-        # Initialisation des grilles-probas pour chaque bateaux
-        bateaux_grilles = self._init_bateaux_grilles(bateaux_restants, taille_grille)
-        bateaux_pos_max = dict()
-
-        # Remplie les grilles-probas, choisir les cases avec la proba max
-        for bateau in bateaux_restants:
-            grille_ps = bateaux_grilles[bateau]
-            pos_max = grille_vide.calc_nb_placements(bateau, grille_ps)
-            bateaux_pos_max[bateau] = pos_max
+        bateaux_restants = [bat for bat in BATEAUX]
+
+        # Initialisation des grilles-probas pour chaque bateaux (une grille par bateau dans l'espace de travail)
+        bateaux_grilles = self._init_bateaux_grilles(taille_grille)
+        if incremental:
+            proba = ProbaSimpleIncrementale(taille_grille, bateaux_restants, bateaux_grilles)
+        else:
+            # Remplie les grilles-probas
+            for bateau in bateaux_restants:
+                grille_vide.calc_nb_placements(bateau, bateaux_grilles[BATEAUX.index(bateau)])
 
+        nb_coups = 0
         while (not bataille.victoire()):
             nb_coups += 1
 
             # Choisir la case avec la proba la plus élevée parmi toutes les grilles-probas
-            (ligne, col) = self._choisir_max(bateaux_grilles, bateaux_pos_max)
-            # Type_case = BAT_TOUCHE ou RATE
-            type_case = bataille.joue((ligne, col))
-            grille_vide.grille[ligne][col] = type_case
-
-            # Vérifier si le bateau a été coulé
-            bateau_coule_flag, type_bat = bataille.bateaux_coules(bateaux_restants)
-
-            # Eliminer le bateau s'il a été coulé, éliminer sa grille-proba
-            if bateau_coule_flag:
+            (ligne, col) = self._choisir_max(bateaux_grilles)
+            # Type_case = BAT_TOUCHE ou RATE, type_bat = bateau coulé par ce tir (-1 si aucun)
+            type_case, type_bat = bataille.joue_coule((ligne, col))
+            grille_vide.marque_case((ligne, col), type_case)
+            if incremental:
+                proba.tir((ligne, col), type_case)
+
+            # Eliminer le bateau s'il a été coulé, masquer sa grille-proba
+            if type_bat != -1:
                 ligne, col, dir = grille_remplie.bateaux_places[type_bat]
                 # Placer le bateau coulé sur la grille_vide
                 grille_vide.place(type_bat, (ligne, col), dir)
                 # Éliminter le bateau
                 bateaux_restants.remove(type_bat)
-                # Éliminer la grille
-                del bateaux_grilles[type_bat]
-                # Éliminer la case max associée à la grille
-                del bateaux_pos_max[type_bat]
+                # Masquer la grille (mise à 0)
+                if incremental:
+                    proba.coule(type_bat, (ligne, col, dir))
+                else:
+                    bateaux_grilles[BATEAUX.index(type_bat)].fill(0)
 
-            # MAJ des grilles-probas restantes
-            for bateau in bateaux_restants:
-                grille_ps = bateaux_grilles[bateau]
-                # Annuler toutes les cases pour le recalcul des configurations
-                grille_ps.fill(0)
-                # MAJ des max
-                pos_max = grille_vide.calc_nb_placements(bateau, grille_ps)
-                bateaux_pos_max[bateau] = pos_max
+            if not incremental:
+                # MAJ des grilles-probas restantes (entièrement réécrites)
+                for bateau in bateaux_restants:
+                    grille_vide.calc_nb_placements(bateau, bateaux_grilles[BATEAUX.index(bateau)])
+            yield nb_coups
+
+    def jouer_proba_simple_lot(self, taille_grille: int, nb_jeux: int,
+                               rng: np.random.Generator | None = None) -> np.ndarray:
+        """Joue nb_jeux jeux avec la stratégie de 'jouer_proba_simple', tous les jeux avancent d'un tir à chaque pas.
+            Voir 'jeux_lot.jouer_proba_simple_lot'. Augmente le score du joueur de nb_jeux points.
+
+        Args:
+            taille_grille : taille de la grille du jeu
+            nb_jeux : nombre de jeux
+            rng : générateur aléatoire de numpy. Default = None (générateur du joueur).
+
+        Returns:
+            Tableau des nombres de coups qu'il fallait faire pour couler tous les bateaux, un par jeu.
+        """
+
+        nb_coups = jouer_proba_simple_lot(taille_grille, nb_jeux, rng if rng is not None else self.alea.generateur)
+        self.score += nb_jeux
+        return nb_coups
+
+    def jouer_monte_carlo(self, taille_grille: int, nb_echantillons: int = 1000,
+                          rng: np.random.Generator | None = None) -> int:
+        """Joue un jeu de bataille navale jusqu'à la victore, i.e. jusqu'à couler tous les bateaux.
+            La grille est générée aléatoirement. Elle contient 5 bateaux (un de chaque type).
+            Stratégie: On estime la probabilité de chaque case de contenir un bateau à partir de flottes complètes
+            (sans superposition) tirées au hasard et compatibles avec les cases touchées, ratées et les bateaux coulés
+            (voir 'EchantillonsFlotte'). À chaque tour on choisit la case de probabilité maximale.
+            Augmente le score du joueur de 1 point.
+
+        Args:
+            taille_grille : taille de la grille du jeu. Doit être supérieure ou égale à 5.
+            nb_echantillons : nombre de flottes utilisées à chaque tour. Default = 1000.
+            rng : générateur aléatoire de numpy. Default = None (générateur du joueur).
+
+        Returns:
+            Le nombre de coups qu'il fallait faire pour couler tous les bateaux.
+        """
+
+        if taille_grille < 5:
+            print("'jouer_monte_carlo' : taille_grille < 5")
+            return 0
+
+        grille = self.cls_grille.genere_grille(taille_grille, self.alea)
+        bataille = self.cls_bataille(grille)
+        echantillons = EchantillonsFlotte(taille_grille, BATEAUX, nb_echantillons,
+                                         rng if rng is not None else self.alea.generateur)
+        nb_coups = 0
+
+        while not bataille.victoire():
+            position = echantillons.choisir()
+            type_case, type_bat = bataille.joue_coule(position)
+            echantillons.observer(position, type_case, type_bat, grille.bateaux_places.get(type_bat))
+            nb_coups += 1
 
         self.score += 1
         return nb_coups
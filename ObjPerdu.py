@@ -1,27 +1,37 @@
-from random import randint
+from heapq import heapify, heapreplace, heappop
 from math import floor
 import numpy as np
+from alea import Alea, vers_alea
+
+# Probabilité de passer à une case à égalité avec le maximum : randint(0, 100)/100 < 0.1 (règle d'origine)
+P_EGALITE = 10 / 101
 
 
 class ObjPerdu:
-    def __init__(self, n: int, ps: float):
+    def __init__(self, n: int, ps: float, rng: Alea | np.random.Generator | int | None = None):
         self.grille_proba = np.zeros((n, n), dtype=float)
         self.ps = ps
         self.n = n
 
+        # générateur aléatoire de la recherche (voir 'alea.vers_alea')
+        self.alea = vers_alea(rng)
+
         # placement de l'objet
-        self.obj_pos = (randint(0, n-1), randint(0, n-1))
+        self.obj_pos = (self.alea.randint(0, n-1), self.alea.randint(0, n-1))
 
     def init_proba_uniform(self) -> None:
         """Initialise la grille_proba avec les probabilités de chaque case de manière uniforme"""
 
-        prob = (1/(self.n)**2)
-
-        for ligne in range(self.n):
-            for col in range(self.n):
-                self.grille_proba[ligne][col] = prob
+        self.grille_proba[:] = 1/(self.n)**2
         return
 
+    def _masque_bords(self) -> np.ndarray:
+        """Renvoie le tableau booléen (n, n) des cases du bord (longueur du bord : n//3 de chaque côté)."""
+
+        longb = self.n//3  # longueur d'un bord
+        ligne, col = np.ogrid[:self.n, :self.n]
+        return (ligne < longb) | (self.n - longb <= ligne) | (col < longb) | (self.n - longb <= col)
+
     def init_proba_center(self) -> None:
         """Initialise la grille_prob avec une probabilité élevée au centre et faible aux bords de la grille
         Hypothese: self.n > 2
@@ -39,12 +49,7 @@ class ObjPerdu:
         proba_bord = 0.2/nb_cases_bords
         proba_centre = 0.8/(self.n**2 - nb_cases_bords)
 
-        for ligne in range(self.n):
-            for col in range(self.n):
-                if (ligne < longb or self.n - longb <= ligne) or (col < longb or self.n - longb <= col):
-                    self.grille_proba[ligne][col] = proba_bord
-                else:
-                    self.grille_proba[ligne][col] = proba_centre
+        self.grille_proba[:] = np.where(self._masque_bords(), proba_bord, proba_centre)
         return
 
     def init_proba_bords(self):
@@ -64,12 +69,7 @@ class ObjPerdu:
         proba_bord = 0.8/nb_cases_bords
         proba_centre = 0.2/(self.n**2 - nb_cases_bords)
 
-        for ligne in range(self.n):
-            for col in range(self.n):
-                if (ligne < longb or self.n - longb <= ligne) or (col < longb or self.n - longb <= col):
-                    self.grille_proba[ligne][col] = proba_bord
-                else:
-                    self.grille_proba[ligne][col] = proba_centre
+        self.grille_proba[:] = np.where(self._masque_bords(), proba_bord, proba_centre)
         return
 
     def senseur(self, position: tuple[int, int]) -> int:
@@ -84,7 +84,7 @@ class ObjPerdu:
         """
 
         if position == self.obj_pos:
-            return 1 if randint(0, 100)/100 < self.ps else 0
+            return 1 if self.alea.randint(0, 100)/100 < self.ps else 0
         return 0
 
     def maj_grille_prob(self, position: tuple[int, int]) -> None:
@@ -102,14 +102,9 @@ class ObjPerdu:
         # on redistribue la difference de proba sur les autres cases
         diff_div = (pi_k - proba_y1_z0)/(self.n**2-1)
 
-        # pik <- P(Y=1|Z=0)
+        # on redistribue, puis pik <- P(Y=1|Z=0)
+        self.grille_proba += diff_div
         self.grille_proba[ligne][col] = proba_y1_z0
-
-        # on redistribue
-        for i in range(0, self.n):
-            for j in range(0, self.n):
-                if (i, j) != position:
-                    self.grille_proba[i][j] += diff_div
         return
 
     def tmp_sum(self) -> float:
@@ -120,14 +115,13 @@ class ObjPerdu:
             Somme des probabilités de chaque case de la grille.
         """
 
-        sm = 0.0
-        for i in range(self.n):
-            for j in range(self.n):
-                sm += self.grille_proba[i][j]
-        return sm
+        return float(self.grille_proba.sum())
 
     def max_proba_grille(self, old_pos: tuple[int, int] = (0, 0)) -> tuple[int, int]:
         """Recherche la probabilité maximum et la position associée dans la grille des probabilités.
+            Même règle que le parcours ligne par ligne d'origine à partir de old_pos : si old_pos n'est pas de proba
+            maximum, la première case de proba maximum la remplace. Ensuite, chaque case de proba maximum rencontrée
+            la remplace avec la probabilité P_EGALITE (cas égalité pour ne pas prendre la premiere case cas uniforme).
 
         Args:
             old_pos: position (ligne, col) de la case avec proba max avant MAJ de la grille
@@ -136,31 +130,31 @@ class ObjPerdu:
             Nouvelle position (ligne, col) de la case avec proba max
         """
 
-        ligne, col = old_pos
-        new_pos = (ligne, col)
-
-        val_max = self.grille_proba[ligne][col]
+        proba = self.grille_proba.reshape(-1)
+        case = old_pos[0] * self.n + old_pos[1]
+        cases_max = np.flatnonzero(proba == proba.max())
+        if proba[case] < proba[cases_max[0]]:
+            case, cases_max = cases_max[0], cases_max[1:]
 
-        for i in range(self.n):
-            for j in range(self.n):
-                if self.grille_proba[i][j] > val_max:
-                    new_pos = (i, j)
-                    val_max = self.grille_proba[i][j]
+        changements = np.flatnonzero(self.alea.generateur.random(len(cases_max)) < P_EGALITE)
+        if len(changements):
+            case = cases_max[changements[-1]]
+        return divmod(int(case), self.n)
 
-                if self.grille_proba[i][j] == val_max:
-                    # cas égalité pour ne pas prendre la premiere case cas uniforme
-                    if (randint(0, 100)/100 < 0.1):
-                        new_pos = (i, j)
-        return new_pos
-
-    def recherche(self) -> int:
+    def recherche(self, tas: bool = False) -> int:
         """Algorithme qui va chercher l'objet perdu dans la grille et renvoie le nombre de cases cherchées avant
         de trouver l'objet
 
+        Args:
+            tas: True pour utiliser la version en O(log n²) par case visitée (voir '_recherche_tas'). Default = False.
+
         Returns:
             int: le nombre de cases visitées pendant la recherche  
         """
 
+        if tas:
+            return self._recherche_tas()
+
         count = 1
         ligne_max, col_max = self.max_proba_grille()
 
@@ -171,6 +165,101 @@ class ObjPerdu:
 
         return count
 
+    def _recherche_tas(self) -> int:
+        """Même recherche que 'recherche', mais chaque case visitée coûte O(log n²) au lieu de O(n²).
+            'maj_grille_prob' ajoute la même valeur à toutes les cases sauf la case visitée : on stocke
+            proba = poids + decalage, et une MAJ ne modifie que le poids de la case visitée et le décalage global.
+            La case de proba max est le sommet d'un tas de (-poids, clé aléatoire, case) : les entrées périmées
+            (poids modifié depuis) sont retirées quand elles arrivent au sommet, et les égalités sont départagées
+            par la clé aléatoire tirée à l'insertion. La grille_proba est recalculée à la fin de la recherche.
+
+        Returns:
+            int: le nombre de cases visitées pendant la recherche
+        """
+
+        poids = self.grille_proba.reshape(-1).tolist()
+        decalage = 0.0
+        tas = [(-p, self.alea.random(), case) for case, p in enumerate(poids)]
+        heapify(tas)
+
+        count = 0
+        while True:
+            # Sommet valide du tas = case de proba max
+            while -tas[0][0] != poids[tas[0][2]]:
+                heappop(tas)
+            case = tas[0][2]
+            count += 1
+            if self.senseur(divmod(case, self.n)):
+                break
+
+            # MAJ de la case visitée et du décalage ('maj_grille_prob')
+            pi_k = poids[case] + decalage
+            proba_y1_z0 = ((1 - self.ps)*pi_k) / (1 - pi_k*self.ps)
+            decalage += (pi_k - proba_y1_z0)/(self.n**2-1)
+            poids[case] = proba_y1_z0 - decalage
+            heapreplace(tas, (-poids[case], self.alea.random(), case))
+
+        self.grille_proba[:] = np.array(poids).reshape(self.n, self.n) + decalage
+        return count
+
+    @classmethod
+    def recherche_lot(cls, n: int, ps: float, nb_recherches: int, init: str = "uniform",
+                      rng: Alea | np.random.Generator | int | None = None) -> np.ndarray:
+        """Fait nb_recherches recherches indépendantes en même temps, avec un tenseur (M, n, n) des probabilités.
+            Chaque recherche a son propre objet (position uniforme). À chaque étape, toutes les recherches en cours
+            choisissent leur case de probabilité maximum (même règle d'égalité que 'max_proba_grille'), le senseur est tiré en lot et
+            les grilles des recherches qui n'ont pas trouvé l'objet sont mises à jour comme dans 'maj_grille_prob'.
+
+        Args:
+            n: Taille de la grille.
+            ps: Probabilité que le senseur détecte l'objet quand il est dans la case scannée.
+            nb_recherches: Nombre M de recherches.
+            init: Répartition initiale des probabilités : "uniform", "center" ou "bords". Default = "uniform".
+            rng: Générateur aléatoire (voir 'alea.vers_alea'). Default = None (nouveau générateur).
+
+        Returns:
+            Tableau (M,) du nombre de cases visitées par chaque recherche.
+        """
+
+        rng = vers_alea(rng).generateur
+
+        jeu = cls(n, ps, rng)
+        getattr(jeu, "init_proba_" + init)()
+        grilles = np.tile(jeu.grille_proba.reshape(1, n * n), (nb_recherches, 1))
+        obj_pos = rng.integers(0, n * n, size=nb_recherches)
+
+        nb_cases = np.zeros(nb_recherches, dtype=np.int64)
+        en_cours = np.arange(nb_recherches)
+        cases = np.zeros(nb_recherches, dtype=np.int64)
+        while len(en_cours):
+            nb_cases[en_cours] += 1
+            lignes = np.arange(len(en_cours))
+
+            # Case de proba max, même règle d'égalité que 'max_proba_grille' à partir de la case précédente
+            proba_max = grilles.max(axis=1)
+            cases_max = grilles == proba_max[:, None]
+            premieres = np.argmax(cases_max, axis=1)
+            remplacees = grilles[lignes, cases] < proba_max
+            cases_max &= ~(remplacees[:, None] & (np.arange(n * n) <= premieres[:, None]))
+            changements = cases_max & (rng.random(cases_max.shape) < P_EGALITE)
+            derniers = n * n - 1 - np.argmax(changements[:, ::-1], axis=1)
+            cases = np.where(changements.any(axis=1), derniers, np.where(remplacees, premieres, cases))
+
+            # Senseur (même tirage que 'senseur')
+            trouve = (cases == obj_pos) & (rng.integers(0, 101, size=len(en_cours)) / 100 < ps)
+
+            # MAJ des grilles ('maj_grille_prob')
+            pi_k = grilles[lignes, cases]
+            proba_y1_z0 = ((1 - ps)*pi_k) / (1 - pi_k*ps)
+            grilles += ((pi_k - proba_y1_z0)/(n**2-1))[:, None]
+            grilles[lignes, cases] = proba_y1_z0
+
+            # Les recherches terminées sont retirées
+            if trouve.any():
+                en_cours, grilles, obj_pos, cases = en_cours[~trouve], grilles[~trouve], obj_pos[~trouve], cases[~trouve]
+
+        return nb_cases
+
 
 if __name__ == '__main__':
 
@@ -178,13 +267,6 @@ if __name__ == '__main__':
     jeu.init_proba_center()
     print(jeu.grille_proba)
 
-    """
     for j in [0.1, 0.3, 0.5, 0.7, 0.9]:
-        count = 0
-        print("for :", j)
-        jeu = ObjPerdu(20, j)
-        jeu.init_proba_uniform()
-        for i in range(1000):
-            count += jeu.recherche()   
-        print("nb coups pour ", j, " uniform ",count/1000)
-    """
+        nb_cases = ObjPerdu.recherche_lot(20, j, 1000)
+        print("nb coups pour ", j, " uniform ", nb_cases.mean())
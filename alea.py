@@ -0,0 +1,66 @@
+import numpy as np
+
+# Nombre maximal de flottants tirés d'un coup par le générateur (le premier bloc est de 64, puis doublé à chaque bloc)
+TAILLE_TAMPON = 4096
+
+
+class Alea:
+    """Générateur aléatoire d'une instance (Grille, Joueur, ObjPerdu...), construit sur un numpy.random.Generator.
+        Les tirages un par un (random, randint) sont pris dans un tampon de flottants tiré en bloc,
+        les tirages vectorisés utilisent directement le générateur ('generateur').
+        Avec la même graine, la suite des tirages est exactement la même d'une exécution à l'autre.
+    """
+
+    def __init__(self, graine: int | np.random.SeedSequence | np.random.Generator | None = None,
+                 taille_tampon: int = TAILLE_TAMPON):
+        self._graine = graine
+        self._generateur: np.random.Generator | None = graine if isinstance(graine, np.random.Generator) else None
+        self.taille_tampon: int = taille_tampon
+        self._tampon: list[float] = []
+        self._pos: int = 0
+
+    @property
+    def generateur(self) -> np.random.Generator:
+        """Générateur numpy, créé au premier tirage (créer une grille sans tirage ne coûte rien)."""
+
+        if self._generateur is None:
+            self._generateur = np.random.default_rng(self._graine)
+        return self._generateur
+
+    def random(self) -> float:
+        """Renvoie un flottant uniforme dans [0, 1)."""
+
+        if self._pos == len(self._tampon):
+            taille = min(2 * len(self._tampon), self.taille_tampon) if self._tampon else min(64, self.taille_tampon)
+            self._tampon = self.generateur.random(taille).tolist()
+            self._pos = 0
+        self._pos += 1
+        return self._tampon[self._pos - 1]
+
+    def randint(self, a: int, b: int) -> int:
+        """Renvoie un entier uniforme entre a et b (inclus), comme random.randint."""
+
+        return a + int(self.random() * (b - a + 1))
+
+    def permutation(self, nb: int) -> list[int]:
+        """Renvoie une permutation aléatoire de range(nb)."""
+
+        return self.generateur.permutation(nb).tolist()
+
+    def spawn(self, nb: int) -> list["Alea"]:
+        """Crée nb générateurs indépendants (un par processus ou par thread), dérivés de la graine de celui-ci."""
+
+        return [Alea(generateur, self.taille_tampon) for generateur in self.generateur.spawn(nb)]
+
+
+def vers_alea(rng: "Alea | np.random.Generator | np.random.SeedSequence | int | None") -> Alea:
+    """Renvoie le générateur Alea donné tel quel (flux partagé), ou un nouveau Alea construit à partir de rng.
+
+    Args:
+        rng: Alea, générateur numpy, SeedSequence, graine entière ou None (graine tirée au hasard).
+
+    Returns:
+        Un générateur Alea.
+    """
+
+    return rng if isinstance(rng, Alea) else Alea(rng)
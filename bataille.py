@@ -1,4 +1,5 @@
 import numpy as np
+from typing import Dict
 from grille import Grille
 from constants import BAT_TOUCHE, RATE, VIDE, BAT_CASES, HOR, VER
 
@@ -6,23 +7,67 @@ from constants import BAT_TOUCHE, RATE, VIDE, BAT_CASES, HOR, VER
 class Bataille:
     def __init__(self, grille: Grille):
         self.plat = grille
+        self._init_compteurs()
 
-    def joue(self, position: tuple[int, int]) -> int:
+    def _init_compteurs(self) -> None:
+        """Initialise les compteurs des cases non touchées de chaque bateau.
+            Tant qu'une case bateau n'est pas touchée, la grille contient le type du bateau : elle sert de table
+            case -> bateau, 'joue' n'a donc qu'à décrémenter le compteur du bateau touché.
+        """
+
+        # Dict qui associe au type du bateau le nombre de ses cases non touchées
+        self.cases_restantes: Dict[int, int] = {bateau: int(np.count_nonzero(self.plat.grille == bateau))
+                                                for bateau in self.plat.bateaux_places}
+        self.nb_cases_restantes: int = sum(self.cases_restantes.values())
+
+    def _maj_compteurs(self, valeur: int) -> int:
+        """MAJ des compteurs après le tir sur une case. Fonction auxiliaire pour 'joue_coule'.
+
+        Args:
+            valeur: Valeur de la case avant le tir.
+
+        Returns:
+            Le type du bateau coulé par ce tir, -1 si aucun bateau n'a été coulé.
+        """
+
+        if valeur <= VIDE:
+            return -1
+
+        bateau = int(valeur)
+        self.cases_restantes[bateau] -= 1
+        self.nb_cases_restantes -= 1
+        return bateau if self.cases_restantes[bateau] == 0 else -1
+
+    def joue_coule(self, position: tuple[int, int]) -> tuple[int, int]:
         """Joue la case de la grille à la position. Si il y avait un bateau, alors case = BAT_TOUCHE, sinon case = RATE.
 
         Args:
             position: (ligne, col) qui désigne la case sur la grille à jouer.
                 (0, 0) représente le coin supérieur gauche.
+
+        Returns:
+            Le résultat du tir (BAT_TOUCHE ou RATE) et le type du bateau coulé par ce tir, -1 si aucun.
         """
 
         ligne, col = position
+        valeur = self.plat.grille[ligne][col]
 
-        if self.plat.grille[ligne][col] == VIDE:
+        if valeur == VIDE:
             self.plat.grille[ligne][col] = RATE
-            return RATE
+            return RATE, -1
 
         self.plat.grille[ligne][col] = BAT_TOUCHE
-        return BAT_TOUCHE
+        return BAT_TOUCHE, self._maj_compteurs(valeur)
+
+    def joue(self, position: tuple[int, int]) -> int:
+        """Joue la case de la grille à la position. Si il y avait un bateau, alors case = BAT_TOUCHE, sinon case = RATE.
+
+        Args:
+            position: (ligne, col) qui désigne la case sur la grille à jouer.
+                (0, 0) représente le coin supérieur gauche.
+        """
+
+        return self.joue_coule(position)[0]
 
     def _bateau_coule(self, bateau: int) -> bool:
         """Vérifie si le bateau donné a été coulé.
@@ -34,21 +79,7 @@ class Bataille:
             Un booléen True si le bateau a été coulé. Sinon, False.
         """
 
-        (ligne, col, dir) = self.plat.bateaux_places[bateau]
-        taille = BAT_CASES[bateau]
-        if dir == HOR:
-            for j in range(col, col + taille):
-                if self.plat.grille[ligne][j] != BAT_TOUCHE:
-                    return False
-            return True
-
-        if dir == VER:
-            for i in range(ligne, ligne+taille):
-                if self.plat.grille[i][col] != BAT_TOUCHE:
-                    return False
-            return True
-
-        return False
+        return self.cases_restantes[bateau] == 0
 
     def bateaux_coules(self, bateaux: list[int]) -> tuple[bool, int]:
         """Trouve les bateaux qui ont été coulés. Hypothèse : il n'y a qu'un seul bateau coulé parmi bateaux donnés.
@@ -70,14 +101,10 @@ class Bataille:
 
         Return:
             Un booléen True s'il n y a plus des bateaux restants, i.e. toutes les cases de la grille sont à 0, -1 ou -2.
-            Sinon, False.
+            Sinon, False. Calculé avec le compteur des cases bateau non touchées.
         """
 
-        for ligne in range(0, self.plat.n):
-            # si différent de BAT_TOUCHE, VIDE, et RATE
-            if not np.all(self.plat.grille[ligne] <= VIDE):
-                return False
-        return True
+        return self.nb_cases_restantes == 0
 
     def reset(self) -> None:
         """Commence le jeu depuis le début. Recommence sur la même grille, mais avec les bateaux sans avarie.
@@ -86,6 +113,7 @@ class Bataille:
         self.plat.grille.fill(0)
         for bateau, (ligne, col, dir) in self.plat.bateaux_places.items():
             self.plat.place(bateau, (ligne, col), dir)
+        self._init_compteurs()
         return
 
 
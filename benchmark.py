@@ -0,0 +1,198 @@
+import argparse
+import json
+import statistics
+import sys
+from time import perf_counter
+from typing import Callable
+import numpy as np
+from grille import Grille
+from bataille import Bataille
+from grille_bits import GrilleBits, BatailleBits
+from Joueur import Joueur
+from ObjPerdu import ObjPerdu
+from alea import Alea
+from constants import *
+
+# Un cas de mesure : nom -> (unité, fonction de préparation)
+# La préparation (non chronométrée) renvoie la fonction à chronométrer et le nombre d'opérations qu'elle fait.
+# Les générateurs aléatoires sont créés par la préparation avec une graine fixe : toutes les exécutions font le même travail.
+Preparation = Callable[[], tuple[Callable[[], object], int]]
+
+
+def _cas_grille(cls_grille: type[Grille], cls_bataille: type[Bataille], n: int) -> dict[str, tuple[str, Preparation]]:
+    """Cas de mesure des opérations de base d'une grille et d'une bataille."""
+
+    positions = [(bateau, (ligne, col), direction) for bateau in BATEAUX
+                 for ligne in range(n) for col in range(n) for direction in (HOR, VER)]
+
+    def peut_placer():
+        grille = cls_grille.genere_grille(n, 0)
+        return lambda: [grille.peut_placer(*p) for p in positions], len(positions)
+
+    def place():
+        grilles = [cls_grille(n) for _ in range(200)]
+        return lambda: [g.place(PORTE_AVION, (0, 0), HOR) for g in grilles], len(grilles)
+
+    def genere_grille():
+        alea = Alea(0)
+        return lambda: [cls_grille.genere_grille(n, alea) for _ in range(50)], 50
+
+    def calc_nb_placements():
+        grille = cls_grille(n)
+        grille_ps = np.zeros((n, n), dtype=int)
+        return lambda: [grille.calc_nb_placements(bateau, grille_ps) for bateau in BATEAUX], len(BATEAUX)
+
+    def victoire():
+        alea = Alea(0)
+        bataille = cls_bataille(cls_grille.genere_grille(n, alea))
+        for case in alea.permutation(n * n)[:n * n // 2]:
+            bataille.joue(divmod(case, n))
+        return lambda: [bataille.victoire() for _ in range(1000)], 1000
+
+    nom = cls_grille.__name__
+    return {
+        f"{nom}.peut_placer[n={n}]": ("ops/s", peut_placer),
+        f"{nom}.place[n={n}]": ("ops/s", place),
+        f"{nom}.genere_grille[n={n}]": ("ops/s", genere_grille),
+        f"{nom}.calc_nb_placements[n={n}]": ("ops/s", calc_nb_placements),
+        f"{cls_bataille.__name__}.victoire[n={n}]": ("ops/s", victoire),
+    }
+
+
+def _cas_strategie(strategie: str, n: int, nb_jeux: int, **kwargs) -> tuple[str, Preparation]:
+    """Cas de mesure d'une stratégie de Joueur : nb_jeux jeux par mesure."""
+
+    def preparer():
+        jouer = getattr(Joueur("Joueur", rng=0), strategie)
+        if strategie.endswith("_lot"):
+            return lambda: jouer(n, nb_jeux), nb_jeux
+        return lambda: [jouer(n, **kwargs) for _ in range(nb_jeux)], nb_jeux
+    return "jeux/s", preparer
+
+
+def _cas_obj_perdu(n: int, ps: float, nb_recherches: int, tas: bool = False) -> tuple[str, Preparation]:
+    """Cas de mesure de ObjPerdu.recherche : nb_recherches recherches sur des grilles uniformes."""
+
+    def preparer():
+        jeux = []
+        for i in range(nb_recherches):
+            jeu = ObjPerdu(n, ps, i)
+            jeu.init_proba_uniform()
+            jeux.append(jeu)
+        return lambda: [jeu.recherche(tas) for jeu in jeux], nb_recherches
+    return "recherches/s", preparer
+
+
+def cas_mesures() -> dict[str, tuple[str, Preparation]]:
+    """Renvoie tous les cas de mesure de la suite.
+
+    Returns:
+        Dictionnaire nom du cas -> (unité, fonction de préparation).
+    """
+
+    cas = dict()
+    for cls_grille, cls_bataille in [(Grille, Bataille), (GrilleBits, BatailleBits)]:
+        cas.update(_cas_grille(cls_grille, cls_bataille, 10))
+
+    for n in (10, 15):
+        cas[f"Joueur.jouer[n={n}]"] = _cas_strategie("jouer", n, 20)
+        cas[f"Joueur.jouer_lot[n={n}]"] = _cas_strategie("jouer_lot", n, 10000)
+        cas[f"Joueur.jouer_heuristique[n={n}]"] = _cas_strategie("jouer_heuristique", n, 20)
+        cas[f"Joueur.jouer_heuristique_lot[n={n}]"] = _cas_strategie("jouer_heuristique_lot", n, 10000)
+        cas[f"Joueur.jouer_proba_simple[n={n}]"] = _cas_strategie("jouer_proba_simple", n, 5)
+        cas[f"Joueur.jouer_proba_simple_lot[n={n}]"] = _cas_strategie("jouer_proba_simple_lot", n, 1000)
+        cas[f"Joueur.jouer_proba_simple[n={n},incremental]"] = _cas_strategie("jouer_proba_simple", n, 5,
+                                                                              incremental=True)
+        cas[f"Joueur.jouer_monte_carlo[n={n}]"] = _cas_strategie("jouer_monte_carlo", n, 2)
+
+    for n in (10, 20):
+        for ps in (0.3, 0.7):
+            cas[f"ObjPerdu.recherche[n={n},ps={ps}]"] = _cas_obj_perdu(n, ps, 5)
+            cas[f"ObjPerdu.recherche[n={n},ps={ps},tas]"] = _cas_obj_perdu(n, ps, 5, tas=True)
+    return cas
+
+
+def mesurer(preparer: Preparation, nb_echauffement: int = 1, nb_repetitions: int = 5) -> dict[str, float]:
+    """Chronomètre un cas de mesure : nb_echauffement exécutions ignorées puis nb_repetitions exécutions.
+        La préparation est refaite avant chaque exécution et n'est pas chronométrée.
+
+    Args:
+        preparer: Fonction de préparation du cas.
+        nb_echauffement: Nombre d'exécutions d'échauffement. Default = 1.
+        nb_repetitions: Nombre d'exécutions mesurées. Default = 5.
+
+    Returns:
+        Dictionnaire : débit médian, meilleur débit (opérations par seconde) et écart relatif entre les répétitions.
+    """
+
+    for _ in range(nb_echauffement):
+        executer, _ = preparer()
+        executer()
+
+    debits = []
+    for _ in range(nb_repetitions):
+        executer, nb_ops = preparer()
+        debut = perf_counter()
+        executer()
+        debits.append(nb_ops / (perf_counter() - debut))
+
+    mediane = statistics.median(debits)
+    return {
+        "mediane": mediane,
+        "max": max(debits),
+        "dispersion": (max(debits) - min(debits)) / mediane,
+    }
+
+
+def comparer(resultats: dict[str, dict], reference: dict[str, dict], seuil: float = 0.1) -> list[str]:
+    """Compare les débits médians à ceux d'une référence.
+
+    Args:
+        resultats: Résultats de la suite (nom du cas -> mesure).
+        reference: Résultats de référence (même format).
+        seuil: Baisse relative du débit à partir de laquelle on signale une régression. Default = 0.1.
+
+    Returns:
+        Liste des noms des cas en régression.
+    """
+
+    return [nom for nom, mesure in resultats.items()
+            if nom in reference and mesure["mediane"] < (1 - seuil) * reference[nom]["mediane"]]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mesure le débit des opérations de grille, des stratégies et d'ObjPerdu.")
+    parser.add_argument("--filtre", default="", help="ne mesurer que les cas dont le nom contient ce texte")
+    parser.add_argument("--echauffement", type=int, default=1, help="nombre d'exécutions d'échauffement")
+    parser.add_argument("--repetitions", type=int, default=5, help="nombre d'exécutions mesurées")
+    parser.add_argument("--reference", default="benchmark.json", help="fichier json des résultats de référence")
+    parser.add_argument("--enregistrer", action="store_true", help="écrire les résultats dans le fichier de référence")
+    parser.add_argument("--seuil", type=float, default=0.1, help="baisse relative signalée comme régression")
+    args = parser.parse_args()
+
+    try:
+        with open(args.reference) as f:
+            reference = json.load(f)
+    except FileNotFoundError:
+        reference = dict()
+
+    resultats = dict()
+    for nom, (unite, preparer) in cas_mesures().items():
+        if args.filtre not in nom:
+            continue
+        resultats[nom] = mesurer(preparer, args.echauffement, args.repetitions)
+        ligne = f"{nom:48} {resultats[nom]['mediane']:12.1f} {unite:12} ±{100 * resultats[nom]['dispersion']:.0f}%"
+        if nom in reference:
+            ligne += f"   x{resultats[nom]['mediane'] / reference[nom]['mediane']:.2f}"
+        print(ligne)
+
+    regressions = comparer(resultats, reference, args.seuil)
+    for nom in regressions:
+        print(f"RÉGRESSION : {nom}")
+
+    if args.enregistrer:
+        reference.update(resultats)
+        with open(args.reference, "w") as f:
+            json.dump(reference, f, indent=2)
+
+    sys.exit(1 if regressions else 0)
@@ -1,17 +1,118 @@
+import argparse
 import pandas as pd
 import numpy as np
-from joueur import Joueur
+from concurrent.futures import ProcessPoolExecutor
+from Joueur import Joueur
+from data.flux_resultats import FluxResultats, PARAMETRES
+
+# Stratégies de Joueur et fichier de sortie par défaut
+STRATEGIES = {
+    "jouer": "data/data.csv",
+    "jouer_lot": "data/data.csv",
+    "jouer_heuristique": "data/data2.csv",
+    "jouer_heuristique_lot": "data/data2.csv",
+    "jouer_proba_simple": "data/data3.csv",
+    "jouer_proba_simple_lot": "data/data3.csv",
+    "jouer_monte_carlo": "data/data4.csv",
+}
+
+
+def _jouer_lot(strategie: str, taille_grille: int, nb_jeux: int, graine: np.random.SeedSequence) -> np.ndarray:
+    """Joue un lot de jeux dans un processus. Fonction auxiliaire pour 'simuler'.
+
+    Args:
+        strategie: Nom de la méthode de Joueur à utiliser (voir STRATEGIES).
+        taille_grille: Taille de la grille du jeu.
+        nb_jeux: Nombre de jeux du lot.
+        graine: Graine du générateur aléatoire pour ce lot (enfant de la graine de la simulation).
+
+    Returns:
+        Tableau (nb_jeux,) des nombres de coups.
+    """
+
+    joueur = Joueur("Joueur", rng=graine)
+
+    # Stratégies vectorisées : tout le lot en une passe
+    if strategie in ("jouer_lot", "jouer_heuristique_lot", "jouer_proba_simple_lot"):
+        return getattr(joueur, strategie)(taille_grille, nb_jeux)
+
+    jouer = getattr(joueur, strategie)
+    return np.array([jouer(taille_grille) for _ in range(nb_jeux)], dtype=np.int64)
+
+
+def simuler(strategie: str, taille_grille: int, nb_jeux: int, nb_processus: int = 1,
+            taille_lot: int = 100, graine: int | None = None, flux: FluxResultats | None = None) -> np.ndarray:
+    """Joue nb_jeux jeux répartis par lots sur un ensemble de processus et fusionne les histogrammes.
+        Chaque lot a sa propre graine (SeedSequence.spawn), le résultat ne dépend donc pas du nombre de processus.
+        Avec un flux, chaque lot est écrit dès qu'il est terminé et les lots déjà présents dans le flux ne sont pas rejoués.
+
+    Args:
+        strategie: Nom de la méthode de Joueur à utiliser (voir STRATEGIES).
+        taille_grille: Taille de la grille du jeu.
+        nb_jeux: Nombre total de jeux.
+        nb_processus: Nombre de processus. Default = 1.
+        taille_lot: Nombre de jeux par lot. Default = 100.
+        graine: Graine de la simulation. Default = None (non reproductible).
+        flux: Flux de résultats dans lequel écrire les lots (voir 'FluxResultats'), créé avec les mêmes paramètres.
+            Default = None.
+
+    Returns:
+        Histogramme (taille_grille**2 + 1,) : case i = nombre de jeux terminés en i coups.
+
+    Raises:
+        ValueError: Si la stratégie est inconnue ou si les paramètres du flux diffèrent de ceux de la simulation.
+    """
+
+    if strategie not in STRATEGIES:
+        raise ValueError(f"Stratégie inconnue : {strategie}")
+    if flux is not None:
+        parametres = dict(strategie=strategie, taille_grille=taille_grille, nb_jeux_total=nb_jeux, graine=graine,
+                          taille_lot=taille_lot)
+        for cle in PARAMETRES:
+            if getattr(flux, cle) != parametres[cle]:
+                raise ValueError(f"Flux incompatible : {cle} = {getattr(flux, cle)} dans {flux.dossier}, "
+                                 f"{parametres[cle]} demandé")
+
+    lots = [taille_lot] * (nb_jeux // taille_lot)
+    if nb_jeux % taille_lot:
+        lots.append(nb_jeux % taille_lot)
+    graines = np.random.SeedSequence(graine).spawn(len(lots))
+
+    resultats_jeux = np.zeros(taille_grille**2 + 1, dtype=np.int64)
+    debut = 0
+    if flux is not None:
+        debut = flux.nb_lots
+        resultats_jeux += flux.histogramme
+
+    with ProcessPoolExecutor(max_workers=nb_processus) as executeur:
+        restants = range(debut, len(lots))
+        resultats = executeur.map(_jouer_lot, [strategie] * len(restants), [taille_grille] * len(restants),
+                                  lots[debut:], graines[debut:])
+        for i, nb_coups in zip(restants, resultats):
+            resultats_jeux += np.bincount(nb_coups, minlength=taille_grille**2 + 1)
+            if flux is not None:
+                flux.ajouter_lot(nb_coups, i)
+            print(f"lot {i + 1}/{len(lots)}")
+    return resultats_jeux
+
 
 # DATA GENERATION
 if __name__ == '__main__':
-    j = Joueur("Joueur")
-    resultats_jeux = np.array([0] * 101)
+    parser = argparse.ArgumentParser(description="Génère l'histogramme du nombre de coups d'une stratégie.")
+    parser.add_argument("--strategie", choices=list(STRATEGIES), default="jouer_heuristique")
+    parser.add_argument("-n", "--taille", type=int, default=10, help="taille de la grille")
+    parser.add_argument("--jeux", type=int, default=10000, help="nombre de jeux")
+    parser.add_argument("--processus", type=int, default=1, help="nombre de processus")
+    parser.add_argument("--lot", type=int, default=100, help="nombre de jeux par lot")
+    parser.add_argument("--graine", type=int, default=None)
+    parser.add_argument("--sortie", default=None, help="fichier csv (par défaut celui de la stratégie)")
+    parser.add_argument("--flux", default=None, help="dossier où écrire les résultats au fil de l'eau (reprise possible)")
+    args = parser.parse_args()
 
-    for i in range(10000):
-        nb_coup = j.jouer_heuristique(10)
-        print(i, nb_coup)
-        # nb_coup = j.jouer_strat(10)
-        resultats_jeux[nb_coup] += 1
+    flux = None
+    if args.flux is not None:
+        flux = FluxResultats(args.flux, args.strategie, args.taille, args.jeux, args.graine, args.lot)
+    resultats_jeux = simuler(args.strategie, args.taille, args.jeux, args.processus, args.lot, args.graine, flux)
 
     df = pd.DataFrame(resultats_jeux)
-    df.to_csv('data/data2.csv')
+    df.to_csv(args.sortie or STRATEGIES[args.strategie])
@@ -0,0 +1,127 @@
+import argparse
+import itertools
+import json
+import os
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from ObjPerdu import ObjPerdu
+
+# Répartitions initiales des probabilités (suffixe de ObjPerdu.init_proba_*)
+INITS = ["uniform", "center", "bords"]
+
+
+def _rechercher_lot(n: int, ps: float, init: str, nb_recherches: int, graine: np.random.SeedSequence,
+                    vectorise: bool) -> np.ndarray:
+    """Fait un lot de recherches dans un processus. Fonction auxiliaire pour 'balayer'.
+
+    Args:
+        n: Taille de la grille.
+        ps: Probabilité de détection du senseur.
+        init: Répartition initiale des probabilités (voir INITS).
+        nb_recherches: Nombre de recherches du lot.
+        graine: Graine du lot.
+        vectorise: True pour faire toutes les recherches du lot en une fois ('ObjPerdu.recherche_lot'),
+            False pour créer une instance par recherche, chacune avec sa propre graine.
+
+    Returns:
+        Tableau (nb_recherches,) du nombre de cases visitées par chaque recherche.
+    """
+
+    if vectorise:
+        return ObjPerdu.recherche_lot(n, ps, nb_recherches, init, np.random.default_rng(graine))
+
+    nb_cases = np.zeros(nb_recherches, dtype=np.int64)
+    for i, graine_essai in enumerate(graine.spawn(nb_recherches)):
+        jeu = ObjPerdu(n, ps, graine_essai)
+        getattr(jeu, "init_proba_" + init)()
+        nb_cases[i] = jeu.recherche()
+    return nb_cases
+
+
+def cellules_faites(fichier: str) -> set[tuple[int, float, str, int, int | None, bool]]:
+    """Lit les cellules (n, ps, init, nb_essais, entropie, vectorise) déjà écrites dans le fichier de résultats.
+        Une ligne sans graine ou sans mode (anciens fichiers) ne correspond à aucun balayage.
+    """
+
+    if not os.path.exists(fichier):
+        return set()
+    with open(fichier) as f:
+        lignes = [json.loads(ligne) for ligne in f if ligne.strip()]
+    return {(l["n"], l["ps"], l["init"], l["nb_essais"], l.get("entropie"), l.get("vectorise")) for l in lignes}
+
+
+def balayer(tailles: list[int], ps_liste: list[float], inits: list[str], nb_essais: int, fichier: str,
+            nb_processus: int = 1, taille_lot: int = 100, graine: int | None = None, vectorise: bool = False) -> None:
+    """Fait nb_essais recherches pour chaque cellule (n, ps, init) du produit cartésien des paramètres.
+        Les essais d'une cellule sont répartis par lots sur un ensemble de processus. Dès que tous les lots d'une
+        cellule sont terminés, une ligne JSON (moyenne, variance et intervalle de confiance à 95 % du nombre de cases
+        visitées) est ajoutée au fichier. Les cellules déjà présentes dans le fichier avec la même graine de balayage
+        et le même mode (vectorise) ne sont pas refaites. Les paramètres répétés ne sont balayés qu'une fois.
+        La graine d'une cellule ne dépend que de la graine du balayage et de ses paramètres.
+
+    Args:
+        tailles: Tailles de grille.
+        ps_liste: Probabilités de détection du senseur.
+        inits: Répartitions initiales des probabilités (voir INITS).
+        nb_essais: Nombre de recherches par cellule.
+        fichier: Fichier JSON lines des résultats (ouvert en ajout).
+        nb_processus: Nombre de processus. Default = 1.
+        taille_lot: Nombre de recherches par lot. Default = 100.
+        graine: Graine du balayage. Default = None (tirée au hasard, écrite dans le fichier).
+        vectorise: Voir '_rechercher_lot'. Default = False (une instance avec sa propre graine par recherche).
+    """
+
+    entropie = np.random.SeedSequence(graine).entropy
+    faites = cellules_faites(fichier)
+    # dict.fromkeys : retire les doublons des paramètres en gardant leur ordre
+    cellules = [(n, ps, init) for n, ps, init in itertools.product(dict.fromkeys(tailles), dict.fromkeys(ps_liste),
+                                                                  dict.fromkeys(inits))
+                if (n, ps, init, nb_essais, entropie, vectorise) not in faites]
+
+    lots = [taille_lot] * (nb_essais // taille_lot)
+    if nb_essais % taille_lot:
+        lots.append(nb_essais % taille_lot)
+
+    with ProcessPoolExecutor(max_workers=nb_processus) as executeur, open(fichier, "a") as f:
+        taches = dict()
+        for n, ps, init in cellules:
+            graine_cellule = np.random.SeedSequence(entropie, spawn_key=(n, round(ps * 10**6), INITS.index(init)))
+            for taille, graine_lot in zip(lots, graine_cellule.spawn(len(lots))):
+                tache = executeur.submit(_rechercher_lot, n, ps, init, taille, graine_lot, vectorise)
+                taches[tache] = (n, ps, init)
+
+        resultats = {cellule: [] for cellule in cellules}
+        for tache in as_completed(taches):
+            cellule = taches[tache]
+            resultats[cellule].append(tache.result())
+            if len(resultats[cellule]) < len(lots):
+                continue
+
+            nb_cases = np.concatenate(resultats.pop(cellule))
+            n, ps, init = cellule
+            moyenne = float(nb_cases.mean())
+            variance = float(nb_cases.var(ddof=1)) if nb_essais > 1 else 0.0
+            demi_largeur = 1.96 * (variance / nb_essais) ** 0.5
+            ligne = {"n": n, "ps": ps, "init": init, "nb_essais": nb_essais, "moyenne": moyenne,
+                     "variance": variance, "ic95": [moyenne - demi_largeur, moyenne + demi_largeur],
+                     "entropie": entropie, "vectorise": vectorise}
+            f.write(json.dumps(ligne) + "\n")
+            f.flush()
+            print(f"n={n} ps={ps} init={init} : {moyenne:.1f} ± {demi_largeur:.1f}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Balayage des paramètres de la recherche d'un objet perdu.")
+    parser.add_argument("-n", "--tailles", type=int, nargs="+", default=[20], help="tailles de grille")
+    parser.add_argument("--ps", type=float, nargs="+", default=[0.1, 0.3, 0.5, 0.7, 0.9])
+    parser.add_argument("--init", nargs="+", choices=INITS, default=INITS, help="répartitions initiales")
+    parser.add_argument("--essais", type=int, default=1000, help="nombre de recherches par cellule")
+    parser.add_argument("--processus", type=int, default=1, help="nombre de processus")
+    parser.add_argument("--lot", type=int, default=100, help="nombre de recherches par lot")
+    parser.add_argument("--graine", type=int, default=None)
+    parser.add_argument("--vectorise", action="store_true", help="recherches d'un lot en une fois ('recherche_lot')")
+    parser.add_argument("--sortie", default="data/obj_perdu.jsonl", help="fichier json lines des résultats")
+    args = parser.parse_args()
+
+    balayer(args.tailles, args.ps, args.init, args.essais, args.sortie, args.processus, args.lot, args.graine,
+            args.vectorise)
@@ -0,0 +1,194 @@
+import json
+import os
+import numpy as np
+
+# Colonnes du fichier de résultats : nom -> type numpy (une valeur par jeu)
+COLONNES = {
+    "nb_coups": np.uint16,
+    "lot": np.uint32,
+}
+FICHIER_ETAT = "etat.json"
+# Paramètres de la simulation stockés dans 'etat.json', qui doivent être les mêmes à la reprise
+PARAMETRES = ("strategie", "taille_grille", "nb_jeux_total", "graine", "taille_lot")
+
+
+class FluxResultats:
+    """Écrit les résultats des jeux au fil de l'eau dans un dossier, lot par lot.
+        Chaque colonne (nombre de coups, numéro du lot) est un fichier binaire auquel on ajoute les valeurs du lot.
+        Les paramètres de la simulation (stratégie, taille de grille, nombre total de jeux, graine, taille des lots)
+        sont stockés dans 'etat.json' : une reprise avec d'autres paramètres est refusée.
+        Le fichier 'etat.json' contient aussi le point de reprise (nombre de lots et de jeux écrits) et les agrégats :
+        moyenne et variance (mises à jour en ligne) et l'histogramme du nombre de coups, qui donne les quantiles exacts
+        car le nombre de coups est borné par n*n.
+        Une simulation interrompue reprend après le dernier lot enregistré dans 'etat.json'.
+    """
+
+    def __init__(self, dossier: str, strategie: str, taille_grille: int, nb_jeux_total: int,
+                 graine: int | None = None, taille_lot: int = 100):
+        self.dossier: str = dossier
+        self.strategie: str = strategie
+        self.taille_grille: int = taille_grille
+        self.nb_jeux_total: int = nb_jeux_total
+        self.graine: int | None = graine
+        self.taille_lot: int = taille_lot
+
+        self.nb_lots: int = 0
+        self.nb_jeux: int = 0
+        self.moyenne: float = 0.0
+        self.m2: float = 0.0
+        self.histogramme: np.ndarray = np.zeros(taille_grille**2 + 1, dtype=np.int64)
+
+        os.makedirs(dossier, exist_ok=True)
+        if os.path.exists(self._chemin(FICHIER_ETAT)):
+            self._reprendre()
+        else:
+            self._ecrire_etat()
+
+    def _chemin(self, fichier: str) -> str:
+        """Renvoie le chemin du fichier dans le dossier du flux."""
+
+        return os.path.join(self.dossier, fichier)
+
+    def _reprendre(self) -> None:
+        """Charge le point de reprise et coupe les colonnes après le dernier lot enregistré.
+            Les valeurs écrites après le dernier point de reprise (lot interrompu) sont ainsi supprimées.
+
+        Raises:
+            ValueError: Si les paramètres de la simulation diffèrent de ceux du flux (voir PARAMETRES).
+        """
+
+        etat = lire_etat(self.dossier)
+        for cle in PARAMETRES:
+            if etat.get(cle) != getattr(self, cle):
+                raise ValueError(f"Reprise impossible : {cle} = {etat.get(cle)} dans {self.dossier}, "
+                                 f"{getattr(self, cle)} demandé")
+
+        self.nb_lots = etat["nb_lots"]
+        self.nb_jeux = etat["nb_jeux"]
+        self.moyenne = etat["moyenne"]
+        self.m2 = etat["m2"]
+        self.histogramme = np.array(etat["histogramme"], dtype=np.int64)
+
+        for nom, dtype in COLONNES.items():
+            with open(self._chemin(nom + ".bin"), "ab") as f:
+                f.truncate(self.nb_jeux * np.dtype(dtype).itemsize)
+
+    def _ecrire_etat(self) -> None:
+        """Écrit le point de reprise et les agrégats (remplacement atomique du fichier)."""
+
+        etat = {
+            "strategie": self.strategie,
+            "taille_grille": self.taille_grille,
+            "nb_jeux_total": self.nb_jeux_total,
+            "graine": self.graine,
+            "taille_lot": self.taille_lot,
+            "nb_lots": self.nb_lots,
+            "nb_jeux": self.nb_jeux,
+            "moyenne": self.moyenne,
+            "m2": self.m2,
+            "histogramme": self.histogramme.tolist(),
+        }
+        temporaire = self._chemin(FICHIER_ETAT + ".tmp")
+        with open(temporaire, "w") as f:
+            json.dump(etat, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporaire, self._chemin(FICHIER_ETAT))
+
+    def ajouter_lot(self, nb_coups: np.ndarray, num_lot: int) -> None:
+        """Ajoute les résultats d'un lot aux colonnes, met à jour les agrégats puis le point de reprise.
+
+        Args:
+            nb_coups: Tableau (taille du lot,) des nombres de coups des jeux.
+            num_lot: Numéro du lot. Son générateur est l'enfant num_lot de la graine de la simulation
+                (np.random.SeedSequence(graine).spawn(nb_lots)[num_lot]).
+        """
+
+        nb_coups = np.asarray(nb_coups)
+        colonnes = {
+            "nb_coups": nb_coups,
+            "lot": np.full(len(nb_coups), num_lot),
+        }
+        for nom, dtype in COLONNES.items():
+            with open(self._chemin(nom + ".bin"), "ab") as f:
+                f.write(colonnes[nom].astype(dtype).tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+
+        # Fusion de la moyenne et de la variance du lot avec celles des lots précédents (Chan et al.)
+        nb = len(nb_coups)
+        if nb:
+            moyenne_lot = float(nb_coups.mean())
+            m2_lot = float(((nb_coups - moyenne_lot) ** 2).sum())
+            total = self.nb_jeux + nb
+            delta = moyenne_lot - self.moyenne
+            self.moyenne += delta * nb / total
+            self.m2 += m2_lot + delta**2 * self.nb_jeux * nb / total
+            self.nb_jeux = total
+            self.histogramme += np.bincount(nb_coups, minlength=len(self.histogramme))
+
+        self.nb_lots += 1
+        self._ecrire_etat()
+
+    @property
+    def variance(self) -> float:
+        """Variance empirique (non biaisée) du nombre de coups."""
+
+        return self.m2 / (self.nb_jeux - 1) if self.nb_jeux > 1 else 0.0
+
+    def quantile(self, q: float) -> int:
+        """Renvoie le plus petit nombre de coups i tel que P(X <= i) >= q, calculé sur l'histogramme."""
+
+        return quantile_histogramme(self.histogramme, q)
+
+    def lire_colonnes(self) -> dict[str, np.ndarray]:
+        """Lit les colonnes brutes (une valeur par jeu) jusqu'au dernier point de reprise."""
+
+        return {nom: np.fromfile(self._chemin(nom + ".bin"), dtype=dtype, count=self.nb_jeux)
+                for nom, dtype in COLONNES.items()}
+
+
+def lire_etat(dossier: str) -> dict:
+    """Lit le point de reprise et les agrégats d'un flux, sans lire les colonnes brutes.
+
+    Args:
+        dossier: Dossier du flux.
+
+    Returns:
+        Dictionnaire : strategie, taille_grille, nb_jeux_total, graine, taille_lot, nb_lots, nb_jeux, moyenne, m2,
+            histogramme.
+    """
+
+    with open(os.path.join(dossier, FICHIER_ETAT)) as f:
+        return json.load(f)
+
+
+def quantile_histogramme(histogramme: np.ndarray, q: float) -> int:
+    """Renvoie le plus petit nombre de coups i tel que P(X <= i) >= q.
+
+    Args:
+        histogramme: Case i = nombre de jeux terminés en i coups.
+        q: Niveau du quantile, entre 0 et 1.
+
+    Returns:
+        Le quantile d'ordre q du nombre de coups.
+    """
+
+    cumul = np.cumsum(histogramme)
+    return int(np.searchsorted(cumul, q * cumul[-1]))
+
+
+def lire_histogramme(chemin: str) -> np.ndarray:
+    """Lit l'histogramme du nombre de coups depuis un dossier de flux (agrégats seulement) ou un fichier csv.
+
+    Args:
+        chemin: Dossier écrit par 'FluxResultats' ou fichier csv écrit par 'calc_data'.
+
+    Returns:
+        Histogramme : case i = nombre de jeux terminés en i coups.
+    """
+
+    if os.path.isdir(chemin):
+        return np.array(lire_etat(chemin)["histogramme"], dtype=np.int64)
+    with open(chemin) as f:
+        return np.loadtxt(f, delimiter=",", skiprows=1, usecols=1, dtype=np.int64)
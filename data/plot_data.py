@@ -1,7 +1,8 @@
 import matplotlib.pyplot as plt
 import numpy as np
 from math import comb
-import pandas as pd
+import sys
+from data.flux_resultats import lire_histogramme
 
 
 def calc_esp_sum(b: int, n: int) -> int:
@@ -27,14 +28,15 @@ def calc_proba(i, b, n):
 
 
 if __name__ == '__main__':
-    data = pd.read_csv('data/data.csv', sep=',', header=None)
-    nb_jeux = 10000
+    # Fichier csv ou dossier de flux (calc_data --flux) en argument
+    histogramme = lire_histogramme(sys.argv[1] if len(sys.argv) > 1 else 'data/data.csv')
+    nb_jeux = histogramme.sum()
     b, n = 17, 100
 
     fig, ax = plt.subplots()
 
-    nb_coups = data.iloc[:, 0]
-    proba_data = np.array([val / nb_jeux for val in np.array(data.iloc[:, 1])])
+    nb_coups = np.arange(len(histogramme))
+    proba_data = histogramme / nb_jeux
 
     ax.plot(nb_coups, proba_data, 'b', label='Données')
 
@@ -61,7 +63,7 @@ if __name__ == '__main__':
     y_modelisation = np.array([calc_proba(i, b, n) for i in x_modelisation])
     ax.plot(x_modelisation, y_modelisation, 'gray', label='Modélisation')
 
-    ax.set_title('Distribution de la variable aléatoire X (10000 jeux)')
+    ax.set_title(f'Distribution de la variable aléatoire X ({nb_jeux} jeux)')
     ax.set_xlabel('Nombre de coups i')
     ax.set_ylabel('Probabilité P(X = i)')
     ax.legend()
@@ -1,7 +1,8 @@
 import matplotlib.pyplot as plt
 import numpy as np
 from math import comb
-import pandas as pd
+import sys
+from data.flux_resultats import lire_histogramme
 
 
 def calc_esp_sum(b: int, n: int) -> int:
@@ -28,22 +29,24 @@ def calc_proba(i, b, n):
 
 if __name__ == '__main__':
     # Deux courbes ensemble
-    data = pd.read_csv("data/data.csv", sep=',', header=None)    #version aléa
-    data2 = pd.read_csv('data/data2.csv', sep=',', header=None)  #version heuristique
-    data3 = pd.read_csv('data/data3.csv', sep=',', header=None)  #version proba
+    # Fichiers csv ou dossiers de flux (calc_data --flux) en arguments : aléa, heuristique, proba
+    chemins = sys.argv[1:4] + ['data/data.csv', 'data/data2.csv', 'data/data3.csv'][len(sys.argv[1:4]):]
+    data = lire_histogramme(chemins[0])    #version aléa
+    data2 = lire_histogramme(chemins[1])   #version heuristique
+    data3 = lire_histogramme(chemins[2])   #version proba
 
     b, n = 17, 100
 
     fig, ax = plt.subplots()
 
-    nb_coups = data.iloc[:, 0]
-    proba_data = np.array([val / 10000 for val in np.array(data.iloc[:, 1])])
-    proba_data2 = np.array([val / 10000 for val in np.array(data2.iloc[:, 1])])
-    proba_data3 = np.array([val / 1000 for val in np.array(data3.iloc[:, 1])])
+    nb_coups = np.arange(len(data))
+    proba_data = data / data.sum()
+    proba_data2 = data2 / data2.sum()
+    proba_data3 = data3 / data3.sum()
 
-    ax.plot(nb_coups, proba_data, 'b', label='Ver. aléatoire (10 000 jeux)')
-    ax.plot(nb_coups, proba_data2, 'r', label='Ver. heuristique (10 000 jeux)')
-    ax.plot(nb_coups, proba_data3, 'g', label='Ver. proba simple (1000 jeux)')
+    ax.plot(nb_coups, proba_data, 'b', label=f'Ver. aléatoire ({data.sum()} jeux)')
+    ax.plot(nb_coups, proba_data2, 'r', label=f'Ver. heuristique ({data2.sum()} jeux)')
+    ax.plot(nb_coups, proba_data3, 'g', label=f'Ver. proba simple ({data3.sum()} jeux)')
 
     ax.set_xlim(17, 100)
     ax.set_ylim(0, max(max(max(proba_data), max(proba_data2)), max(proba_data3)+0.01))
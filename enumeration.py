@@ -0,0 +1,235 @@
+import argparse
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from time import perf_counter
+import numpy as np
+from grille import Grille
+from placements import index_placements, dtype_configurations
+from constants import *
+
+
+def symetries(n: int) -> np.ndarray:
+    """Calcule les 8 symétries du carré (groupe diédral) sous forme de permutations des cases.
+
+    Args:
+        n: Taille de la grille.
+
+    Returns:
+        Tableau (8, n*n) : symetries[g][c] est l'image de la case c (ligne * n + col) par la symétrie g.
+            La symétrie 0 est l'identité.
+    """
+
+    lignes, cols = np.divmod(np.arange(n * n), n)
+    images = []
+    for transposee in (False, True):
+        for rotation in range(4):
+            l, c = (cols, lignes) if transposee else (lignes, cols)
+            for _ in range(rotation):
+                l, c = c, n - 1 - l
+            images.append(l * n + c)
+    return np.array(images, dtype=np.int64)
+
+
+def orbites_placements(taille: int, n: int) -> list[tuple[int, list[tuple[int, int]]]]:
+    """Regroupe les placements d'un bateau sur la grille vide en orbites sous les 8 symétries du carré.
+        Le représentant d'une orbite est son placement de plus petit indice (voir 'placements.IndexPlacements').
+
+    Args:
+        taille: Taille du bateau.
+        n: Taille de la grille.
+
+    Returns:
+        Liste des orbites : (indice du représentant, liste des (placement p, symétrie g) telle que p est l'image
+            du représentant par g, un couple par placement distinct de l'orbite).
+    """
+
+    index = index_placements(taille, n)
+    sym = symetries(n)
+    par_cases = {tuple(sorted(cases)): p for p, cases in enumerate(index.cases.tolist())}
+
+    orbites = []
+    vus = set()
+    for p in range(len(index)):
+        if p in vus:
+            continue
+        images = dict()
+        for g in range(len(sym)):
+            image = par_cases[tuple(sorted(sym[g][index.cases[p]].tolist()))]
+            images.setdefault(image, g)
+        vus.update(images)
+        orbites.append((p, list(images.items())))
+    return orbites
+
+
+def _compter(grille: Grille, bateaux: list[int], brute_force: bool) -> int:
+    """Compte les configurations des bateaux à partir de la grille courante. Fonction auxiliaire pour '_sous_arbre'."""
+
+    if brute_force:
+        return int(grille.calc_nb_placements_liste_bateaux(bateaux))
+    return int(grille.calc_nb_configurations(bateaux))
+
+
+def _sous_arbre(n: int, bateaux: list[int], placement: int, occupation: bool,
+                brute_force: bool) -> tuple[int, list[list[int]] | None]:
+    """Énumère les configurations dont le premier bateau est au placement donné (un sous-arbre de l'énumération).
+        Fonction auxiliaire pour 'enumerer', exécutée dans un processus.
+
+    Args:
+        n: Taille de la grille.
+        bateaux: Liste des bateaux, le premier est celui qui est placé.
+        placement: Indice du placement du premier bateau (voir 'placements.IndexPlacements').
+        occupation: True pour calculer aussi les nombres d'occupation de chaque case.
+        brute_force: True pour compter avec 'calc_nb_placements_liste_bateaux', False avec 'calc_nb_configurations'.
+
+    Returns:
+        Le nombre de configurations du sous-arbre et, si occupation, la liste (len(bateaux), n*n) des nombres de
+            configurations du sous-arbre dans lesquelles chaque bateau occupe chaque case (None sinon).
+    """
+
+    grille = Grille(n)
+    index = index_placements(BAT_CASES[bateaux[0]], n)
+    ligne, col, dir = index.positions[placement].tolist()
+    grille.place(bateaux[0], (ligne, col), dir)
+    nb = _compter(grille, bateaux[1:], brute_force)
+    if not occupation:
+        return nb, None
+
+    occupations = [[0] * (n * n) for _ in bateaux]
+    for case in index.cases[placement].tolist():
+        occupations[0][case] = nb
+
+    # Occupation d'un autre bateau : on le place sur chacun de ses placements possibles et on compte les autres
+    for k, bateau in enumerate(bateaux[1:], 1):
+        autres = bateaux[1:k] + bateaux[k + 1:]
+        index_bat = index_placements(BAT_CASES[bateau], n)
+        for p in np.flatnonzero(index_bat.legaux(grille._cases_occupees())).tolist():
+            ligne, col, dir = index_bat.positions[p].tolist()
+            grille.place(bateau, (ligne, col), dir)
+            nb_p = _compter(grille, autres, brute_force)
+            grille.retirer_bateau(bateau, (ligne, col), dir)
+            for case in index_bat.cases[p].tolist():
+                occupations[k][case] += nb_p
+    return nb, occupations
+
+
+def sous_arbres_faits(fichier: str, n: int, bateaux: list[int], occupation: bool) -> dict[int, dict]:
+    """Lit les sous-arbres déjà énumérés dans le fichier de reprise pour ces paramètres.
+
+    Args:
+        fichier: Fichier JSON lines de reprise.
+        n: Taille de la grille.
+        bateaux: Liste des bateaux.
+        occupation: True si les nombres d'occupation sont demandés.
+
+    Returns:
+        Dictionnaire indice du placement du premier bateau -> ligne du fichier.
+    """
+
+    if not os.path.exists(fichier):
+        return dict()
+    faits = dict()
+    with open(fichier) as f:
+        for ligne in f:
+            if not ligne.strip():
+                continue
+            sous_arbre = json.loads(ligne)
+            if (sous_arbre["n"] == n and sous_arbre["bateaux"] == bateaux
+                    and (sous_arbre["occupations"] is not None or not occupation)):
+                faits[sous_arbre["placement"]] = sous_arbre
+    return faits
+
+
+def enumerer(n: int, bateaux: list[int], occupation: bool = False, symetrie: bool = True, nb_processus: int = 1,
+             reprise: str | None = None, brute_force: bool = False,
+             progression: bool = True) -> tuple[int, np.ndarray | None]:
+    """Énumère toutes les configurations des bateaux sur la grille vide n x n (même nombre que
+        'Grille.calc_nb_placements_liste_bateaux'), un sous-arbre par placement du premier bateau.
+        Avec symetrie, le premier bateau n'est placé que sur un représentant de chaque orbite sous les 8 symétries du
+        carré : le sous-arbre d'un représentant est compté autant de fois que son orbite a de placements, et ses
+        nombres d'occupation sont transportés par les symétries.
+        Les sous-arbres sont répartis sur un ensemble de processus. Avec un fichier de reprise, chaque sous-arbre
+        terminé y est ajouté et les sous-arbres déjà présents ne sont pas refaits.
+
+    Args:
+        n: Taille de la grille.
+        bateaux: Liste des bateaux à placer.
+        occupation: True pour calculer aussi les nombres d'occupation. Default = False.
+        symetrie: True pour n'énumérer qu'un représentant par orbite du premier bateau. Default = True.
+        nb_processus: Nombre de processus. Default = 1.
+        reprise: Fichier JSON lines de reprise. Default = None (pas de reprise).
+        brute_force: True pour énumérer chaque sous-arbre avec 'calc_nb_placements_liste_bateaux' (référence),
+            False pour le compter avec 'calc_nb_configurations'. Default = False.
+        progression: True pour afficher l'avancement après chaque sous-arbre. Default = True.
+
+    Returns:
+        Le nombre de configurations et, si occupation, le tableau (len(bateaux), n, n) des nombres de configurations
+            dans lesquelles chaque bateau occupe chaque case (None sinon). Le tableau est en int64 si les nombres
+            tiennent sur 63 bits, en entiers Python sinon.
+    """
+
+    if not bateaux:
+        return 1, (np.zeros((0, n, n), dtype=np.int64) if occupation else None)
+
+    index = index_placements(BAT_CASES[bateaux[0]], n)
+    if symetrie:
+        orbites = orbites_placements(BAT_CASES[bateaux[0]], n)
+    else:
+        orbites = [(p, [(p, 0)]) for p in range(len(index))]
+    sym = symetries(n)
+
+    faits = sous_arbres_faits(reprise, n, bateaux, occupation) if reprise is not None else dict()
+    resultats = {p: (faits[p]["nb"], faits[p]["occupations"]) for p, _ in orbites if p in faits}
+
+    debut = perf_counter()
+    restants = [p for p, _ in orbites if p not in resultats]
+    with ProcessPoolExecutor(max_workers=nb_processus) as executeur:
+        taches = {executeur.submit(_sous_arbre, n, bateaux, p, occupation, brute_force): p for p in restants}
+        for i, tache in enumerate(as_completed(taches), 1):
+            p = taches[tache]
+            resultats[p] = tache.result()
+            if reprise is not None:
+                with open(reprise, "a") as f:
+                    ligne = {"n": n, "bateaux": bateaux, "placement": p, "nb": resultats[p][0],
+                             "occupations": resultats[p][1]}
+                    f.write(json.dumps(ligne) + "\n")
+            if progression:
+                ecoule = perf_counter() - debut
+                print(f"sous-arbre {len(resultats)}/{len(orbites)} (placement {p}) : {resultats[p][0]} configurations, "
+                      f"{ecoule:.1f} s, reste ~{ecoule / i * (len(restants) - i):.1f} s")
+
+    # Nombre de configurations : int64 s'il tient sur 63 bits, entiers Python sinon
+    dtype = dtype_configurations(bateaux, n)
+
+    nb = 0
+    occupations = np.zeros((len(bateaux), n * n), dtype=dtype) if occupation else None
+    for p, images in orbites:
+        nb_p, occupations_p = resultats[p]
+        nb += len(images) * nb_p
+        if occupation:
+            occupations_p = np.array(occupations_p, dtype=dtype)
+            for _, g in images:
+                # La case c du représentant devient la case sym[g][c] du placement image
+                occupations[:, sym[g]] += occupations_p
+    return nb, (occupations.reshape(len(bateaux), n, n) if occupation else None)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Énumération exhaustive des configurations de la flotte.")
+    parser.add_argument("-n", "--taille", type=int, default=10, help="taille de la grille")
+    parser.add_argument("--bateaux", type=int, nargs="+", default=BATEAUX, help="types des bateaux")
+    parser.add_argument("--occupation", action="store_true", help="calculer les nombres d'occupation des cases")
+    parser.add_argument("--sans-symetrie", action="store_true", help="énumérer tous les placements du premier bateau")
+    parser.add_argument("--processus", type=int, default=1, help="nombre de processus")
+    parser.add_argument("--reprise", default=None, help="fichier json lines de reprise (un sous-arbre par ligne)")
+    parser.add_argument("--brute-force", action="store_true", help="énumérer chaque sous-arbre par force brute")
+    parser.add_argument("--sortie", default=None, help="fichier json du résultat")
+    args = parser.parse_args()
+
+    nb, occupations = enumerer(args.taille, args.bateaux, args.occupation, not args.sans_symetrie, args.processus,
+                               args.reprise, args.brute_force)
+    print(f"{nb} configurations")
+    if args.sortie is not None:
+        with open(args.sortie, "w") as f:
+            json.dump({"n": args.taille, "bateaux": args.bateaux, "nb": nb,
+                       "occupations": occupations.tolist() if occupations is not None else None}, f)
@@ -1,20 +1,25 @@
 import numpy as np
 import matplotlib.pyplot as plt
-from random import randint, choice
 from typing import Self, Dict
-from time import time
 from constants import *
+from placements import index_placements, comptes_placements, tirer_placements_lot, EspaceComptes, dtype_configurations
+from alea import Alea, vers_alea
 
 
 class Grille:
-    def __init__(self, n: int):
+    def __init__(self, n: int, rng: Alea | np.random.Generator | int | None = None):
         self.n: int = n  # taille d'un côté
+        # Générateur aléatoire de la grille (voir 'alea.vers_alea')
+        self.alea: Alea = vers_alea(rng)
         self.grille: np.ndarray = np.zeros((n, n), dtype=np.int8)
 
         # Dict qui associe au triplet (ligne, colonne, direction) un type du bateau
         # (ligne, colonne) indique le début du bateau
         self.bateaux_places: Dict[int, (int, int, int)] = dict()
 
+        # Tableaux de travail de 'calc_nb_placements', alloués au premier appel
+        self._espace_comptes: EspaceComptes | None = None
+
     def peut_placer(self, bateau: int, position: tuple[int, int], direction: int, proba_simple: bool = False) -> bool:
         """Vérifie s'il est possible de placer le bateau à la position dans la direction donnée sur la grille.
 
@@ -92,19 +97,44 @@ class Grille:
 
         self.bateaux_places[bateau] = (ligne, col, direction)
 
+    def marque_case(self, position: tuple[int, int], valeur: int) -> None:
+        """Écrit la valeur (BAT_TOUCHE, RATE, VIDE ou type du bateau) dans la case de la grille.
+
+        Args:
+            position: (ligne, colonne) de la case à modifier.
+            valeur: Nouvelle valeur de la case.
+        """
+
+        ligne, col = position
+        self.grille[ligne][col] = valeur
+
+    def _cases_occupees(self, proba_simple: bool = False, out: np.ndarray | None = None) -> np.ndarray:
+        """Calcule les cases sur lesquelles on ne peut pas placer un bateau (même sémantique que 'peut_placer').
+
+        Args:
+            proba_simple: True si les cases BAT_TOUCHE doivent être considérées libres. Default = False.
+            out: Tableau booléen (n, n) dans lequel écrire le résultat. Default = None (nouveau tableau).
+
+        Returns:
+            Tableau booléen (n, n), True pour les cases occupées.
+        """
+
+        if proba_simple:
+            return np.logical_and(self.grille != VIDE, self.grille != BAT_TOUCHE, out=out)
+        return np.not_equal(self.grille, VIDE, out=out)
+
     def place_alea(self, bateau: int) -> None:
         """Place le bateau aléatoirement dans la grille. 
+            Le placement est tiré uniformément parmi les placements possibles de la table des placements.
 
         Args:
             bateau: Type du bateau (constante).
         """
 
-        while True:
-            position = (randint(0, self.n-1), randint(0, self.n-1))
-            direction = choice([HOR, VER])
-            if self.peut_placer(bateau, position, direction):
-                self.place(bateau, position, direction)
-                return
+        index = index_placements(BAT_CASES[bateau], self.n)
+        possibles = np.flatnonzero(index.legaux(self._cases_occupees()))
+        ligne, col, direction = index.positions[possibles[self.alea.randint(0, len(possibles) - 1)]]
+        self.place(bateau, (int(ligne), int(col)), int(direction))
 
     def place_alea_list(self, bateaux: list) -> None:
         """Place les bateaux aléatoirement dans la grille.
@@ -150,11 +180,29 @@ class Grille:
             if label != VIDE:
                 self.ax.text(ligne+0.5, col+0.5, label, ha='center', va='center')
 
+    def cle(self) -> int:
+        """Calcule la clé canonique de la grille à partir de 'bateaux_places' (voir 'placements.cles_placements').
+            Deux grilles de même taille ont la même clé ssi leurs bateaux sont placés de la même manière.
+
+        Returns:
+            La clé (entier).
+        """
+
+        bits = (2 * self.n * self.n).bit_length()
+        cle = 0
+        for b, bateau in enumerate(BAT_CASES.keys()):
+            if bateau in self.bateaux_places:
+                ligne, col, dir = self.bateaux_places[bateau]
+                cle |= (1 + 2 * (ligne * self.n + col) + (dir - HOR)) << (bits * b)
+        return cle
+
     def eq(self, grilleA: Self) -> bool:
         """Vérifie l'égalité entre deux grilles. L'égalité entre deux grilles est considérés vérifiée ssi elles ont:
             - la même taille
-            - les mêmes cases vides
             - les mêmes bateaux sur les mêmes cases
+            Si les 5 bateaux des deux grilles sont placés (self.bateaux_places), la comparaison se fait en O(1)
+            avec leurs clés (voir 'cle') : les marques des tirs (BAT_TOUCHE, RATE) ne sont alors pas comparées.
+            Sinon (grille remplie directement, sans placements), les tableaux self.grille sont comparés case à case.
 
         Args:
             grilleA: La grille avec laquelle il faut vérifier l'égalité.
@@ -169,45 +217,70 @@ class Grille:
         # Vérifier la taille des grilles
         if (self.n != grilleA.n):
             return False
-        # Vérifier que toutes les cases ont les mêmes valeurs
-        for i in range(grilleA.n):
-            for j in range(grilleA.n):
-                if self.grille[i][j] != grilleA.grille[i][j]:
-                    return False
-        return True
-
-    def _eq_dict_bateaux(self, grilleA: Self) -> bool:
-        """Vérifie l'égalité entre deux grilles. Utiliser uniquement pour la fonction eq_alea (pour optimisation).
-            Hypothèse:
-                - Les cases qui ne sont pas stockées dans le dictionnaire self.bateaux_places sont VIDES.
+        if len(self.bateaux_places) == len(BAT_CASES) and len(grilleA.bateaux_places) == len(BAT_CASES):
+            return self.cle() == grilleA.cle()
+        return np.array_equal(self.grille, grilleA.grille)
+
+    @classmethod
+    def genere_grille(cls, n: int, rng: Alea | np.random.Generator | int | None = None) -> Self:
+        """Crée une nouvelle grille de la taille n remplie des 5 bateaux (un de chaque type).
 
         Args:
-            grilleA: La grille avec laquelle il faut vérifier l'égalité.
+            n: Taille de la nouvelle grille.
+            rng: Générateur aléatoire de la nouvelle grille (voir 'alea.vers_alea'). Default = None.
 
         Returns:
-            Un booléan True ssi les grilles sont égales. Sinon, False.
+            Une nouvelle instance de la classe Grille dont le tableau 'grille' est rempli des bateaux.
         """
 
-        if (grilleA.__class__ != self.__class__):
-            return False
-        if (self.n != grilleA.n):
-            return False
-        return self.bateaux_places == grilleA.bateaux_places
+        nouv_grille = cls(n, rng)
+        for bat_type in BAT_CASES.keys():
+            nouv_grille.place_alea(bat_type)
+        return nouv_grille
 
     @classmethod
-    def genere_grille(cls, n: int) -> Self:
-        """Crée une nouvelle grille de la taille n remplie des 5 bateaux (un de chaque type).
+    def genere_grilles(cls, n: int, nb: int, rng: Alea | np.random.Generator | int | None = None) -> tuple[np.ndarray, np.ndarray]:
+        """Crée nb grilles de taille n remplies des 5 bateaux (un de chaque type) en lot.
+            Chaque bateau suit la même loi que dans 'genere_grille' (voir 'placements.tirer_placements_lot').
 
         Args:
-            n: Taille de la nouvelle grille.
+            n: Taille des nouvelles grilles.
+            nb: Nombre de grilles.
+            rng: Générateur aléatoire (voir 'alea.vers_alea'). Default = None (nouveau générateur).
 
         Returns:
-            Une nouvelle instance de la classe Grille dont le tableau 'grille' est rempli des bateaux.
+            - Tableau int8 (nb, n, n) des grilles.
+            - Tableau (nb, 5, 3) des triplets (ligne, col, direction) de chaque bateau, dans l'ordre de BAT_CASES.
+                Équivalent de 'bateaux_places'.
         """
 
-        nouv_grille = Grille(n)
-        for bat_type in BAT_CASES.keys():
-            nouv_grille.place_alea(bat_type)
+        bateaux = list(BAT_CASES.keys())
+        choisis, _, _ = tirer_placements_lot(n, bateaux, nb, vers_alea(rng).generateur)
+
+        grilles = np.zeros((nb, n * n), dtype=np.int8)
+        placements = np.zeros((nb, len(bateaux), 3), dtype=np.int64)
+        lignes = np.arange(nb)[:, None]
+        for b, bateau in enumerate(bateaux):
+            index = index_placements(BAT_CASES[bateau], n)
+            grilles[lignes, index.cases[choisis[:, b]]] = bateau
+            placements[:, b] = index.positions[choisis[:, b]]
+        return grilles.reshape(nb, n, n), placements
+
+    @classmethod
+    def depuis_tableaux(cls, grille: np.ndarray, placements: np.ndarray) -> Self:
+        """Crée une instance à partir d'une ligne des tableaux renvoyés par 'genere_grilles' (sans recopier la grille).
+
+        Args:
+            grille: Tableau int8 (n, n) de la grille.
+            placements: Tableau (5, 3) des triplets (ligne, col, direction), dans l'ordre de BAT_CASES.
+
+        Returns:
+            Une nouvelle instance de la classe dont le tableau 'grille' est 'grille'.
+        """
+
+        nouv_grille = cls(grille.shape[0])
+        nouv_grille.grille = grille
+        nouv_grille.bateaux_places = {bateau: tuple(pos) for bateau, pos in zip(BAT_CASES.keys(), placements.tolist())}
         return nouv_grille
 
     def retirer_bateau(self, bateau: int, position: tuple[int, int], direction: int) -> None:
@@ -231,6 +304,8 @@ class Grille:
             for i in range(ligne, ligne + taille_bat):
                 self.grille[i][col] = VIDE
 
+        self.bateaux_places.pop(bateau, None)
+
     def calc_nb_placements_bateau(self, bateau: int) -> int:
         """Calcule le nombre de placements possibles du bateau sur la grille vide.
 
@@ -261,34 +336,145 @@ class Grille:
             return 1  # configuration grille vide
 
         bateau = bateaux[0]
+        index = index_placements(BAT_CASES[bateau], self.n)
+        possibles = np.flatnonzero(index.legaux(self._cases_occupees()))
 
-        # On est au dernier bateau. Il suffit juste de calculer tous les placements possibles
+        # On est au dernier bateau. Il suffit juste de compter tous les placements possibles
         if (len(bateaux) == 1):
-            # Compteur temporaire pour compter le nombre de placements d'un bateau
-            count_tmp = 0
-            for i in range(self.n):
-                for j in range(self.n):
-                    for dir in {HOR, VER}:
-                        if self.peut_placer(bateau, (i, j), dir):
-                            count_tmp += 1
-            return count + count_tmp
+            return count + len(possibles)
 
         # Placer un bateau
-        for i in range(self.n):
-            for j in range(self.n):
-                for dir in {HOR, VER}:
-                    if self.peut_placer(bateau, (i, j), dir):
-                        # Placer le bateau
-                        self.place(bateau, (i, j), dir)
-                        # Passer aux bateaux restants
-                        count = self.calc_nb_placements_liste_bateaux(bateaux[1:], count)
-                        # Retirer le bateau placé
-                        self.retirer_bateau(bateau, (i, j), dir)
+        for ligne, col, dir in index.positions[possibles].tolist():
+            # Placer le bateau
+            self.place(bateau, (ligne, col), dir)
+            # Passer aux bateaux restants
+            count = self.calc_nb_placements_liste_bateaux(bateaux[1:], count)
+            # Retirer le bateau placé
+            self.retirer_bateau(bateau, (ligne, col), dir)
         return count
 
+    def calc_nb_configurations(self, bateaux: list[int]) -> int:
+        """Calcule le nombre de configurations possibles à partir de la grille courante (même résultat que
+            'calc_nb_placements_liste_bateaux', qui reste la méthode brute-force de référence).
+            Programmation dynamique case par case : un état est le masque des cases déjà occupées par les bateaux
+            posés, à partir de la case courante, et le nombre de bateaux restants de chaque taille.
+            Les états égaux sont fusionnés (mémoïsation), tous les états d'une case sont traités en lot avec numpy.
+            Chaque bateau est compté au moment où l'on passe sur sa première case.
+
+        Args:
+            bateaux: Une liste des bateaux à placer sur la grille.
+
+        Returns:
+            Le nombre des configurations possibles des bateaux.
+        """
+
+        if not bateaux:
+            return 1
+
+        n = self.n
+        tailles = sorted({BAT_CASES[bat] for bat in bateaux})
+        nb_tailles = [sum(1 for bat in bateaux if BAT_CASES[bat] == t) for t in tailles]
+
+        # Le masque d'un état est découpé en mots de 64 bits, le bit 0 du mot 0 est la case courante
+        nb_mots = ((max(tailles) - 1) * n + max(tailles)) // 64 + 1
+        masques = dict()
+        for k, taille in enumerate(tailles):
+            for dir, masque in ((HOR, (1 << taille) - 1), (VER, sum(1 << (i * n) for i in range(taille)))):
+                masques[(k, dir)] = np.array([(masque >> (64 * m)) & (2**64 - 1) for m in range(nb_mots)],
+                                             dtype=np.uint64)
+
+        # Placements possibles compte tenu des cases déjà occupées de la grille
+        occupees = self._cases_occupees()
+        possibles = set()
+        for k, taille in enumerate(tailles):
+            index = index_placements(taille, n)
+            for ligne, col, dir in index.positions[index.legaux(occupees)].tolist():
+                possibles.add((k, dir, ligne, col))
+
+        # Codage des restants sur bits_restants bits pour la clé de fusion simple
+        bits_par_taille = max(nb_tailles).bit_length()
+        bits_restants = np.uint64(bits_par_taille * len(tailles))
+        poids_restants = np.array([1 << (bits_par_taille * k) for k in range(len(tailles))], dtype=np.uint64)
+        cle_simple = (max(tailles) - 1) * n + max(tailles) + int(bits_restants) <= 64
+
+        # Entiers numpy si le nombre de configurations tient sur 63 bits, entiers Python sinon
+        dtype = dtype_configurations(bateaux, n)
+
+        etats_masques = np.zeros((1, nb_mots), dtype=np.uint64)
+        etats_restants = np.array([nb_tailles], dtype=np.int64)
+        nbs = np.array([1], dtype=dtype)
+        for ligne in range(n):
+            for col in range(n):
+                # La case courante est laissée vide (ou elle est déjà occupée)
+                nouv_masques = [etats_masques]
+                nouv_restants = [etats_restants]
+                nouv_nbs = [nbs]
+
+                # Un bateau commence sur la case courante
+                libre = (etats_masques[:, 0] & np.uint64(1)) == 0
+                for k in range(len(tailles)):
+                    for dir in (HOR, VER):
+                        if (k, dir, ligne, col) not in possibles:
+                            continue
+                        choix = libre & (etats_restants[:, k] > 0) & ~(etats_masques & masques[(k, dir)]).any(axis=1)
+                        if not choix.any():
+                            continue
+                        nouv_masques.append(etats_masques[choix] | masques[(k, dir)])
+                        restants = etats_restants[choix]
+                        # restants[k] bateaux distincts de cette taille peuvent être choisis
+                        nouv_nbs.append(nbs[choix] * restants[:, k].astype(dtype))
+                        restants[:, k] -= 1
+                        nouv_restants.append(restants)
+
+                # Passage à la case suivante : décalage du masque d'un bit
+                etats_masques = np.concatenate(nouv_masques)
+                decale = etats_masques >> np.uint64(1)
+                decale[:, :-1] |= etats_masques[:, 1:] << np.uint64(63)
+                etats_restants = np.concatenate(nouv_restants)
+                nbs = np.concatenate(nouv_nbs)
+
+                # Fusion des états égaux (tri sur une clé entière si le masque et les restants tiennent sur 64 bits)
+                if cle_simple:
+                    cles = (decale[:, 0] << bits_restants) | (etats_restants.astype(np.uint64) @ poids_restants)
+                    ordre = np.argsort(cles, kind="stable")
+                    cles = cles[ordre]
+                    debuts = np.flatnonzero(np.concatenate(([True], cles[1:] != cles[:-1])))
+                else:
+                    cles = np.concatenate((decale, etats_restants.astype(np.uint64)), axis=1)
+                    ordre = np.lexsort(cles.T[::-1])
+                    cles = cles[ordre]
+                    debuts = np.flatnonzero(np.concatenate(([True], (cles[1:] != cles[:-1]).any(axis=1))))
+                decale = decale[ordre]
+                etats_masques = decale[debuts]
+                etats_restants = etats_restants[ordre][debuts]
+                nbs = np.add.reduceat(nbs[ordre], debuts)
+
+        return int(nbs[(etats_restants == 0).all(axis=1)].sum())
+
+    def calc_proba_cases(self, bateau: int) -> np.ndarray:
+        """Calcule pour chaque case la probabilité qu'elle soit couverte par le bateau,
+            si le bateau est placé uniformément parmi ses placements possibles sur la grille courante.
+
+        Args:
+            bateau: Type du bateau (constante).
+
+        Returns:
+            Tableau (n, n) de probabilités. Rempli de 0 s'il n'existe aucun placement possible.
+        """
+
+        index = index_placements(BAT_CASES[bateau], self.n)
+        occupees = self._cases_occupees()
+        comptes = index.grille_comptes(occupees)
+        total = index.compte(occupees)
+        if total == 0:
+            return np.zeros((self.n, self.n), dtype=float)
+        return comptes / total
+
     def generer_meme_grille(self) -> int:
         """Génére aléatoirement des grilles avec 5 bateaux (un de chaque type) la grille de l'instance courante (self.grille).
             Hypothèse: self.grille ne contient que la liste des 5 bateaux, un de chaque type.
+            L'espérance du nombre de tirages (plusieurs milliards pour n = 10) est donnée exactement par
+            'calc_esperance_generer_meme_grille', sans tirage.
 
         Returns:
             Le nombre de tirages de grilles aléatoires jusqu'à obtenir la grille égale à self.grille
@@ -297,112 +483,142 @@ class Grille:
         # On tire au moins une fois
         count = 1
         # Générer la grille de meme taille que l'instance courante et remplie de 5 bateaux
-        grilleB = self.genere_grille(self.n)
+        grilleB = self.genere_grille(self.n, self.alea)
 
-        while (self._eq_dict_bateaux(grilleB) == False):
+        while (self.eq(grilleB) == False):
             count += 1
-            grilleB = self.genere_grille(self.n)
+            grilleB = self.genere_grille(self.n, self.alea)
         return count
 
-    def _choisir_max_pos(self, pos_cour: tuple[int, int], max_cour: int,
-                         pos_nouv: tuple[int, int], grille_ps: np.ndarray) -> tuple[int, tuple[int, int]]:
-        """Choisit la position (ligne, col) telle que grille_ps[ligne][col] contient le nombre maximal 
-            parmi toutes les autres cases. Fonction auxilière pour 'calc_nb_placements'.
+    @classmethod
+    def calc_esperances_tirages(cls, n: int, placements: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Calcule exactement, pour un lot de grilles cibles, la probabilité que 'genere_grille' produise chaque grille
+            et l'espérance du nombre de tirages de 'generer_meme_grille'.
+            'place_alea' place les bateaux dans l'ordre de BAT_CASES, chacun uniformément parmi ses L placements
+            possibles compte tenu des bateaux déjà placés : la probabilité d'une grille est le produit des 1 / L,
+            et le nombre de tirages suit une loi géométrique d'espérance produit des L.
 
         Args:
-            pos_cour: position (ligne, col) sur la grille telle que grille_ps[ligne][col] = le nombre maximal
-                (avant MAJ de la grille)
-            max_cour: le nombre maximal (avant MAJ de la grille)
-            pos_nouv: position (ligne, col) sur la grille avec laquelle il faudra choisir le nouveau nombre maximal.
-            grille_ps: grille-probabilité associée à un bateau.
+            n: Taille des grilles.
+            placements: Tableau (nb, 5, 3) des triplets (ligne, col, direction) de chaque bateau, dans l'ordre de
+                BAT_CASES (format de 'genere_grilles').
 
         Returns:
-            La position P sur la grille. P = pos_nouv si max_cour n'est plus le maximum. Sinon, P = pos_cour.
+            - Tableau float (nb,) des probabilités (0 si la grille ne peut pas être produite).
+            - Tableau (nb,) des espérances du nombre de tirages, entières et exactes (0 si la grille ne peut pas
+                être produite). En int64 si elles tiennent sur 63 bits, en entiers Python sinon.
         """
 
-        ligne, col = pos_nouv
-        val_grille = grille_ps[ligne][col]
-        if val_grille > max_cour:
-            return val_grille, pos_nouv
-        return max_cour, pos_cour
+        bateaux = list(BAT_CASES.keys())
+        placements = np.asarray(placements, dtype=np.int64).reshape(-1, len(bateaux), 3)
+        nb = len(placements)
+
+        # Entiers numpy si le produit des nombres de placements tient sur 63 bits, entiers Python sinon
+        esperances = np.ones(nb, dtype=dtype_configurations(bateaux, n))
+
+        occupees = np.zeros((nb, n * n), dtype=bool)
+        valides = np.ones(nb, dtype=bool)
+        lignes = np.arange(nb)
+        for b, bateau in enumerate(bateaux):
+            index = index_placements(BAT_CASES[bateau], n)
+            choisis = index.indices(placements[:, b])
+            valides &= choisis >= 0
+            choisis[~valides] = 0
+
+            # L : nombre de placements possibles du bateau, le placement cible doit en faire partie
+            esperances *= (~occupees[:, index.cases].any(axis=2)).sum(axis=1)
+            valides &= ~occupees[lignes[:, None], index.cases[choisis]].any(axis=1)
+            occupees[lignes[valides, None], index.cases[choisis[valides]]] = True
+
+        esperances[~valides] = 0
+        probas = np.zeros(nb, dtype=float)
+        probas[valides] = 1 / esperances[valides].astype(float)
+        return probas, esperances
+
+    def calc_esperance_generer_meme_grille(self) -> tuple[float, int]:
+        """Calcule exactement la probabilité que 'genere_grille' produise la grille de l'instance et l'espérance du
+            nombre de tirages de 'generer_meme_grille' (voir 'calc_esperances_tirages').
+            Hypothèse: self.grille ne contient que la liste des 5 bateaux, un de chaque type.
 
-    def _maj_nb_placements(self, bateau: int, position: tuple[int, int], dir: int, grille_ps: np.ndarray) -> tuple[int, int]:
-        """MAJ de la grille-probabilité pour un bateau qui peut être placé sur la position donnée.
-            Fonction auxiliaire pour 'calc_nb_placements'.
+        Returns:
+            La probabilité et l'espérance (0 si la grille ne peut pas être produite).
+        """
+
+        if any(bateau not in self.bateaux_places for bateau in BAT_CASES):
+            return 0.0, 0
+        placements = np.array([self.bateaux_places[bateau] for bateau in BAT_CASES])
+        probas, esperances = self.calc_esperances_tirages(self.n, placements[None])
+        return float(probas[0]), int(esperances[0])
+
+    def estimer_proba_generation(self, nb_echantillons: int = 10000, alpha: float = 0.5) -> tuple[float, float]:
+        """Estime par échantillonnage préférentiel la probabilité que 'genere_grille' produise la grille de l'instance,
+            pour valider 'calc_esperance_generer_meme_grille' sans la boucle de 'generer_meme_grille'.
+            Les bateaux sont placés dans l'ordre de BAT_CASES. Tant que les bateaux précédents sont sur la cible, un
+            bateau est mis sur son placement cible avec la probabilité alpha, sinon il est tiré uniformément parmi ses
+            L placements possibles comme dans 'place_alea'. Un échantillon qui reproduit la grille a le poids
+            produit des (1 / L) / (alpha + (1 - alpha) / L), les autres ont le poids 0.
+            Hypothèse: self.grille ne contient que la liste des 5 bateaux, un de chaque type.
 
         Args:
-            bateau: Type du bateau (constante).
-            position: Position (ligne, colonne) sur la grille. Le placement du bateau sur cette position doit être possible.
-            direction: Direction (constante) dans laquelle placer le bateau.
-            grille_ps: Grille-probablité associée à un bateau donné.
+            nb_echantillons: Nombre d'échantillons. Default = 10000.
+            alpha: Probabilité de forcer le placement cible. Default = 0.5 (0 donne l'estimateur direct).
 
         Returns:
-            La position (ligne, col) sur la grille telle que grille_ps[ligne][col] contient le nombre maximal
-                parmi les cases mises à jour.
+            L'estimation de la probabilité et la demi-largeur de son intervalle de confiance à 95 %.
         """
 
-        ligne, col = position
-        taille = BAT_CASES[bateau]
-        # Pour calculer le nb des cases BAT_TOUCHE que la position du bateau touche
-        nb_cases_bat_touche = 0
-
-        val_max = -1
-        pos_max = (-1, -1)
-        if dir == HOR:
-            for j in range(col, col + taille):
-                # Calcule du nombre des cases BAT_TOUCHE
-                if self.grille[ligne][j] == BAT_TOUCHE:
-                    nb_cases_bat_touche += 1
-                else:
-                    grille_ps[ligne][j] += 1
-                    val_max, pos_max = self._choisir_max_pos(pos_max, val_max, (ligne, j), grille_ps)
-
-            # Augmenter les probas
-            if nb_cases_bat_touche:
-                for j in range(col, col + taille):
-                    if not self.grille[ligne][j] == BAT_TOUCHE:
-                        grille_ps[ligne][j] += nb_cases_bat_touche
-                    val_max, pos_max = self._choisir_max_pos(pos_max, val_max, (ligne, j), grille_ps)
-
-        if dir == VER:
-            for i in range(ligne, ligne+taille):
-                # Calcule du nombre des cases BAT_TOUCHE
-                if self.grille[i][col] == BAT_TOUCHE:
-                    nb_cases_bat_touche += 1
-                else:
-                    grille_ps[i][col] += 1
-                    val_max, pos_max = self._choisir_max_pos(pos_max, val_max, (i, col), grille_ps)
-
-            # Augmenter les probas
-            if nb_cases_bat_touche:
-                for i in range(ligne, ligne+taille):
-                    if not self.grille[i][col] == BAT_TOUCHE:
-                        grille_ps[i][col] += nb_cases_bat_touche
-                    val_max, pos_max = self._choisir_max_pos(pos_max, val_max, (i, col), grille_ps)
-        return pos_max
+        rng = self.alea.generateur
+        occupees = np.zeros(self.n * self.n, dtype=bool)
+        sur_cible = np.ones(nb_echantillons, dtype=bool)
+        poids = 1.0
+        for bateau in BAT_CASES:
+            if bateau not in self.bateaux_places:
+                return 0.0, 0.0
+            index = index_placements(BAT_CASES[bateau], self.n)
+            possibles = np.flatnonzero(index.legaux(occupees))
+            cible = int(index.indices(np.array(self.bateaux_places[bateau])))
+            if cible not in possibles:
+                return 0.0, 0.0
+
+            # Proposition : la cible avec la probabilité alpha, sinon un placement possible uniforme
+            force = rng.random(nb_echantillons) < alpha
+            tirages = possibles[rng.integers(0, len(possibles), size=nb_echantillons)]
+            sur_cible &= force | (tirages == cible)
+            poids *= (1 / len(possibles)) / (alpha + (1 - alpha) / len(possibles))
+            occupees[index.cases[cible]] = True
+
+        valeurs = poids * sur_cible
+        demi_largeur = 1.96 * valeurs.std(ddof=1) / np.sqrt(nb_echantillons) if nb_echantillons > 1 else 0.0
+        return float(valeurs.mean()), float(demi_largeur)
 
     def calc_nb_placements(self, bateau: int, grille_ps: np.ndarray) -> tuple[int, int]:
         """MAJ de la grille-probabilité. La fonction calcule toutes les configurations possibles. 
             Fonction auxiliaire 'Joueur.jouer_proba_simple'. 
+            Chaque placement possible ajoute 1 + (nombre de cases BAT_TOUCHE couvertes) à ses cases non BAT_TOUCHE,
+            les placements sont trouvés par fenêtres glissantes (voir 'placements.comptes_placements').
+            Les calculs sont faits dans les tableaux de travail de la grille : aucun tableau n'est alloué par appel.
 
         Args:
             bateau: Type du bateau (constante).
-            grille_ps: Grille-probabilité. Toutes ces valeurs doivent être à 0.
+            grille_ps: Grille-probabilité. Elle est entièrement réécrite.
 
         Returns:
             La position (ligne, col) sur la grille telle que grille_ps[ligne][col] contient le nombre maximal
-                parmi toutes ces autres cases.
+                parmi toutes ces autres cases. (-1, -1) s'il n'existe aucun placement possible.
         """
 
-        mx = -1
-        pos_max = (-1, -1)
-        for i in range(self.n):
-            for j in range(self.n):
-                for dir in {VER, HOR}:
-                    if self.peut_placer(bateau, (i, j), dir, proba_simple=True):
-                        pos_nouv = self._maj_nb_placements(bateau, (i, j), dir, grille_ps)
-                        mx, pos_max = self._choisir_max_pos(pos_max, mx, pos_nouv, grille_ps)
-        return pos_max
+        if self._espace_comptes is None:
+            self._espace_comptes = EspaceComptes(self.grille.shape)
+        espace = self._espace_comptes
+        # Cases occupées sauf BAT_TOUCHE (même résultat que _cases_occupees(proba_simple=True), sans tableau temporaire)
+        np.equal(self.grille, BAT_TOUCHE, out=espace.touchees)
+        self._cases_occupees(out=espace.bloquees)
+        np.logical_xor(espace.bloquees, espace.touchees, out=espace.bloquees)
+        comptes_placements(espace.bloquees, espace.touchees, BAT_CASES[bateau], out=grille_ps, espace=espace)
+        ligne, col = divmod(int(np.argmax(grille_ps)), self.n)
+        if grille_ps[ligne, col] <= 0:
+            return (-1, -1)
+        return (ligne, col)
 
 
 if __name__ == "__main__":
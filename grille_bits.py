@@ -0,0 +1,360 @@
+from functools import lru_cache
+from time import time
+from typing import Dict
+import numpy as np
+from grille import Grille
+from bataille import Bataille
+from alea import Alea
+from constants import *
+
+
+@lru_cache(maxsize=None)
+def _masques_bateau(taille: int, n: int) -> Dict[tuple[int, int, int], int]:
+    """Précalcule les masques (entiers) de tous les placements d'un bateau de taille donnée dans la grille n x n.
+        La case (ligne, col) correspond au bit ligne * n + col.
+
+    Args:
+        taille: Taille du bateau (nombre de cases).
+        n: Taille d'un côté de la grille.
+
+    Returns:
+        Dictionnaire associant au triplet (ligne, col, direction) le masque des cases couvertes par le bateau.
+            Les placements qui sortent de la grille ne sont pas stockés.
+    """
+
+    masques = dict()
+    ligne_bat = (1 << taille) - 1
+    colonne_bat = sum(1 << (k * n) for k in range(taille))
+    for ligne in range(n):
+        for col in range(n):
+            decalage = ligne * n + col
+            if col + taille <= n:
+                masques[(ligne, col, HOR)] = ligne_bat << decalage
+            if ligne + taille <= n:
+                masques[(ligne, col, VER)] = colonne_bat << decalage
+    return masques
+
+
+@lru_cache(maxsize=None)
+def _debuts_bateau(taille: int, n: int) -> tuple[int, int]:
+    """Renvoie les masques des cases où peut commencer un bateau de taille donnée dans la grille n x n vide,
+        en direction HOR puis en direction VER.
+    """
+
+    debuts_hor = sum(1 << (ligne * n + col) for ligne in range(n) for col in range(n - taille + 1))
+    debuts_ver = sum(1 << (ligne * n + col) for ligne in range(n - taille + 1) for col in range(n))
+    return debuts_hor, debuts_ver
+
+
+def _kieme_placement(legaux_hor: int, legaux_ver: int, k: int, nb_cases: int) -> tuple[int, int]:
+    """Trouve le k-ième placement (à partir de 0) dans l'ordre de 'index_placements' (case de début croissante,
+        HOR avant VER) parmi les cases de début données. Recherche dichotomique sur le nombre de placements avant
+        une case.
+
+    Args:
+        legaux_hor: Masque des cases de début des placements HOR.
+        legaux_ver: Masque des cases de début des placements VER.
+        k: Rang du placement. Hypothèse: k < nombre de placements.
+        nb_cases: Nombre de cases de la grille.
+
+    Returns:
+        La case de début et la direction du placement.
+    """
+
+    # Plus grande case c telle que le nombre de placements avant c soit <= k
+    bas, haut = 0, nb_cases
+    while haut - bas > 1:
+        milieu = (bas + haut) // 2
+        avant = (1 << milieu) - 1
+        if (legaux_hor & avant).bit_count() + (legaux_ver & avant).bit_count() <= k:
+            bas = milieu
+        else:
+            haut = milieu
+
+    avant = (1 << bas) - 1
+    reste = k - (legaux_hor & avant).bit_count() - (legaux_ver & avant).bit_count()
+    if legaux_hor >> bas & 1 and reste == 0:
+        return bas, HOR
+    return bas, VER
+
+
+class GrilleBits(Grille):
+    """Grille dont l'état est stocké dans des masques de bits (un entier Python par plan).
+        Les plans sont la seule source de vérité des opérations fréquentes (placements, tirs, victoire) : les tirs
+        n'écrivent pas dans le tableau 'grille', ils ajoutent la case à 'ecritures', appliquées à la prochaine lecture
+        de 'grille'. L'API de Grille est donc conservée.
+    """
+
+    def __init__(self, n: int, rng: Alea | np.random.Generator | int | None = None):
+        super().__init__(n, rng)
+
+        # Plans de bits : cases contenant un bateau non touché, cases BAT_TOUCHE, cases RATE
+        self.bateaux: int = 0
+        self.touche: int = 0
+        self.rate: int = 0
+
+        # Dict qui associe au type du bateau le masque des cases qu'il occupe
+        self.masques_places: Dict[int, int] = dict()
+
+    @property
+    def grille(self) -> np.ndarray:
+        """Tableau (n, n) de la grille, après application des écritures en attente."""
+
+        if self.ecritures:
+            plat = self._grille.reshape(-1)
+            for case, valeur in self.ecritures:
+                plat[case] = valeur
+            self.ecritures.clear()
+        return self._grille
+
+    @grille.setter
+    def grille(self, grille: np.ndarray) -> None:
+        # Écritures (case, valeur) pas encore faites dans le tableau, gardées si le tableau ne change pas
+        if grille is not getattr(self, "_grille", None):
+            self.ecritures: list[tuple[int, int]] = []
+        self._grille = grille
+
+    @classmethod
+    def depuis_tableaux(cls, grille: np.ndarray, placements: np.ndarray) -> "GrilleBits":
+        """Crée une instance à partir d'une ligne des tableaux renvoyés par 'genere_grilles' (voir
+            'Grille.depuis_tableaux') et construit les plans de bits à partir des placements.
+
+        Args:
+            grille: Tableau int8 (n, n) de la grille.
+            placements: Tableau (5, 3) des triplets (ligne, col, direction), dans l'ordre de BAT_CASES.
+
+        Returns:
+            Une nouvelle instance de GrilleBits dont le tableau 'grille' est 'grille'.
+        """
+
+        nouv_grille = super().depuis_tableaux(grille, placements)
+        for bateau, position in nouv_grille.bateaux_places.items():
+            masque = _masques_bateau(BAT_CASES[bateau], nouv_grille.n)[position]
+            nouv_grille.bateaux |= masque
+            nouv_grille.masques_places[bateau] = masque
+        return nouv_grille
+
+    def _bit(self, position: tuple[int, int]) -> int:
+        """Renvoie le masque de la case à la position donnée."""
+
+        ligne, col = position
+        return 1 << (ligne * self.n + col)
+
+    def peut_placer(self, bateau: int, position: tuple[int, int], direction: int, proba_simple: bool = False) -> bool:
+        """Vérifie s'il est possible de placer le bateau à la position dans la direction donnée sur la grille.
+            Même sémantique que Grille.peut_placer, mais un seul ET entre masques.
+
+        Args:
+            bateau: Type du bateau (constante).
+            position: (ligne, colonne) indique la position sur la grille à laquelle placer la bateau.
+            direction: Direction (constante) dans laquelle placer le bateau.
+            proba_simple: True si la stratégie (ver. proba simple) est utilisée, i.e. les cases BAT_TOUCHE sont libres.
+
+        Returns:
+            bool: True si le placement est possible, False sinon.
+        """
+
+        ligne, col = position
+        masque = _masques_bateau(BAT_CASES[bateau], self.n).get((ligne, col, direction))
+        if masque is None:
+            return False
+
+        if proba_simple:
+            return not masque & (self.bateaux | self.rate)
+        return not masque & (self.bateaux | self.touche | self.rate)
+
+    def place_alea(self, bateau: int) -> None:
+        """Place le bateau aléatoirement dans la grille. Même tirage que 'Grille.place_alea' (même ordre des
+            placements, même appel à randint), mais sans lire le tableau 'grille' : les cases de début possibles
+            sont les cases de début dans la grille vide dont aucune des cases suivantes n'est occupée (décalages).
+
+        Args:
+            bateau: Type du bateau (constante).
+        """
+
+        taille = BAT_CASES[bateau]
+        debuts_hor, debuts_ver = _debuts_bateau(taille, self.n)
+        occupees = self.bateaux | self.touche | self.rate
+        bloquees_hor, bloquees_ver = occupees, occupees
+        for k in range(1, taille):
+            bloquees_hor |= occupees >> k
+            bloquees_ver |= occupees >> (k * self.n)
+        legaux_hor, legaux_ver = debuts_hor & ~bloquees_hor, debuts_ver & ~bloquees_ver
+
+        nb_legaux = legaux_hor.bit_count() + legaux_ver.bit_count()
+        case, direction = _kieme_placement(legaux_hor, legaux_ver, self.alea.randint(0, nb_legaux - 1), self.n * self.n)
+        self.place(bateau, divmod(case, self.n), direction)
+
+    def place(self, bateau: int, position: tuple[int, int], direction: int) -> None:
+        """Place la bateau sur la grille à la position et en direction données.
+            Attention : le placement doit être possible.
+
+        Args:
+            bateau: Type du bateau (constante).
+            position: (ligne, colonne) indique la position sur la grille à laquelle placer la bateau.
+            direction: Direction (constante) dans laquelle placer le bateau.
+        """
+
+        ligne, col = position
+        taille_bat = BAT_CASES[bateau]
+        masque = _masques_bateau(taille_bat, self.n)[(ligne, col, direction)]
+
+        self.bateaux |= masque
+        self.touche &= ~masque
+        self.rate &= ~masque
+
+        if direction == HOR:
+            self.grille[ligne, col:col + taille_bat] = bateau
+        if direction == VER:
+            self.grille[ligne:ligne + taille_bat, col] = bateau
+
+        self.bateaux_places[bateau] = (ligne, col, direction)
+        self.masques_places[bateau] = masque
+
+    def retirer_bateau(self, bateau: int, position: tuple[int, int], direction: int) -> None:
+        """Retire le bateau de la grille.
+
+        Args:
+            bateau: Type du bateau (constante).
+            position: (ligne, colonne) indique la position sur la grille à laquelle placer la bateau.
+            direction: Direction (constante) dans laquelle placer le bateau.
+        """
+
+        ligne, col = position
+        taille_bat = BAT_CASES[bateau]
+        masque = _masques_bateau(taille_bat, self.n)[(ligne, col, direction)]
+
+        self.bateaux &= ~masque
+        self.touche &= ~masque
+        self.rate &= ~masque
+
+        if direction == HOR:
+            self.grille[ligne, col:col + taille_bat] = VIDE
+        if direction == VER:
+            self.grille[ligne:ligne + taille_bat, col] = VIDE
+
+        self.bateaux_places.pop(bateau, None)
+        self.masques_places.pop(bateau, None)
+
+    def marque_case(self, position: tuple[int, int], valeur: int) -> None:
+        """Écrit la valeur (BAT_TOUCHE, RATE, VIDE ou type du bateau) dans la case de la grille.
+
+        Args:
+            position: (ligne, colonne) de la case à modifier.
+            valeur: Nouvelle valeur de la case.
+        """
+
+        bit = self._bit(position)
+        self.bateaux &= ~bit
+        self.touche &= ~bit
+        self.rate &= ~bit
+
+        if valeur == BAT_TOUCHE:
+            self.touche |= bit
+        elif valeur == RATE:
+            self.rate |= bit
+        elif valeur > VIDE:
+            self.bateaux |= bit
+
+        super().marque_case(position, valeur)
+
+
+class BatailleBits(Bataille):
+    """Bataille sur une GrilleBits : tirs, bateaux coulés et victoire calculés sur les masques."""
+
+    def __init__(self, grille: GrilleBits):
+        super().__init__(grille)
+
+    def _init_compteurs(self) -> None:
+        """Initialise les compteurs des cases non touchées de chaque bateau, comptés sur les masques."""
+
+        self.cases_restantes: Dict[int, int] = {bateau: (masque & self.plat.bateaux).bit_count()
+                                                for bateau, masque in self.plat.masques_places.items()}
+        self.nb_cases_restantes: int = sum(self.cases_restantes.values())
+
+    def _bateau_case(self, case: int) -> int:
+        """Renvoie le type du bateau non touché de la case, trouvé avec les masques des bateaux placés."""
+
+        bit = 1 << case
+        for bateau, masque in self.plat.masques_places.items():
+            if masque & bit:
+                return bateau
+        # Case bateau écrite sans placement ('marque_case')
+        return int(self.plat.grille.reshape(-1)[case])
+
+    def joue_coule(self, position: tuple[int, int]) -> tuple[int, int]:
+        """Joue la case de la grille à la position. Si il y avait un bateau, alors case = BAT_TOUCHE, sinon case = RATE.
+
+        Args:
+            position: (ligne, col) qui désigne la case sur la grille à jouer.
+
+        Returns:
+            Le résultat du tir (BAT_TOUCHE ou RATE) et le type du bateau coulé par ce tir, -1 si aucun.
+        """
+
+        ligne, col = position
+        plat = self.plat
+        case = ligne * plat.n + col
+        bit = 1 << case
+
+        if plat.bateaux & bit:
+            plat.bateaux ^= bit
+            plat.touche |= bit
+            plat.ecritures.append((case, BAT_TOUCHE))
+            return BAT_TOUCHE, self._maj_compteurs(self._bateau_case(case))
+
+        if not (plat.touche | plat.rate) & bit:
+            plat.rate |= bit
+            plat.ecritures.append((case, RATE))
+            return RATE, -1
+
+        # Case déjà tirée (BAT_TOUCHE ou RATE) : elle devient BAT_TOUCHE, aucun bateau touché
+        plat.rate &= ~bit
+        plat.touche |= bit
+        plat.ecritures.append((case, BAT_TOUCHE))
+        return BAT_TOUCHE, -1
+
+    def _bateau_coule(self, bateau: int) -> bool:
+        """Vérifie si le bateau donné a été coulé.
+
+        Args:
+            bateau : Type du bateau (constante).
+
+        Returns:
+            Un booléen True si le bateau a été coulé. Sinon, False.
+        """
+
+        masque = self.plat.masques_places[bateau]
+        return self.plat.touche & masque == masque
+
+    def victoire(self) -> bool:
+        """Vérifie si tous les bateaux ont été coulés, i.e. s'il ne reste aucune case bateau non touchée.
+
+        Return:
+            Un booléen True s'il n y a plus des bateaux restants. Sinon, False.
+        """
+
+        return self.plat.bateaux == 0
+
+    def reset(self) -> None:
+        """Commence le jeu depuis le début. Recommence sur la même grille, mais avec les bateaux sans avarie."""
+
+        self.plat.bateaux = 0
+        self.plat.touche = 0
+        self.plat.rate = 0
+        super().reset()
+
+
+if __name__ == "__main__":
+    # Comparaison du nombre de jeux par seconde entre les deux moteurs
+    from Joueur import Joueur
+
+    nb_jeux = 200
+    for nom, cls_grille, cls_bataille in [("numpy", Grille, Bataille), ("bits", GrilleBits, BatailleBits)]:
+        joueur = Joueur(nom, cls_grille, cls_bataille)
+        for strategie in [joueur.jouer, joueur.jouer_heuristique]:
+            debut = time()
+            for _ in range(nb_jeux):
+                strategie(10)
+            duree = time() - debut
+            print(f"{nom:6} {strategie.__name__:18} {nb_jeux / duree:8.1f} jeux/s")
@@ -0,0 +1,125 @@
+import numpy as np
+from grille import Grille
+from placements import cles_placements
+
+
+class IndexGrilles:
+    """Index des grilles générées, par clé canonique (voir 'Grille.cle').
+        Les clés distinctes sont gardées triées avec leur nombre d'occurrences,
+        on peut donc compter les doublons et chercher une grille sans parcourir les grilles.
+        Les clés ajoutées une à une ('ajouter') sont mises en attente et fusionnées par lot.
+    """
+
+    # Nombre de clés en attente au-delà duquel elles sont fusionnées
+    TAILLE_ATTENTE = 4096
+
+    def __init__(self, n: int):
+        self.n: int = n
+        bits = (2 * n * n).bit_length()
+        self.dtype = np.uint64 if 5 * bits <= 64 else object
+
+        # Clés distinctes triées et nombre d'occurrences de chaque clé
+        self.cles: np.ndarray = np.empty(0, dtype=self.dtype)
+        self.nbs: np.ndarray = np.empty(0, dtype=np.int64)
+        self.total: int = 0
+        # Clés ajoutées une à une, pas encore fusionnées
+        self.attente: list = []
+
+    def ajouter_lot(self, placements: np.ndarray) -> None:
+        """Ajoute un lot de grilles à l'index.
+
+        Args:
+            placements: Tableau (nb, 5, 3) des placements des bateaux (voir 'Grille.genere_grilles').
+        """
+
+        self._vider_attente()
+        self._fusionner(cles_placements(placements, self.n))
+
+    def ajouter(self, grille: Grille) -> None:
+        """Ajoute une grille à l'index, avec sa clé 'Grille.cle' (même clé que dans 'ajouter_lot').
+
+        Args:
+            grille: Grille de taille n.
+        """
+
+        self.attente.append(grille.cle())
+        if len(self.attente) >= self.TAILLE_ATTENTE:
+            self._vider_attente()
+
+    def _vider_attente(self) -> None:
+        """Fusionne les clés en attente avec les clés déjà présentes."""
+
+        if self.attente:
+            cles = np.array(self.attente, dtype=self.dtype)
+            self.attente.clear()
+            self._fusionner(cles)
+
+    def _fusionner(self, cles: np.ndarray) -> None:
+        """Fusionne un lot de clés (une par grille) avec les clés déjà présentes, sans retrier l'index.
+
+        Args:
+            cles: Tableau des clés du lot, dans un ordre quelconque.
+        """
+
+        self.total += len(cles)
+        cles, nbs = np.unique(cles.astype(self.dtype), return_counts=True)
+
+        # Position de chaque clé du lot dans l'index trié : clés déjà présentes ou à insérer
+        pos = np.searchsorted(self.cles, cles)
+        presentes = pos < len(self.cles)
+        presentes[presentes] = self.cles[pos[presentes]] == cles[presentes]
+
+        self.nbs[pos[presentes]] += nbs[presentes]
+        nouvelles = ~presentes
+        self.cles = np.insert(self.cles, pos[nouvelles], cles[nouvelles])
+        self.nbs = np.insert(self.nbs, pos[nouvelles], nbs[nouvelles])
+
+    def compte(self, cle: int) -> int:
+        """Renvoie le nombre d'occurrences de la clé dans l'index.
+
+        Args:
+            cle: Clé canonique d'une grille (voir 'Grille.cle').
+
+        Returns:
+            Le nombre de grilles de l'index ayant cette clé.
+        """
+
+        self._vider_attente()
+        i = np.searchsorted(self.cles, self.dtype(cle) if self.dtype is np.uint64 else cle)
+        if i < len(self.cles) and self.cles[i] == cle:
+            return int(self.nbs[i])
+        return 0
+
+    def __contains__(self, grille: Grille) -> bool:
+        return self.compte(grille.cle()) > 0
+
+    def nb_distinctes(self) -> int:
+        """Renvoie le nombre de grilles distinctes de l'index."""
+
+        self._vider_attente()
+        return len(self.cles)
+
+    def nb_doublons(self) -> int:
+        """Renvoie le nombre de grilles ajoutées qui étaient déjà dans l'index."""
+
+        self._vider_attente()
+        return self.total - len(self.cles)
+
+    def histogramme_occurrences(self) -> np.ndarray:
+        """Calcule l'histogramme des nombres d'occurrences, pour évaluer l'uniformité du générateur.
+
+        Returns:
+            Tableau h tel que h[k] = nombre de grilles distinctes vues exactement k fois.
+        """
+
+        self._vider_attente()
+        return np.bincount(self.nbs)
+
+
+if __name__ == "__main__":
+    index = IndexGrilles(10)
+    rng = np.random.default_rng()
+    for _ in range(10):
+        _, placements = Grille.genere_grilles(10, 100000, rng)
+        index.ajouter_lot(placements)
+    print("grilles :", index.total, "distinctes :", index.nb_distinctes(), "doublons :", index.nb_doublons())
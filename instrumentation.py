@@ -0,0 +1,328 @@
+import inspect
+import json
+import threading
+from contextlib import contextmanager
+from functools import wraps
+from time import perf_counter, time
+from typing import Callable, Iterator
+import numpy as np
+from grille import Grille
+from bataille import Bataille
+from grille_bits import GrilleBits, BatailleBits
+from placements import ProbaSimpleIncrementale
+from monte_carlo import EchantillonsFlotte
+from Joueur import Joueur
+
+# Méthodes instrumentées (compteur d'appels et durée cumulée) : classe -> noms des méthodes.
+# Une méthode n'est remplacée que dans la classe qui la définit, les sous-classes qui la redéfinissent sont listées à part.
+CIBLES = {
+    Grille: ["peut_placer", "place", "place_alea", "genere_grille", "genere_grilles", "calc_nb_placements",
+             "calc_nb_placements_liste_bateaux", "calc_nb_configurations"],
+    GrilleBits: ["peut_placer", "place"],
+    Bataille: ["joue_coule", "bateaux_coules", "victoire"],
+    BatailleBits: ["joue_coule", "victoire"],
+    ProbaSimpleIncrementale: ["tir", "coule", "pos_max"],
+    EchantillonsFlotte: ["completer", "observer", "choisir"],
+}
+
+# Bornes (en secondes) des classes de l'histogramme de latence par tour : 1 µs, 2 µs, 4 µs, ... ~ 8 s
+BORNES_TOUR = 1e-6 * 2.0 ** np.arange(24)
+
+# Mode d'une stratégie selon ses arguments, pour séparer ses histogrammes :
+# nom de la stratégie -> (paramètre booléen, mode si vrai, mode si faux)
+MODES = {"jouer_proba_simple": ("incremental", "incremental", "complet")}
+
+# Méthodes d'origine des méthodes remplacées : (classe, nom) -> attribut d'origine (tel que dans __dict__)
+_originaux: dict[tuple[type, str], object] = dict()
+
+
+class _Mesures:
+    """Mesures d'un thread : écrites sans verrou par ce seul thread, fusionnées à l'export (voir 'mesures')."""
+
+    def __init__(self):
+        # Nom de la fonction -> [nombre d'appels, durée cumulée]
+        self.appels: dict[str, list] = dict()
+        # (stratégie, mode) -> compteurs de l'histogramme et durée cumulée des tours
+        self.tours: dict[tuple[str, str], np.ndarray] = dict()
+        self.duree_tours: dict[tuple[str, str], float] = dict()
+
+
+# Mesures de chaque thread, dans l'ordre de création (un verrou seulement à l'enregistrement d'un nouveau thread)
+_mesures_threads: list[_Mesures] = []
+_verrou_threads = threading.Lock()
+
+# État propre à chaque thread : ses mesures, stratégie (et mode) du jeu en cours, son histogramme et instant du dernier tir
+# (pour la latence par tour), profondeur d'appel de chaque fonction mesurée (seul l'appel le plus externe est chronométré)
+_local = threading.local()
+
+
+def _etat() -> threading.local:
+    """Renvoie l'état du thread courant, initialisé (et ses mesures enregistrées) au premier appel dans ce thread."""
+
+    if not hasattr(_local, "strategie"):
+        _local.mesures = _Mesures()
+        with _verrou_threads:
+            _mesures_threads.append(_local.mesures)
+        _local.strategie = None
+        _local.hist = None
+        _local.dernier_tir = 0.0
+        _local.profondeurs = dict()
+    return _local
+
+
+def _mode(nom: str, signature: inspect.Signature | None, args: tuple, kwargs: dict) -> str:
+    """Renvoie le mode de l'appel de la stratégie (voir MODES), "" si la stratégie n'a pas de mode."""
+
+    if signature is None:
+        return ""
+    parametre, si_vrai, si_faux = MODES[nom]
+    arguments = signature.bind(*args, **kwargs)
+    arguments.apply_defaults()
+    return si_vrai if arguments.arguments[parametre] else si_faux
+
+
+def _mesure(nom: str, fonction: Callable) -> Callable:
+    """Enveloppe la fonction : compte ses appels et cumule leur durée sous le nom donné.
+        Pour une fonction récursive, tous les appels sont comptés mais seul l'appel le plus externe est chronométré
+        (la durée des appels imbriqués est déjà dans la sienne).
+    """
+
+    @wraps(fonction)
+    def envelopper(*args, **kwargs):
+        etat = _etat()
+        mesure = etat.mesures.appels.get(nom)
+        if mesure is None:
+            mesure = etat.mesures.appels[nom] = [0, 0.0]
+        profondeurs = etat.profondeurs
+        profondeur = profondeurs.get(nom, 0)
+        profondeurs[nom] = profondeur + 1
+        debut = perf_counter()
+        try:
+            return fonction(*args, **kwargs)
+        finally:
+            profondeurs[nom] = profondeur
+            mesure[0] += 1
+            if profondeur == 0:
+                mesure[1] += perf_counter() - debut
+    return envelopper
+
+
+def _mesure_tir(fonction: Callable) -> Callable:
+    """Enveloppe 'joue_coule' : la latence d'un tour est la durée depuis le tir précédent du jeu (ou le début du jeu)."""
+
+    @wraps(fonction)
+    def envelopper(*args, **kwargs):
+        resultat = fonction(*args, **kwargs)
+        etat = _etat()
+        if etat.strategie is not None:
+            maintenant = perf_counter()
+            latence = maintenant - etat.dernier_tir
+            etat.hist[min(np.searchsorted(BORNES_TOUR, latence), len(BORNES_TOUR))] += 1
+            etat.mesures.duree_tours[etat.strategie] += latence
+            etat.dernier_tir = maintenant
+        return resultat
+    return envelopper
+
+
+def _mesure_strategie(nom: str, fonction: Callable) -> Callable:
+    """Enveloppe une stratégie de Joueur : les tirs faits pendant l'appel (dans le même thread) sont comptés dans
+        l'histogramme de la stratégie et de son mode (voir MODES).
+    """
+
+    signature = inspect.signature(fonction) if nom in MODES else None
+
+    @wraps(fonction)
+    def envelopper(*args, **kwargs):
+        etat = _etat()
+        cle = (nom, _mode(nom, signature, args, kwargs))
+        if cle not in etat.mesures.tours:
+            etat.mesures.tours[cle] = np.zeros(len(BORNES_TOUR) + 1, dtype=np.int64)
+            etat.mesures.duree_tours[cle] = 0.0
+        precedente, hist_precedent = etat.strategie, etat.hist
+        etat.strategie, etat.hist, etat.dernier_tir = cle, etat.mesures.tours[cle], perf_counter()
+        try:
+            return fonction(*args, **kwargs)
+        finally:
+            etat.strategie, etat.hist = precedente, hist_precedent
+    return envelopper
+
+
+def _remplacer(cls: type, nom: str, enveloppe: Callable[[Callable], Callable]) -> None:
+    """Remplace la méthode de la classe par son enveloppe et garde l'originale (gère les classmethod)."""
+
+    original = cls.__dict__[nom]
+    _originaux[(cls, nom)] = original
+    if isinstance(original, classmethod):
+        setattr(cls, nom, classmethod(enveloppe(original.__func__)))
+    else:
+        setattr(cls, nom, enveloppe(original))
+
+
+def activer() -> None:
+    """Remplace les méthodes de CIBLES et les stratégies de Joueur par leurs versions instrumentées.
+        Sans appel à 'activer', le code n'est pas modifié et l'instrumentation ne coûte rien.
+    """
+
+    if _originaux:
+        return
+
+    for cls, noms in CIBLES.items():
+        for nom in noms:
+            cle = f"{cls.__name__}.{nom}"
+            if nom == "joue_coule":
+                _remplacer(cls, nom, lambda f, cle=cle: _mesure(cle, _mesure_tir(f)))
+            else:
+                _remplacer(cls, nom, lambda f, cle=cle: _mesure(cle, f))
+
+    # Les moteurs par lot ('*_lot') ne passent pas par 'joue_coule' : seuls leurs appels et leur durée sont mesurés
+    for nom in vars(Joueur):
+        if nom.startswith("jouer") and nom.endswith("_lot"):
+            _remplacer(Joueur, nom, lambda f, nom=nom: _mesure(f"Joueur.{nom}", f))
+        elif nom.startswith("jouer"):
+            _remplacer(Joueur, nom, lambda f, nom=nom: _mesure(f"Joueur.{nom}", _mesure_strategie(nom, f)))
+
+
+def desactiver() -> None:
+    """Remet les méthodes d'origine. Les mesures sont conservées."""
+
+    for (cls, nom), original in _originaux.items():
+        setattr(cls, nom, original)
+    _originaux.clear()
+
+
+def reinitialiser() -> None:
+    """Remet toutes les mesures (de tous les threads) à zéro."""
+
+    with _verrou_threads:
+        for mesures_thread in _mesures_threads:
+            for mesure in mesures_thread.appels.values():
+                mesure[0], mesure[1] = 0, 0.0
+            for cle in mesures_thread.tours:
+                mesures_thread.tours[cle][:] = 0
+                mesures_thread.duree_tours[cle] = 0.0
+
+
+def mesures() -> tuple[dict[str, list], dict[tuple[str, str], np.ndarray], dict[tuple[str, str], float]]:
+    """Fusionne les mesures de tous les threads.
+
+    Returns:
+        Les appels (nom de la fonction -> [nombre d'appels, durée cumulée]), les histogrammes de latence par tour
+        et leurs durées cumulées ((stratégie, mode) -> compteurs, durée).
+    """
+
+    appels, tours, duree_tours = dict(), dict(), dict()
+    with _verrou_threads:
+        threads = list(_mesures_threads)
+    for mesures_thread in threads:
+        for nom, (nb, duree) in list(mesures_thread.appels.items()):
+            mesure = appels.setdefault(nom, [0, 0.0])
+            mesure[0] += nb
+            mesure[1] += duree
+        for cle, hist in list(mesures_thread.tours.items()):
+            tours[cle] = tours.get(cle, 0) + hist
+            duree_tours[cle] = duree_tours.get(cle, 0.0) + mesures_thread.duree_tours[cle]
+    return appels, tours, duree_tours
+
+
+def _nom_tour(strategie: str, mode: str) -> str:
+    """Nom affiché d'un histogramme de latence : la stratégie, suivie de son mode s'il y en a un."""
+
+    return f"{strategie} ({mode})" if mode else strategie
+
+
+@contextmanager
+def instrumenter() -> Iterator[None]:
+    """Active l'instrumentation le temps d'un bloc 'with'."""
+
+    activer()
+    try:
+        yield
+    finally:
+        desactiver()
+
+
+def rapport() -> str:
+    """Renvoie le tableau des fonctions appelées (par durée cumulée décroissante) et les latences par tour."""
+
+    appels, tours, duree_tours = mesures()
+    lignes = [f"{'fonction':44} {'appels':>10} {'durée (s)':>10} {'µs/appel':>10}"]
+    for nom, (nb, duree) in sorted(appels.items(), key=lambda item: -item[1][1]):
+        if nb:
+            lignes.append(f"{nom:44} {nb:10d} {duree:10.3f} {1e6 * duree / nb:10.1f}")
+
+    lignes.append("")
+    lignes.append(f"{'stratégie':44} {'tours':>10} {'µs/tour':>10} {'médiane':>10}")
+    for (strategie, mode), hist in tours.items():
+        nb = int(hist.sum())
+        if nb:
+            mediane = BORNES_TOUR[min(np.searchsorted(np.cumsum(hist), nb / 2), len(BORNES_TOUR) - 1)]
+            duree = duree_tours[(strategie, mode)]
+            lignes.append(f"{_nom_tour(strategie, mode):44} {nb:10d} {1e6 * duree / nb:10.1f} "
+                          f"{'<= ' + format(1e6 * mediane, 'g'):>10}")
+    return "\n".join(lignes)
+
+
+def exporter_jsonl(chemin: str, etiquettes: dict | None = None) -> None:
+    """Ajoute les mesures au fichier, une ligne JSON par fonction et par stratégie.
+
+    Args:
+        chemin: Fichier JSON lines (ouvert en ajout, pour comparer plusieurs exécutions).
+        etiquettes: Champs ajoutés à chaque ligne (par exemple le nom de l'exécution). Default = None.
+    """
+
+    etiquettes = etiquettes or dict()
+    appels, tours, duree_tours = mesures()
+    horodatage = time()
+    with open(chemin, "a") as f:
+        for nom, (nb, duree) in appels.items():
+            ligne = {"temps": horodatage, "type": "fonction", "nom": nom, "appels": nb, "duree": duree}
+            f.write(json.dumps({**etiquettes, **ligne}) + "\n")
+        for (nom, mode), hist in tours.items():
+            ligne = {"temps": horodatage, "type": "tour", "nom": nom, "mode": mode, "bornes": BORNES_TOUR.tolist(),
+                     "histogramme": hist.tolist(), "duree": duree_tours[(nom, mode)]}
+            f.write(json.dumps({**etiquettes, **ligne}) + "\n")
+
+
+def exporter_prometheus(etiquettes: dict | None = None) -> str:
+    """Renvoie les mesures au format texte de Prometheus.
+
+    Args:
+        etiquettes: Étiquettes ajoutées à chaque série (par exemple le nom de l'exécution). Default = None.
+
+    Returns:
+        Texte des séries : appels et durée cumulée par fonction, histogramme de latence par stratégie et mode.
+    """
+
+    appels, tours, duree_tours = mesures()
+
+    def format_etiquettes(**autres) -> str:
+        toutes = {**(etiquettes or dict()), **autres}
+        return "{" + ",".join(f'{cle}="{valeur}"' for cle, valeur in toutes.items()) + "}"
+
+    lignes = ["# TYPE bataille_appels_total counter"]
+    lignes += [f"bataille_appels_total{format_etiquettes(fonction=nom)} {nb}" for nom, (nb, _) in appels.items()]
+    lignes.append("# TYPE bataille_duree_secondes_total counter")
+    lignes += [f"bataille_duree_secondes_total{format_etiquettes(fonction=nom)} {duree}"
+               for nom, (_, duree) in appels.items()]
+
+    lignes.append("# TYPE bataille_tour_secondes histogram")
+    for (nom, mode), hist in tours.items():
+        cumul = np.cumsum(hist)
+        for borne, nb in zip(BORNES_TOUR, cumul):
+            lignes.append(f"bataille_tour_secondes_bucket{format_etiquettes(strategie=nom, mode=mode, le=format(borne, 'g'))} {nb}")
+        lignes.append(f"bataille_tour_secondes_bucket{format_etiquettes(strategie=nom, mode=mode, le='+Inf')} {cumul[-1]}")
+        lignes.append(f"bataille_tour_secondes_sum{format_etiquettes(strategie=nom, mode=mode)} {duree_tours[(nom, mode)]}")
+        lignes.append(f"bataille_tour_secondes_count{format_etiquettes(strategie=nom, mode=mode)} {cumul[-1]}")
+    return "\n".join(lignes) + "\n"
+
+
+if __name__ == "__main__":
+    # Profil d'une série de jeux de chaque stratégie
+    joueur = Joueur("Joueur")
+    with instrumenter():
+        for strategie, nb_jeux in [("jouer", 100), ("jouer_heuristique", 100), ("jouer_proba_simple", 10)]:
+            for _ in range(nb_jeux):
+                getattr(joueur, strategie)(10)
+        for _ in range(10):
+            joueur.jouer_proba_simple(10, incremental=True)
+    print(rapport())
@@ -0,0 +1,214 @@
+import numpy as np
+from grille import Grille
+from placements import comptes_placements
+from constants import *
+
+
+def jouer_aleatoire_lot(taille_grille: int, nb_jeux: int, rng: np.random.Generator | None = None) -> np.ndarray:
+    """Joue nb_jeux jeux de la stratégie aléatoire ('Joueur.jouer') en une seule passe vectorisée.
+        Tirer les cases au hasard sans remise revient à tirer une permutation aléatoire des cases :
+        le nombre de coups est le rang maximal des cases bateau dans la permutation.
+        Le rang d'une case est obtenu en tirant une clé uniforme par case, sans trier.
+
+    Args:
+        taille_grille: Taille de la grille du jeu.
+        nb_jeux: Nombre de jeux.
+        rng: Générateur aléatoire de numpy. Default = None (nouveau générateur).
+
+    Returns:
+        Tableau (nb_jeux,) des nombres de coups.
+    """
+
+    if rng is None:
+        rng = np.random.default_rng()
+
+    grilles, _ = Grille.genere_grilles(taille_grille, nb_jeux, rng)
+    cases_bateaux = grilles.reshape(nb_jeux, -1) != VIDE
+    cles = rng.random(cases_bateaux.shape)
+
+    # Clé de la dernière case bateau tirée, puis nombre de cases tirées avant elle (elle comprise)
+    cle_max = np.where(cases_bateaux, cles, -1.0).max(axis=1)
+    return np.count_nonzero(cles <= cle_max[:, None], axis=1)
+
+
+# Cases voisines dans l'ordre de 'Joueur._cases_connexes' : droite, gauche, haut, bas
+_VOISINS = np.array([(0, 1), (0, -1), (-1, 0), (1, 0)])
+
+
+def jouer_heuristique_lot(taille_grille: int, nb_jeux: int, rng: np.random.Generator | None = None) -> np.ndarray:
+    """Joue nb_jeux jeux de la stratégie heuristique ('Joueur.jouer_heuristique') en parallèle, un tir par jeu et par pas.
+        Chaque jeu est soit en mode chasse (tir au hasard parmi les cases non tirées), soit en mode cible :
+        on tire la prochaine case voisine non tirée de la case cible (droite, gauche, haut, bas). Une case touchée
+        devient la nouvelle cible, et quand la cible n'a plus de voisine à tirer le jeu repasse en mode chasse.
+        Comme dans 'jouer_heuristique', la victoire n'est vérifiée qu'en mode chasse : un jeu dont le dernier bateau
+        a été coulé en mode cible finit d'abord de tirer les voisines. Les jeux terminés sont retirés du lot.
+
+    Args:
+        taille_grille: Taille de la grille du jeu.
+        nb_jeux: Nombre de jeux.
+        rng: Générateur aléatoire de numpy. Default = None (nouveau générateur).
+
+    Returns:
+        Tableau (nb_jeux,) des nombres de coups.
+    """
+
+    if rng is None:
+        rng = np.random.default_rng()
+
+    n = taille_grille
+    grilles, _ = Grille.genere_grilles(n, nb_jeux, rng)
+    bateaux = grilles.reshape(nb_jeux, -1) != VIDE
+
+    # Ordre de tir du mode chasse : une permutation des cases par jeu, les cases déjà tirées sont sautées
+    ordre = np.argsort(rng.random((nb_jeux, n * n)), axis=1).astype(np.int32)
+    pointeur = np.zeros(nb_jeux, dtype=np.int64)
+
+    tirees = np.zeros((nb_jeux, n * n), dtype=bool)
+    restantes = bateaux.sum(axis=1)
+    cible = np.full(nb_jeux, -1, dtype=np.int64)     # case cible, -1 en mode chasse
+    direction = np.zeros(nb_jeux, dtype=np.int64)    # prochaine voisine de la cible à essayer
+    nb_coups = np.zeros(nb_jeux, dtype=np.int64)
+    jeux = np.arange(nb_jeux)                         # indice du jeu de chaque ligne des tableaux d'état
+    en_cours = np.ones(nb_jeux, dtype=bool)
+    resultats = np.zeros(nb_jeux, dtype=np.int64)
+
+    while True:
+        # Les lignes des jeux terminés sont supprimées quand elles sont au moins la moitié des lignes
+        actifs = np.flatnonzero(en_cours)
+        if len(actifs) == 0:
+            break
+        if 2 * len(actifs) <= len(jeux):
+            jeux, bateaux, ordre, pointeur, tirees = jeux[actifs], bateaux[actifs], ordre[actifs], pointeur[actifs], tirees[actifs]
+            restantes, cible, direction, nb_coups = restantes[actifs], cible[actifs], direction[actifs], nb_coups[actifs]
+            en_cours = en_cours[actifs]
+            actifs = np.arange(len(jeux))
+
+        # Mode cible : première voisine dans la grille, non tirée, à partir de la direction courante
+        en_cible = actifs[cible[actifs] >= 0]
+        if len(en_cible):
+            ligne, col = np.divmod(cible[en_cible], n)
+            lignes_v = ligne[:, None] + _VOISINS[:, 0]
+            cols_v = col[:, None] + _VOISINS[:, 1]
+            dans_grille = (lignes_v >= 0) & (lignes_v < n) & (cols_v >= 0) & (cols_v < n)
+            voisins = np.where(dans_grille, lignes_v * n + cols_v, 0)
+            possibles = (dans_grille & ~tirees[en_cible[:, None], voisins]
+                         & (np.arange(4) >= direction[en_cible, None]))
+            premiere = np.argmax(possibles, axis=1)
+            reste = possibles.any(axis=1)
+
+            direction[en_cible] = premiere
+            tirs_cible = voisins[np.arange(len(en_cible)), premiere][reste]
+            # Plus de voisine à tirer : retour en mode chasse
+            cible[en_cible[~reste]] = -1
+            en_cible = en_cible[reste]
+
+        # Mode chasse : victoire si tous les bateaux sont coulés, sinon prochaine case non tirée de l'ordre
+        en_chasse = actifs[cible[actifs] < 0]
+        finis = restantes[en_chasse] == 0
+        resultats[jeux[en_chasse[finis]]] = nb_coups[en_chasse[finis]]
+        en_cours[en_chasse[finis]] = False
+        en_chasse = en_chasse[~finis]
+
+        tirs_chasse = np.zeros(len(en_chasse), dtype=np.int64)
+        a_tirer = np.arange(len(en_chasse))
+        while len(a_tirer):
+            lignes = en_chasse[a_tirer]
+            cases = ordre[lignes, pointeur[lignes]]
+            deja = tirees[lignes, cases]
+            tirs_chasse[a_tirer[~deja]] = cases[~deja]
+            a_tirer = a_tirer[deja]
+            pointeur[lignes[deja]] += 1
+
+        # Tir
+        lignes = np.concatenate((en_cible, en_chasse))
+        tirs = np.concatenate((tirs_cible if len(en_cible) else en_cible, tirs_chasse))
+        tirees[lignes, tirs] = True
+        nb_coups[lignes] += 1
+        touche = bateaux[lignes, tirs]
+        restantes[lignes] -= touche
+
+        # Case touchée : nouvelle cible. Case ratée en mode cible : voisine suivante
+        direction[lignes[~touche & (cible[lignes] >= 0)]] += 1
+        cible[lignes[touche]] = tirs[touche]
+        direction[lignes[touche]] = 0
+
+    return resultats
+
+
+def jouer_proba_simple_lot(taille_grille: int, nb_jeux: int, rng: np.random.Generator | None = None) -> np.ndarray:
+    """Joue nb_jeux jeux de la stratégie proba simple ('Joueur.jouer_proba_simple') en parallèle, un tir par jeu et par pas.
+        À chaque pas, les grilles-probabilités (K, 5, n, n) de tous les jeux sont calculées en une passe
+        ('placements.comptes_placements' sur les tableaux (K, n, n) des cases bloquées et touchées), la grille
+        d'un bateau coulé vaut 0 et chaque jeu tire la case du maximum de ses 5 grilles (même ordre que
+        'Joueur._choisir_max' : premier bateau dans l'ordre de BATEAUX, puis première case).
+        Les jeux terminés sont retirés du lot.
+
+    Args:
+        taille_grille: Taille de la grille du jeu.
+        nb_jeux: Nombre de jeux.
+        rng: Générateur aléatoire de numpy. Default = None (nouveau générateur).
+
+    Returns:
+        Tableau (nb_jeux,) des nombres de coups.
+    """
+
+    if rng is None:
+        rng = np.random.default_rng()
+
+    n = taille_grille
+    grilles, _ = Grille.genere_grilles(n, nb_jeux, rng)
+    grilles = grilles.reshape(nb_jeux, n * n)
+
+    # Observations : cases où aucun bateau ne peut être placé (RATE, bateaux coulés) et cases BAT_TOUCHE
+    bloquees = np.zeros((nb_jeux, n * n), dtype=bool)
+    touchees = np.zeros((nb_jeux, n * n), dtype=bool)
+    # Nombre de cases non touchées de chaque bateau (dans l'ordre de BATEAUX), 0 si le bateau est coulé
+    restantes = np.stack([np.count_nonzero(grilles == bateau, axis=1) for bateau in BATEAUX], axis=1)
+    tailles = [BAT_CASES[bateau] for bateau in BATEAUX]
+    colonne = np.zeros(max(BATEAUX) + 1, dtype=np.int64)
+    colonne[BATEAUX] = np.arange(len(BATEAUX))
+
+    nb_coups = np.zeros(nb_jeux, dtype=np.int64)
+    jeux = np.arange(nb_jeux)
+    resultats = np.zeros(nb_jeux, dtype=np.int64)
+    # Valeurs bornées par 2 * taille² (voir 'placements.dtype_grilles_proba')
+    grilles_ps = np.zeros((nb_jeux, len(BATEAUX), n * n), dtype=np.int16)
+
+    while len(jeux):
+        lignes = np.arange(len(jeux))
+
+        # Grilles-probabilités de tous les jeux, une seule passe par taille de bateau
+        comptes = {taille: comptes_placements(bloquees.reshape(-1, n, n), touchees.reshape(-1, n, n), taille)
+                   for taille in set(tailles)}
+        for b, taille in enumerate(tailles):
+            np.multiply(comptes[taille].reshape(-1, n * n), (restantes[:, b] > 0)[:, None], out=grilles_ps[:, b])
+
+        # Tir sur la case du maximum
+        tirs = np.argmax(grilles_ps.reshape(len(jeux), -1), axis=1) % (n * n)
+        nb_coups += 1
+        valeurs = grilles[lignes, tirs]
+        rate = valeurs == VIDE
+        bloquees[lignes[rate], tirs[rate]] = True
+
+        touche = lignes[~rate]
+        touchees[touche, tirs[~rate]] = True
+        bateaux = colonne[valeurs[~rate]]
+        restantes[touche, bateaux] -= 1
+
+        # Bateau coulé : ses cases ne sont plus BAT_TOUCHE mais bloquées
+        coule = restantes[touche, bateaux] == 0
+        if coule.any():
+            jeux_coule = touche[coule]
+            cases = grilles[jeux_coule] == valeurs[~rate][coule][:, None]
+            touchees[jeux_coule] &= ~cases
+            bloquees[jeux_coule] |= cases
+
+        # Jeux terminés : tous les bateaux coulés
+        finis = ~restantes.any(axis=1)
+        if finis.any():
+            resultats[jeux[finis]] = nb_coups[finis]
+            garder = ~finis
+            jeux, grilles, bloquees, touchees = jeux[garder], grilles[garder], bloquees[garder], touchees[garder]
+            restantes, nb_coups, grilles_ps = restantes[garder], nb_coups[garder], grilles_ps[garder]
+
+    return resultats
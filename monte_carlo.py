@@ -0,0 +1,300 @@
+import numpy as np
+from typing import Dict
+from placements import index_placements, tirer_placements_lot, comptes_placements
+from constants import *
+
+
+def _tirer(poids: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+    """Tire un indice de colonne par ligne, avec une probabilité proportionnelle aux poids (entiers ou booléens).
+
+    Args:
+        poids: Tableau (m, P) des poids entiers, au moins un poids non nul par ligne.
+        rng: Générateur aléatoire de numpy.
+
+    Returns:
+        Tableau (m,) des colonnes tirées.
+    """
+
+    m, nb_colonnes = poids.shape
+    if poids.dtype == bool:
+        # Tirage uniforme : rang tiré parmi les colonnes sélectionnées (plus rapide qu'une somme cumulée)
+        selectionnees = np.flatnonzero(poids)
+        nb_selectionnees = poids.sum(axis=1)
+        debuts = np.cumsum(nb_selectionnees) - nb_selectionnees
+        return selectionnees[debuts + rng.integers(0, nb_selectionnees)] - np.arange(m) * nb_colonnes
+
+    cumuls = np.cumsum(poids, axis=1, dtype=np.int32)
+    cibles = rng.integers(0, cumuls[:, -1])
+    return (cumuls <= cibles[:, None]).sum(axis=1)
+
+
+class EchantillonsFlotte:
+    """Échantillons de flottes complètes (bateaux non coulés) compatibles avec les observations d'un jeu.
+        Un échantillon place tous les bateaux restants sans superposition, hors des cases RATE et des bateaux coulés,
+        couvre toutes les cases BAT_TOUCHE des bateaux non coulés et ne contient aucun bateau dont toutes les cases
+        sont BAT_TOUCHE (il aurait été coulé).
+        Les échantillons sont gardés d'un tour à l'autre : après chaque tir on élimine ceux qui le contredisent,
+        puis on complète jusqu'à nb_echantillons (rééchantillonnage et déplacement, comme un filtre particulaire) :
+        chaque nouvel échantillon est la copie d'un échantillon restant dans laquelle nb_deplacements bateaux sont
+        replacés uniformément parmi leurs placements compatibles avec les observations et les autres bateaux
+        (pas de Gibbs, en lot). Tant qu'il reste des cases BAT_TOUCHE, deux bateaux sont replacés ensemble, sinon
+        une case touchée ne pourrait jamais changer de bateau. Ces déplacements conservent la loi uniforme sur les
+        flottes compatibles.
+        S'il ne reste aucun échantillon (début du jeu), ils sont tirés en lot par rejet ('tirer_placements_lot') :
+        chaque bateau est placé uniformément parmi ses placements hors des cases bloquées, ce qui ne donne ni la loi
+        uniforme ni la loi de 'Grille.genere_grille' (produit des 1 / L, voir 'Grille.calc_esperances_tirages').
+        Les échantillons ne sont pas repondérés : l'ensemble mélange ces lois et approche seulement la loi
+        a posteriori des flottes.
+    """
+
+    def __init__(self, n: int, bateaux: list[int], nb_echantillons: int = 1000,
+                 rng: np.random.Generator | None = None, nb_tours: int = 4, nb_deplacements: int = 1):
+        self.n: int = n
+        self.bateaux: list[int] = list(bateaux)
+        self.nb_echantillons: int = nb_echantillons
+        self.nb_tours: int = nb_tours
+        self.nb_deplacements: int = nb_deplacements
+        self.rng: np.random.Generator = rng if rng is not None else np.random.default_rng()
+
+        # Observations : cases RATE, cases BAT_TOUCHE des bateaux non coulés, cases des bateaux coulés
+        self.rate: np.ndarray = np.zeros(n * n, dtype=bool)
+        self.touche: np.ndarray = np.zeros(n * n, dtype=bool)
+        self.coulees: np.ndarray = np.zeros(n * n, dtype=bool)
+
+        # choix[s, b] = indice du placement de self.bateaux[b] dans l'échantillon s, cases[s] = cases bateau
+        self.choix: np.ndarray = np.zeros((0, len(self.bateaux)), dtype=np.int64)
+        self.cases: np.ndarray = np.zeros((0, n * n), dtype=bool)
+
+        # Matrices d'incidence (P, n*n) des placements de chaque bateau, pour les produits matriciels des déplacements
+        self.incidences: Dict[int, np.ndarray] = {
+            bateau: index_placements(BAT_CASES[bateau], n).incidence.astype(np.float32) for bateau in set(self.bateaux)}
+        # Matrices des placements disjoints de deux bateaux (voir '_disjoints')
+        self.matrices_disjoints: Dict[tuple[int, int], np.ndarray] = dict()
+        # Placements et incidences restreints par les observations (voir '_restreintes'), vidé à chaque observation
+        self.restreintes: Dict[int, tuple[np.ndarray, np.ndarray, np.ndarray]] = dict()
+
+    def _pleins(self, bateau: int) -> np.ndarray:
+        """Renvoie le tableau booléen (P,) des placements du bateau dont toutes les cases sont BAT_TOUCHE."""
+
+        return self.touche[index_placements(BAT_CASES[bateau], self.n).cases].all(axis=1)
+
+    def _compatibles(self, choix: np.ndarray, cases: np.ndarray) -> np.ndarray:
+        """Renvoie le tableau booléen des échantillons qui couvrent toutes les cases BAT_TOUCHE et dont aucun bateau
+            n'a toutes ses cases BAT_TOUCHE (les cases RATE et coulées sont évitées par construction).
+        """
+
+        gardes = cases[:, self.touche].all(axis=1)
+        for b, bateau in enumerate(self.bateaux):
+            gardes &= ~self._pleins(bateau)[choix[:, b]]
+        return gardes
+
+    def _restreintes(self, bateau: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Restreint les placements du bateau à ceux qui évitent les cases RATE et coulées et n'ont pas toutes leurs
+            cases BAT_TOUCHE, et leurs cases aux cases non RATE et non coulées. Calculé une fois par observation.
+
+        Returns:
+            - Tableau (P',) des indices des placements gardés.
+            - Matrice d'incidence (P', K) des placements gardés sur les cases libres (non RATE et non coulées).
+            - Matrice d'incidence (P', T) des placements gardés sur les cases BAT_TOUCHE.
+        """
+
+        if bateau not in self.restreintes:
+            incidence = self.incidences[bateau]
+            libres = ~(self.rate | self.coulees)
+            legaux = np.flatnonzero((incidence[:, ~libres].sum(axis=1) == 0) & ~self._pleins(bateau))
+            incidence = incidence[legaux]
+            self.restreintes[bateau] = (legaux, incidence[:, libres], incidence[:, self.touche])
+        return self.restreintes[bateau]
+
+    def _deplacer(self, choix: np.ndarray, cases: np.ndarray, b: int) -> None:
+        """Replace le bateau self.bateaux[b] de chaque échantillon uniformément parmi ses placements compatibles
+            avec les observations et les autres bateaux de l'échantillon (le placement actuel en fait partie).
+            choix et cases sont modifiés sur place.
+        """
+
+        bateau = self.bateaux[b]
+        index = index_placements(BAT_CASES[bateau], self.n)
+        lignes = np.arange(len(choix))[:, None]
+        legaux, incidence_libres, incidence_touchees = self._restreintes(bateau)
+
+        # Cases des autres bateaux
+        cases[lignes, index.cases[choix[:, b]]] = False
+        # Un placement possible ne touche aucun autre bateau et couvre les cases BAT_TOUCHE restantes
+        possibles = cases[:, ~(self.rate | self.coulees)].astype(np.float32) @ incidence_libres.T == 0
+        if self.touche.any():
+            requises = ~cases[:, self.touche]
+            possibles &= requises.astype(np.float32) @ incidence_touchees.T == requises.sum(axis=1)[:, None]
+
+        choix[:, b] = legaux[_tirer(possibles, self.rng)]
+        cases[lignes, index.cases[choix[:, b]]] = True
+
+    def _deplacer_paire(self, choix: np.ndarray, cases: np.ndarray, a: int, b: int) -> None:
+        """Replace ensemble les bateaux self.bateaux[a] et self.bateaux[b] de chaque échantillon, uniformément parmi
+            les couples de placements compatibles avec les observations et les autres bateaux. Contrairement à
+            '_deplacer', une case BAT_TOUCHE peut passer d'un bateau à l'autre.
+            Le placement de a est tiré avec un poids égal à son nombre de placements compatibles pour b, puis celui
+            de b uniformément parmi ces derniers. choix et cases sont modifiés sur place.
+        """
+
+        bateau_a, bateau_b = self.bateaux[a], self.bateaux[b]
+        index_a = index_placements(BAT_CASES[bateau_a], self.n)
+        index_b = index_placements(BAT_CASES[bateau_b], self.n)
+        legaux_a, incidence_libres_a, incidence_touchees_a = self._restreintes(bateau_a)
+        legaux_b, incidence_libres_b, incidence_touchees_b = self._restreintes(bateau_b)
+        lignes = np.arange(len(choix))
+
+        # Cases des autres bateaux
+        cases[lignes[:, None], index_a.cases[choix[:, a]]] = False
+        cases[lignes[:, None], index_b.cases[choix[:, b]]] = False
+        autres = cases[:, ~(self.rate | self.coulees)].astype(np.float32)
+        possibles_a = autres @ incidence_libres_a.T == 0
+        possibles_b = autres @ incidence_libres_b.T == 0
+
+        # Les deux placements sont disjoints : ils couvrent toutes les cases BAT_TOUCHE restantes
+        # ssi leurs nombres de cases BAT_TOUCHE restantes couvertes ont pour somme le nombre de ces cases
+        requises = ~cases[:, self.touche]
+        nb_requises = requises.sum(axis=1)
+        requises = requises.astype(np.float32)
+        couvertes_a = requises @ incidence_touchees_a.T
+        couvertes_b = requises @ incidence_touchees_b.T
+        disjoints = self._disjoints(bateau_a, bateau_b)[np.ix_(legaux_b, legaux_a)]
+
+        # nb_partenaires[s, p] = nombre de placements de b compatibles avec le placement p de a dans l'échantillon s,
+        # i.e. qui couvrent c = nb_requises[s] - couvertes_a[s, p] cases BAT_TOUCHE restantes.
+        # Les comptes pour toutes les valeurs de c sont calculés par un seul produit matriciel sur les lignes
+        # (échantillon, c) ; seuls les placements de b qui touchent une case BAT_TOUCHE peuvent en couvrir c > 0.
+        c_max = min(BAT_CASES[bateau_b], int(nb_requises.max()))
+        nb_partenaires = (possibles_b & (couvertes_b == 0)).astype(np.float32) @ disjoints
+        if c_max > 0:
+            couvrants = np.flatnonzero(incidence_touchees_b.any(axis=1))
+            valeurs_c = np.arange(1, c_max + 1, dtype=np.float32)
+            selection = possibles_b[:, None, couvrants] & (couvertes_b[:, None, couvrants] == valeurs_c[:, None])
+            par_c = selection.reshape(len(choix) * c_max, len(couvrants)).astype(np.float32) @ disjoints[couvrants]
+            par_c = np.concatenate((nb_partenaires[:, None], par_c.reshape(len(choix), c_max, -1)), axis=1)
+            c = nb_requises[:, None] - couvertes_a.astype(np.int64)
+            nb_partenaires = np.take_along_axis(par_c, np.clip(c, 0, c_max)[:, None], axis=1)[:, 0]
+            nb_partenaires *= (c >= 0) & (c <= c_max)
+        else:
+            nb_partenaires *= couvertes_a == nb_requises[:, None]
+        nb_partenaires *= possibles_a
+
+        p_a = _tirer(nb_partenaires, self.rng)
+        reste = nb_requises - couvertes_a[lignes, p_a]
+        possibles_b &= (disjoints[:, p_a].T > 0) & (couvertes_b == reste[:, None])
+        choix[:, a] = legaux_a[p_a]
+        choix[:, b] = legaux_b[_tirer(possibles_b, self.rng)]
+
+        cases[lignes[:, None], index_a.cases[choix[:, a]]] = True
+        cases[lignes[:, None], index_b.cases[choix[:, b]]] = True
+
+    def _disjoints(self, bateau_a: int, bateau_b: int) -> np.ndarray:
+        """Renvoie la matrice (P_b, P_a) : 1 si le placement de bateau_b et le placement de bateau_a n'ont aucune
+            case commune, 0 sinon. Calculée une fois par couple de bateaux.
+        """
+
+        if (bateau_a, bateau_b) not in self.matrices_disjoints:
+            chevauchements = self.incidences[bateau_b] @ self.incidences[bateau_a].T
+            self.matrices_disjoints[(bateau_a, bateau_b)] = (chevauchements == 0).astype(np.float32)
+        return self.matrices_disjoints[(bateau_a, bateau_b)]
+
+    def completer(self) -> None:
+        """Complète les échantillons jusqu'à nb_echantillons. S'il n'en reste aucun, au plus nb_tours tirages en lot.
+            Le reste est complété par copie d'échantillons restants tirés au hasard, dans lesquelles nb_deplacements
+            bateaux ou couples de bateaux sont déplacés (voir '_deplacer' et '_deplacer_paire').
+        """
+
+        bloquees = self.rate | self.coulees
+        for _ in range(self.nb_tours):
+            manque = self.nb_echantillons - len(self.choix)
+            if len(self.choix) or manque <= 0:
+                break
+            choix, occupees, valides = tirer_placements_lot(self.n, self.bateaux, 2 * manque, self.rng, bloquees)
+            cases = occupees & ~bloquees
+            gardes = valides & self._compatibles(choix, cases)
+            self.choix = np.concatenate((self.choix, choix[gardes][:manque]))
+            self.cases = np.concatenate((self.cases, cases[gardes][:manque]))
+
+        manque = self.nb_echantillons - len(self.choix)
+        if len(self.choix) == 0 or manque <= 0:
+            return
+
+        parents = self.rng.integers(0, len(self.choix), size=manque)
+        choix, cases = self.choix[parents], self.cases[parents]
+        # Chaque pas déplace le même bateau (ou, s'il reste des cases BAT_TOUCHE, le même couple de bateaux),
+        # tiré au hasard, dans toutes les copies
+        for _ in range(self.nb_deplacements):
+            if len(self.bateaux) >= 2 and self.touche.any():
+                a, b = self.rng.choice(len(self.bateaux), size=2, replace=False)
+                self._deplacer_paire(choix, cases, int(a), int(b))
+            else:
+                self._deplacer(choix, cases, int(self.rng.integers(0, len(self.bateaux))))
+        self.choix = np.concatenate((self.choix, choix))
+        self.cases = np.concatenate((self.cases, cases))
+
+    def _filtrer(self, gardes: np.ndarray) -> None:
+        """Garde uniquement les échantillons sélectionnés."""
+
+        self.choix = self.choix[gardes]
+        self.cases = self.cases[gardes]
+
+    def observer(self, position: tuple[int, int], type_case: int, bateau_coule: int = -1,
+                 placement: tuple[int, int, int] | None = None) -> None:
+        """MAJ des observations et des échantillons après un tir.
+
+        Args:
+            position: (ligne, col) de la case tirée.
+            type_case: Résultat du tir, BAT_TOUCHE ou RATE.
+            bateau_coule: Type du bateau coulé par ce tir, -1 si aucun. Default = -1.
+            placement: Triplet (ligne, col, direction) du bateau coulé. Default = None.
+        """
+
+        ligne, col = position
+        case = ligne * self.n + col
+        self.restreintes = dict()
+
+        if type_case == RATE:
+            self.rate[case] = True
+            self._filtrer(~self.cases[:, case])
+            return
+
+        self.touche[case] = True
+        self._filtrer(self.cases[:, case])
+
+        if bateau_coule != -1:
+            # Le bateau coulé est connu : on garde les échantillons qui le placent au même endroit
+            b = self.bateaux.index(bateau_coule)
+            index = index_placements(BAT_CASES[bateau_coule], self.n)
+            p = int(np.flatnonzero((index.positions == placement).all(axis=1))[0])
+            self._filtrer(self.choix[:, b] == p)
+
+            cases_bateau = index.cases[p]
+            self.cases[:, cases_bateau] = False
+            self.choix = np.delete(self.choix, b, axis=1)
+            del self.bateaux[b]
+
+            self.touche[cases_bateau] = False
+            self.coulees[cases_bateau] = True
+
+        # Un bateau non coulé dont toutes les cases sont touchées contredit le tir
+        self._filtrer(self._compatibles(self.choix, self.cases))
+
+    def choisir(self) -> tuple[int, int]:
+        """Choisit la case non tirée avec la probabilité estimée maximale de contenir un bateau.
+            S'il ne reste aucun échantillon, on utilise les grilles-probabilités de la stratégie proba simple.
+
+        Returns:
+            La position (ligne, col) de la case à jouer.
+        """
+
+        self.completer()
+
+        if len(self.choix):
+            comptes = self.cases.sum(axis=0)
+        else:
+            bloquees = (self.rate | self.coulees).reshape(self.n, self.n)
+            touchees = self.touche.reshape(self.n, self.n)
+            comptes = sum(comptes_placements(bloquees, touchees, BAT_CASES[bat]) for bat in self.bateaux).reshape(-1)
+
+        # Les cases déjà tirées ne peuvent pas être choisies
+        comptes = np.where(self.rate | self.touche | self.coulees, -1, comptes)
+        return divmod(int(np.argmax(comptes)), self.n)
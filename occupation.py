@@ -0,0 +1,216 @@
+import argparse
+import numpy as np
+from placements import index_placements, tirer_placements_lot, dtype_comptes
+from constants import *
+
+# Nombre maximal de couples (état, placement) traités en une fois (taille des tableaux temporaires)
+TAILLE_BLOC = 1 << 22
+
+
+def _masques_placements(taille: int, n: int, nb_mots: int) -> np.ndarray:
+    """Renvoie le tableau (P, nb_mots) des masques de bits des cases de chaque placement (case c : bit c % 64 du
+        mot c // 64). Fonction auxiliaire pour 'occupation_exacte'.
+    """
+
+    index = index_placements(taille, n)
+    masques = np.zeros((len(index), nb_mots), dtype=np.uint64)
+    lignes = np.repeat(np.arange(len(index)), taille)
+    cases = index.cases.reshape(-1)
+    np.bitwise_or.at(masques, (lignes, cases // 64), np.left_shift(np.uint64(1), (cases % 64).astype(np.uint64)))
+    return masques
+
+
+def _cases_par_bateau(n: int, b: int, probas_placements: np.ndarray) -> np.ndarray:
+    """Transforme les probabilités des placements du bateau b (ordre de BAT_CASES) en probabilités des cases (n, n)."""
+
+    index = index_placements(BAT_CASES[BATEAUX[b]], n)
+    poids = np.repeat(probas_placements, index.taille)
+    return np.bincount(index.cases.reshape(-1), weights=poids, minlength=n * n).reshape(n, n)
+
+
+def occupation_exacte(n: int, budget_etats: int = 10**7) -> tuple[np.ndarray, int]:
+    """Calcule exactement, pour chaque case et chaque bateau, la probabilité que 'Grille.genere_grille' place le bateau
+        sur la case. Programmation dynamique sur le placement séquentiel de 'place_alea' : un état est l'ensemble des
+        cases occupées par les bateaux déjà placés (masque de bits), les états égaux sont fusionnés en additionnant
+        leurs probabilités. Depuis un état, le bateau suivant va sur chacun de ses L placements possibles avec la
+        probabilité 1 / L. Les probabilités du bateau k sont calculées à partir des états après les k - 1 premiers.
+        Les deux derniers bateaux sont calculés à partir des mêmes états, sans construire les états suivants :
+        après le placement p de l'avant-dernier bateau, le dernier a L - C(p) placements possibles, où C(p) est le
+        nombre de ses placements possibles qui chevauchent p (produit matriciel avec la matrice des chevauchements).
+        Si le nombre d'états à construire dépasse budget_etats, le calcul s'arrête : seuls les premiers bateaux sont
+        exacts.
+
+    Args:
+        n: Taille de la grille.
+        budget_etats: Nombre maximal d'états d'une étape (avant fusion). Default = 10**7.
+
+    Returns:
+        - Tableau (n, n, 5) des probabilités, dans l'ordre de BATEAUX (0 pour les bateaux non calculés).
+        - Le nombre de bateaux calculés exactement (les premiers dans l'ordre de BATEAUX).
+
+    Raises:
+        ValueError: Si un bateau peut ne plus avoir de placement possible ('genere_grille' échoue alors).
+    """
+
+    nb_mots = (n * n + 63) // 64
+    occupation = np.zeros((n, n, len(BATEAUX)), dtype=float)
+    etats = np.zeros((1, nb_mots), dtype=np.uint64)
+    probas = np.ones(1)
+
+    dernier = len(BATEAUX) - 1
+    index_dernier = index_placements(BAT_CASES[BATEAUX[dernier]], n)
+    masques_dernier = _masques_placements(BAT_CASES[BATEAUX[dernier]], n, nb_mots)
+
+    for b, bateau in enumerate(BATEAUX):
+        masques = _masques_placements(BAT_CASES[bateau], n, nb_mots)
+        taille_bloc = max(1, TAILLE_BLOC // ((len(masques) + len(masques_dernier)) * nb_mots))
+        probas_placements = np.zeros(len(masques))
+        suivants, probas_suivants = [], []
+        nb_suivants = 0
+
+        avant_dernier = b == dernier - 1
+        if avant_dernier:
+            # chevauchements[p, q] = 1 si le placement p de ce bateau et le placement q du dernier ont une case commune
+            incidence = index_placements(BAT_CASES[bateau], n).incidence.astype(np.float32)
+            chevauchements = (incidence @ index_dernier.incidence.T.astype(np.float32) > 0).astype(np.float32)
+            probas_dernier = np.zeros(len(masques_dernier))
+
+        for debut in range(0, len(etats), taille_bloc):
+            bloc, probas_bloc = etats[debut:debut + taille_bloc], probas[debut:debut + taille_bloc]
+            # legaux[s, p] : le placement p ne touche aucune case de l'état s
+            legaux = ((bloc[:, None, :] & masques[None]) == 0).all(axis=2)
+            nb_legaux = legaux.sum(axis=1)
+            if (nb_legaux == 0).any():
+                raise ValueError(f"'genere_grille' peut échouer pour n = {n} : bateau {bateau} sans placement possible")
+            poids = probas_bloc / nb_legaux
+            probas_placements += poids @ legaux
+
+            if avant_dernier:
+                legaux_dernier = ((bloc[:, None, :] & masques_dernier[None]) == 0).all(axis=2)
+                # restants[s, p] : nombre de placements possibles du dernier bateau après le placement p
+                restants = (legaux_dernier.sum(axis=1, dtype=np.float32)[:, None]
+                            - legaux_dernier.astype(np.float32) @ chevauchements.T)
+                if (legaux & (restants == 0)).any():
+                    raise ValueError(f"'genere_grille' peut échouer pour n = {n} : "
+                                     f"bateau {BATEAUX[dernier]} sans placement possible")
+                poids_paires = np.divide(poids[:, None], restants, out=np.zeros(legaux.shape), where=legaux)
+                # Le placement q du dernier bateau reçoit la somme des poids des placements p qui ne le chevauchent pas
+                probas_dernier += (legaux_dernier * (poids_paires.sum(axis=1)[:, None]
+                                                     - poids_paires @ chevauchements)).sum(axis=0)
+                continue
+
+            nb_suivants += int(nb_legaux.sum())
+            if b < dernier and nb_suivants <= budget_etats:
+                lignes, colonnes = np.nonzero(legaux)
+                suivants.append(bloc[lignes] | masques[colonnes])
+                probas_suivants.append(poids[lignes])
+
+        occupation[:, :, b] = _cases_par_bateau(n, b, probas_placements)
+        if avant_dernier:
+            occupation[:, :, dernier] = _cases_par_bateau(n, dernier, probas_dernier)
+            return occupation, len(BATEAUX)
+        if b == dernier:
+            return occupation, len(BATEAUX)
+        if nb_suivants > budget_etats:
+            return occupation, b + 1
+
+        # Fusion des états égaux
+        suivants = np.concatenate(suivants)
+        cles = np.ascontiguousarray(suivants).view(np.dtype((np.void, 8 * nb_mots))).reshape(-1)
+        _, premiers, inverse = np.unique(cles, return_index=True, return_inverse=True)
+        etats = suivants[premiers]
+        probas = np.bincount(inverse.reshape(-1), weights=np.concatenate(probas_suivants), minlength=len(premiers))
+    return occupation, len(BATEAUX)
+
+
+def occupation_echantillons(n: int, nb_echantillons: int, rng: np.random.Generator | None = None,
+                            taille_lot: int = 100000) -> tuple[np.ndarray, np.ndarray]:
+    """Estime, pour chaque case et chaque bateau, la probabilité que 'Grille.genere_grille' place le bateau sur la case
+        à partir de grilles tirées en lot (même loi, voir 'placements.tirer_placements_lot').
+
+    Args:
+        n: Taille de la grille.
+        nb_echantillons: Nombre de grilles tirées.
+        rng: Générateur aléatoire de numpy. Default = None (nouveau générateur).
+        taille_lot: Nombre de grilles tirées en une fois. Default = 100000.
+
+    Returns:
+        - Tableau (n, n, 5) des fréquences, dans l'ordre de BATEAUX.
+        - Tableau (n, n, 5) des demi-largeurs des intervalles de confiance à 95 %.
+    """
+
+    if rng is None:
+        rng = np.random.default_rng()
+
+    # Comptes exacts des placements tirés (au plus nb_echantillons chacun)
+    comptes = [np.zeros(len(index_placements(BAT_CASES[bateau], n)), dtype=dtype_comptes(nb_echantillons))
+               for bateau in BATEAUX]
+    nb_valides = 0
+    for debut in range(0, nb_echantillons, taille_lot):
+        choisis, _, valides = tirer_placements_lot(n, BATEAUX, min(taille_lot, nb_echantillons - debut), rng)
+        nb_valides += int(valides.sum())
+        for b in range(len(BATEAUX)):
+            comptes[b] += np.bincount(choisis[valides, b], minlength=len(comptes[b]))
+
+    occupation = np.stack([_cases_par_bateau(n, b, comptes[b] / max(nb_valides, 1)) for b in range(len(BATEAUX))],
+                          axis=2)
+    demi_largeur = 1.96 * np.sqrt(occupation * (1 - occupation) / max(nb_valides, 1))
+    return occupation, demi_largeur
+
+
+def calc_occupation(n: int, budget_etats: int = 10**7, nb_echantillons: int = 10**6,
+                    rng: np.random.Generator | None = None) -> tuple[np.ndarray, np.ndarray]:
+    """Calcule la probabilité que 'Grille.genere_grille' place chaque bateau sur chaque case : exactement pour les
+        bateaux que 'occupation_exacte' peut calculer avec budget_etats, par échantillonnage pour les autres.
+
+    Args:
+        n: Taille de la grille.
+        budget_etats: Voir 'occupation_exacte'. Default = 10**7.
+        nb_echantillons: Nombre de grilles tirées si un bateau n'est pas calculé exactement. Default = 10**6.
+        rng: Générateur aléatoire de numpy. Default = None (nouveau générateur).
+
+    Returns:
+        - Tableau (n, n, 5) des probabilités, dans l'ordre de BATEAUX. Un prior pour les stratégies
+            (voir 'charger_occupation').
+        - Tableau (n, n, 5) des demi-largeurs des intervalles de confiance à 95 % (0 pour les bateaux exacts).
+    """
+
+    occupation, nb_exacts = occupation_exacte(n, budget_etats)
+    demi_largeur = np.zeros_like(occupation)
+    if nb_exacts < len(BATEAUX):
+        estimation, demi_largeur_estimation = occupation_echantillons(n, nb_echantillons, rng)
+        occupation[:, :, nb_exacts:] = estimation[:, :, nb_exacts:]
+        demi_largeur[:, :, nb_exacts:] = demi_largeur_estimation[:, :, nb_exacts:]
+    return occupation, demi_largeur
+
+
+def charger_occupation(chemin: str) -> np.ndarray:
+    """Lit le tableau (n, n, 5) écrit par 'python3 occupation.py --sortie <chemin>'.
+
+    Args:
+        chemin: Fichier .npy.
+
+    Returns:
+        Tableau (n, n, 5) des probabilités, dans l'ordre de BATEAUX.
+    """
+
+    return np.load(chemin)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Probabilités d'occupation des cases par chaque bateau (genere_grille).")
+    parser.add_argument("-n", "--taille", type=int, default=10, help="taille de la grille")
+    parser.add_argument("--budget", type=int, default=10**7, help="nombre maximal d'états du calcul exact")
+    parser.add_argument("--echantillons", type=int, default=10**6, help="nombre de grilles si le calcul exact s'arrête")
+    parser.add_argument("--graine", type=int, default=None)
+    parser.add_argument("--sortie", default=None, help="fichier .npy du tableau (n, n, 5)")
+    args = parser.parse_args()
+
+    occupation, demi_largeur = calc_occupation(args.taille, args.budget, args.echantillons,
+                                               np.random.default_rng(args.graine))
+    for b, bateau in enumerate(BATEAUX):
+        exact = "exact" if not demi_largeur[:, :, b].any() else f"± {demi_largeur[:, :, b].max():.2e}"
+        print(f"bateau {bateau} (taille {BAT_CASES[bateau]}) : {exact}")
+        print(np.array2string(occupation[:, :, b], precision=3, suppress_small=True))
+    if args.sortie is not None:
+        np.save(args.sortie, occupation)
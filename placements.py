@@ -0,0 +1,533 @@
+import numpy as np
+from functools import lru_cache
+from typing import Dict
+from constants import BAT_CASES, BATEAUX, BAT_TOUCHE, RATE, HOR, VER
+
+
+class IndexPlacements:
+    """Table de tous les placements d'un bateau de taille donnée dans une grille n x n vide.
+        Les placements sont rangés dans l'ordre du parcours (ligne, colonne, direction) des méthodes de Grille.
+        La case (ligne, col) correspond à l'indice ligne * n + col.
+    """
+
+    def __init__(self, taille: int, n: int):
+        self.taille: int = taille
+        self.n: int = n
+
+        positions = [(ligne, col, dir)
+                     for ligne in range(n)
+                     for col in range(n)
+                     for dir in (HOR, VER)
+                     if (dir == HOR and col + taille <= n) or (dir == VER and ligne + taille <= n)]
+
+        # Tableau (P, 3) des triplets (ligne, col, direction)
+        self.positions: np.ndarray = np.array(positions, dtype=np.int64).reshape(-1, 3)
+
+        # Tableau (P, taille) des indices des cases couvertes par chaque placement
+        lignes, cols, dirs = self.positions[:, 0:1], self.positions[:, 1:2], self.positions[:, 2:3]
+        decalage = np.arange(taille)
+        pas = np.where(dirs == HOR, 1, n)
+        self.cases: np.ndarray = np.ascontiguousarray(lignes * n + cols + decalage * pas)
+
+        # Index inverse case -> placements (format CSR) : les placements qui couvrent la case c sont
+        # placements_case[debut_case[c]:debut_case[c+1]]
+        plates = self.cases.reshape(-1)
+        ordre = np.argsort(plates, kind="stable")
+        self.placements_case: np.ndarray = np.repeat(np.arange(len(self.positions)), taille)[ordre]
+        self.debut_case: np.ndarray = np.concatenate(([0], np.cumsum(np.bincount(plates, minlength=n * n))))
+
+        self._incidence: np.ndarray | None = None
+        self._cases_colonnes: np.ndarray | None = None
+        # Table (n, n, direction) -> indice du placement, construite à la première demande (voir 'indices')
+        self._table: np.ndarray | None = None
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    @property
+    def incidence(self) -> np.ndarray:
+        """Matrice booléenne (P, n*n) : incidence[p][c] = True ssi le placement p couvre la case c.
+            Construite à la première demande (elle est grande pour les grandes grilles).
+        """
+
+        if self._incidence is None:
+            incidence = np.zeros((len(self), self.n * self.n), dtype=bool)
+            incidence[np.arange(len(self))[:, None], self.cases] = True
+            self._incidence = incidence
+        return self._incidence
+
+    @property
+    def cases_colonnes(self) -> np.ndarray:
+        """Tableau (taille, P) contigu : cases_colonnes[j][p] = cases[p][j], la j-ème case du placement p.
+            Construit à la première demande.
+        """
+
+        if self._cases_colonnes is None:
+            self._cases_colonnes = np.ascontiguousarray(self.cases.T)
+        return self._cases_colonnes
+
+    def par_case(self, case: int) -> np.ndarray:
+        """Renvoie les indices des placements qui couvrent la case donnée.
+
+        Args:
+            case: Indice de la case (ligne * n + col).
+
+        Returns:
+            Tableau des indices des placements.
+        """
+
+        return self.placements_case[self.debut_case[case]:self.debut_case[case + 1]]
+
+    def indices(self, positions: np.ndarray) -> np.ndarray:
+        """Renvoie les indices des placements donnés par leurs triplets (ligne, col, direction).
+
+        Args:
+            positions: Tableau (..., 3) des triplets (ligne, col, direction).
+
+        Returns:
+            Tableau (...) des indices des placements dans la table, -1 pour les triplets qui ne sont pas des placements.
+        """
+
+        if self._table is None:
+            table = np.full((self.n, self.n, max(HOR, VER) + 1), -1, dtype=np.int64)
+            table[self.positions[:, 0], self.positions[:, 1], self.positions[:, 2]] = np.arange(len(self))
+            self._table = table
+
+        positions = np.asarray(positions, dtype=np.int64)
+        lignes, cols, dirs = positions[..., 0], positions[..., 1], positions[..., 2]
+        dans_grille = ((lignes >= 0) & (lignes < self.n) & (cols >= 0) & (cols < self.n)
+                       & ((dirs == HOR) | (dirs == VER)))
+        indices = np.full(positions.shape[:-1], -1, dtype=np.int64)
+        indices[dans_grille] = self._table[lignes[dans_grille], cols[dans_grille], dirs[dans_grille]]
+        return indices
+
+    def legaux(self, occupees: np.ndarray) -> np.ndarray:
+        """Calcule les placements qui ne touchent aucune case occupée.
+
+        Args:
+            occupees: Tableau booléen (n*n,) ou (n, n), True pour les cases où on ne peut pas placer le bateau.
+
+        Returns:
+            Tableau booléen (P,), True pour les placements possibles.
+        """
+
+        return ~occupees.reshape(-1)[self.cases].any(axis=1)
+
+    def compte(self, occupees: np.ndarray) -> int:
+        """Calcule le nombre de placements possibles.
+
+        Args:
+            occupees: Tableau booléen (n*n,) ou (n, n) des cases occupées.
+
+        Returns:
+            Le nombre de placements qui ne touchent aucune case occupée.
+        """
+
+        return int(np.count_nonzero(self.legaux(occupees)))
+
+    def grille_comptes(self, occupees: np.ndarray) -> np.ndarray:
+        """Calcule pour chaque case le nombre de placements possibles qui passent par cette case.
+
+        Args:
+            occupees: Tableau booléen (n*n,) ou (n, n) des cases occupées.
+
+        Returns:
+            Tableau (n, n) des nombres de placements.
+        """
+
+        cases = self.cases[self.legaux(occupees)]
+        return np.bincount(cases.reshape(-1), minlength=self.n * self.n).reshape(self.n, self.n)
+
+
+@lru_cache(maxsize=None)
+def index_placements(taille: int, n: int) -> IndexPlacements:
+    """Renvoie la table des placements pour un bateau de taille donnée et une grille n x n.
+        La table est construite une seule fois par couple (taille, n), puis partagée.
+
+    Args:
+        taille: Taille du bateau (BAT_CASES[bateau]).
+        n: Taille d'un côté de la grille.
+
+    Returns:
+        L'instance de IndexPlacements associée.
+    """
+
+    return IndexPlacements(taille, n)
+
+
+class EspaceComptes:
+    """Tableaux de travail de 'comptes_placements' pour des grilles de forme (..., n, n), alloués une seule fois.
+        Les grilles sont recopiées à plat avec une colonne bloquée en plus à droite de chaque ligne (n x (n + 1)) :
+        une fenêtre horizontale qui passerait d'une ligne à la suivante contient cette case et n'est pas comptée.
+        Toutes les fenêtres sont alors des tranches contiguës des tableaux à plat.
+        Les calculs sont en int16 tant que la valeur maximale d'une case (2 * n²) le permet.
+    """
+
+    def __init__(self, forme: tuple[int, ...]):
+        n = forme[-1]
+        lot = forme[:-2]
+        self.dtype: np.dtype = np.dtype(np.int16 if 2 * n**2 < np.iinfo(np.int16).max else np.int64)
+        # Cases bloquées et touchées (booléens), à remplir par l'appelant (voir 'Grille.calc_nb_placements')
+        self.bloquees: np.ndarray = np.empty(forme, dtype=bool)
+        self.touchees: np.ndarray = np.empty(forme, dtype=bool)
+        # Copies (..., n, n + 1) des cases bloquées (la dernière colonne est bloquée) et touchées
+        self.bloquees_larges: np.ndarray = np.empty(lot + (n, n + 1), dtype=self.dtype)
+        self.bloquees_larges[..., n] = 1
+        self.touchees_larges: np.ndarray = np.empty(lot + (n, n + 1), dtype=self.dtype)
+        self.touchees_larges[..., n] = 0
+        # Sommes glissantes et résultat à plat (..., n * (n + 1)), réécrits à chaque appel
+        self.sommes_touchees: np.ndarray = np.empty(lot + (n * (n + 1),), dtype=self.dtype)
+        self.sommes_bloquees: np.ndarray = np.empty(lot + (n * (n + 1),), dtype=self.dtype)
+        self.resultat: np.ndarray = np.empty(lot + (n, n + 1), dtype=self.dtype)
+
+
+def _sommes_glissantes(tab: np.ndarray, taille: int, pas: int, out: np.ndarray) -> np.ndarray:
+    """Calcule, le long du dernier axe, les sommes de 'taille' cases espacées de 'pas' (somme de tranches décalées).
+
+    Args:
+        tab: Tableau d'entiers.
+        taille: Nombre de cases de la fenêtre.
+        pas: Écart entre deux cases consécutives de la fenêtre.
+        out: Tableau d'entiers dans lequel écrire les sommes, sa longueur donne le nombre de fenêtres.
+
+    Returns:
+        out, out[..., i] = somme de tab[..., i + k * pas] pour k < taille.
+    """
+
+    nb_fenetres = out.shape[-1]
+    np.copyto(out, tab[..., :nb_fenetres])
+    for k in range(1, taille):
+        np.add(out, tab[..., k * pas:k * pas + nb_fenetres], out=out)
+    return out
+
+
+def comptes_placements(bloquees: np.ndarray, touchees: np.ndarray, taille: int, out: np.ndarray | None = None,
+                       espace: EspaceComptes | None = None) -> np.ndarray:
+    """Calcule la grille-probabilité d'un bateau (même résultat que la boucle de 'Grille.calc_nb_placements').
+        Chaque placement possible ajoute 1 + (nombre de cases BAT_TOUCHE couvertes) à chacune de ses cases
+        qui n'est pas BAT_TOUCHE. Les placements sont trouvés avec des fenêtres glissantes horizontales et verticales.
+        Les deux dernières dimensions sont celles de la grille, les dimensions précédentes sont traitées en lot.
+        Avec out et espace, aucun tableau n'est alloué.
+
+    Args:
+        bloquees: Tableau booléen (..., n, n), True pour les cases où on ne peut pas placer le bateau.
+        touchees: Tableau booléen (..., n, n), True pour les cases BAT_TOUCHE.
+        taille: Taille du bateau.
+        out: Tableau d'entiers (..., n, n) dans lequel écrire le résultat, son type doit contenir les valeurs
+            (voir 'dtype_grilles_proba'). Default = None (nouveau tableau du type de calcul de l'espace).
+        espace: Tableaux de travail pour cette forme. Default = None (alloués pour cet appel).
+
+    Returns:
+        Tableau d'entiers (..., n, n) des nombres de placements pondérés (out s'il est donné).
+    """
+
+    n = bloquees.shape[-1]
+    if espace is None:
+        espace = EspaceComptes(bloquees.shape)
+    if out is None:
+        out = np.zeros(bloquees.shape, dtype=espace.dtype)
+    if taille > n:
+        out.fill(0)
+        return out
+
+    np.copyto(espace.bloquees_larges[..., :n], bloquees)
+    np.copyto(espace.touchees_larges[..., :n], touchees)
+    forme_plate = espace.sommes_touchees.shape
+    bloquees_plates = espace.bloquees_larges.reshape(forme_plate)
+    touchees_plates = espace.touchees_larges.reshape(forme_plate)
+    resultat = espace.resultat.reshape(forme_plate)
+    resultat.fill(0)
+
+    # Placements horizontaux (cases consécutives) puis verticaux (cases espacées d'une ligne)
+    for pas in (1, n + 1):
+        nb_fenetres = forme_plate[-1] - (taille - 1) * pas
+        poids = _sommes_glissantes(touchees_plates, taille, pas, espace.sommes_touchees[..., :nb_fenetres])
+        libres = _sommes_glissantes(bloquees_plates, taille, pas, espace.sommes_bloquees[..., :nb_fenetres])
+        # poids = (1 + cases touchées) si la fenêtre ne contient aucune case bloquée, 0 sinon
+        np.add(poids, 1, out=poids)
+        np.minimum(libres, 1, out=libres)
+        np.subtract(1, libres, out=libres)
+        np.multiply(poids, libres, out=poids)
+        for k in range(taille):
+            decalee = resultat[..., k * pas:k * pas + nb_fenetres]
+            np.add(decalee, poids, out=decalee)
+
+    # out peut être d'un type non signé (voir 'dtype_grilles_proba') : ses valeurs restent dans ses bornes
+    np.copyto(out, espace.resultat[..., :n], casting="unsafe")
+    # Les cases BAT_TOUCHE ne sont pas comptées
+    np.copyto(out, 0, where=touchees)
+    return out
+
+
+def dtype_grilles_proba(bateaux: list[int], n: int) -> np.dtype:
+    """Renvoie le plus petit type entier qui contient toutes les valeurs des grilles-probabilités des bateaux.
+        Une case est couverte par au plus min(t, n - t + 1) placements par direction et chaque placement
+        ajoute au plus t (1 + ses t - 1 autres cases BAT_TOUCHE) : une case vaut au plus 2 * t * min(t, n - t + 1).
+
+    Args:
+        bateaux: Liste des bateaux.
+        n: Taille de la grille.
+
+    Returns:
+        Le type numpy des grilles-probabilités.
+    """
+
+    borne = max((2 * t * min(t, n - t + 1) for t in map(BAT_CASES.get, bateaux) if t <= n), default=0)
+    return np.min_scalar_type(borne)
+
+
+def dtype_comptes(borne: int) -> type:
+    """Renvoie le type des tableaux de comptes (entiers exacts) dont les valeurs ne dépassent pas borne :
+        entiers numpy si borne tient sur 63 bits, entiers Python (object) sinon.
+
+    Args:
+        borne: Borne supérieure des valeurs (sommes comprises).
+
+    Returns:
+        np.int64 ou object.
+    """
+
+    return np.int64 if borne < 2**63 else object
+
+
+def dtype_configurations(bateaux: list[int], n: int) -> type:
+    """Renvoie le type des comptes de configurations des bateaux ('dtype_comptes'), bornés par le produit
+        des nombres de placements de chaque bateau.
+
+    Args:
+        bateaux: Liste des bateaux.
+        n: Taille de la grille.
+
+    Returns:
+        np.int64 ou object.
+    """
+
+    borne = 1
+    for bat in bateaux:
+        borne *= len(index_placements(BAT_CASES[bat], n))
+    return dtype_comptes(borne)
+
+
+class ProbaSimpleIncrementale:
+    """Grilles-probabilités de la stratégie proba simple, mises à jour de manière incrémentale après chaque tir.
+        Pour chaque bateau on garde les placements encore possibles et le nombre de cases BAT_TOUCHE qu'ils couvrent.
+        Un tir ne modifie que les placements qui passent par la case tirée.
+        Les grilles sont toujours égales à celles que recalculerait 'Grille.calc_nb_placements'.
+        Elles sont écrites dans un espace de travail (len(BATEAUX), n, n), rangées dans l'ordre de BATEAUX,
+        qui peut être réutilisé d'un jeu à l'autre (paramètre grilles). La grille d'un bateau coulé vaut 0.
+        Les tableaux temporaires d'une MAJ sont alloués à la création : un tir n'alloue aucun tableau.
+    """
+
+    def __init__(self, n: int, bateaux: list[int], grilles: np.ndarray | None = None):
+        if grilles is None:
+            grilles = np.zeros((len(BATEAUX), n, n), dtype=dtype_grilles_proba(BATEAUX, n))
+        grilles.fill(0)
+
+        self.n: int = n
+        # Cases BAT_TOUCHE (hors bateaux coulés)
+        self.touchees: np.ndarray = np.zeros(n * n, dtype=bool)
+
+        self.index: Dict[int, IndexPlacements] = dict()
+        self.vivants: Dict[int, np.ndarray] = dict()
+        self.nb_touchees: Dict[int, np.ndarray] = dict()
+        # Dict qui associe au type du bateau sa grille-probabilité (n, n), vue sur l'espace de travail
+        self.espace: np.ndarray = grilles
+        self.grilles: Dict[int, np.ndarray] = dict()
+        # Dict qui associe au type du bateau ses tableaux temporaires, dimensionnés pour les placements d'une case :
+        # (une case de chaque placement, poids des placements)
+        self.tampons: Dict[int, tuple[np.ndarray, ...]] = dict()
+
+        for bateau in bateaux:
+            index = index_placements(BAT_CASES[bateau], n)
+            self.index[bateau] = index
+            # 1 pour les placements encore possibles, 0 sinon (type des grilles, pour servir de poids)
+            self.vivants[bateau] = np.ones(len(index), dtype=grilles.dtype)
+            self.nb_touchees[bateau] = np.zeros(len(index), dtype=grilles.dtype)
+            self.grilles[bateau] = grilles[BATEAUX.index(bateau)]
+            self.grilles[bateau][...] = np.bincount(index.cases.reshape(-1), minlength=n * n).reshape(n, n)
+
+            max_case = int(np.diff(index.debut_case).max(initial=0))
+            self.tampons[bateau] = (np.zeros(max_case, dtype=np.int64), np.zeros(max_case, dtype=grilles.dtype))
+
+    def _maj(self, bateau: int, case: int, type_case: int) -> None:
+        """MAJ de la grille du bateau pour les placements vivants qui couvrent la case.
+            RATE : ces placements sont éliminés et leur contribution est retirée de la grille.
+            BAT_TOUCHE : ces placements gagnent 1 sur leurs autres cases libres.
+            Les calculs sont faits dans les tableaux temporaires du bateau, une case des placements à la fois.
+        """
+
+        index = self.index[bateau]
+        placements = index.par_case(case)
+        k = len(placements)
+        cases, poids = self.tampons[bateau][0][:k], self.tampons[bateau][1][:k]
+
+        if type_case == RATE:
+            # Chaque placement vivant retire 1 + (nombre de cases BAT_TOUCHE couvertes) de ses cases
+            np.take(self.nb_touchees[bateau], placements, out=poids)
+            np.add(poids, 1, out=poids)
+            np.multiply(poids, self.vivants[bateau][placements], out=poids)
+            self.vivants[bateau][placements] = 0
+        else:
+            # Case touchée : les placements vivants gagnent 1 sur leurs cases
+            np.take(self.vivants[bateau], placements, out=poids)
+            self.nb_touchees[bateau][placements] += poids
+
+        # Les j-ièmes cases des placements qui couvrent la case sont distinctes, sauf la case elle-même :
+        # elle ne reste couverte par aucun placement vivant (RATE) ou devient BAT_TOUCHE, elle vaut 0.
+        # Les cases BAT_TOUCHE valent toujours 0 : elles sont remises à 0 après la MAJ.
+        grille = self.grilles[bateau].reshape(-1)
+        for colonne in index.cases_colonnes:
+            np.take(colonne, placements, out=cases)
+            if type_case == RATE:
+                grille[cases] -= poids
+            else:
+                grille[cases] += poids
+        grille[case] = 0
+        np.copyto(grille, 0, where=self.touchees)
+
+    def tir(self, position: tuple[int, int], type_case: int) -> None:
+        """MAJ des grilles après un tir.
+
+        Args:
+            position: (ligne, col) de la case tirée.
+            type_case: Résultat du tir, BAT_TOUCHE ou RATE.
+        """
+
+        ligne, col = position
+        case = ligne * self.n + col
+
+        for bateau in self.index:
+            self._maj(bateau, case, type_case)
+
+        if type_case == BAT_TOUCHE:
+            self.touchees[case] = True
+
+    def coule(self, bateau: int, placement: tuple[int, int, int]) -> None:
+        """MAJ des grilles après que le bateau a été coulé : sa grille est mise à zéro et éliminée,
+            et ses cases deviennent occupées pour les autres bateaux.
+
+        Args:
+            bateau: Type du bateau coulé (constante).
+            placement: Triplet (ligne, col, direction) du bateau coulé.
+        """
+
+        self.grilles[bateau].fill(0)
+        for etat in (self.index, self.vivants, self.nb_touchees, self.grilles, self.tampons):
+            del etat[bateau]
+
+        ligne, col, dir = placement
+        pas = 1 if dir == HOR else self.n
+        debut = ligne * self.n + col
+        fin = debut + pas * BAT_CASES[bateau]
+
+        # Les cases du bateau coulé deviennent occupées : elles éliminent les placements comme des RATE
+        # (un placement qui couvre plusieurs de ces cases est éliminé à la première)
+        for case in range(debut, fin, pas):
+            for bat in self.index:
+                self._maj(bat, case, RATE)
+
+        self.touchees[debut:fin:pas] = False
+
+    def pos_max(self, bateau: int) -> tuple[int, int]:
+        """Renvoie la position (ligne, col) de la case maximale de la grille-probabilité du bateau.
+            (-1, -1) s'il n'existe aucun placement possible.
+        """
+
+        grille = self.grilles[bateau]
+        pos = int(np.argmax(grille))
+        if grille.flat[pos] <= 0:
+            return (-1, -1)
+        return divmod(pos, self.n)
+
+
+def tirer_placements_lot(n: int, bateaux: list[int], nb: int, rng: np.random.Generator,
+                         bloquees: np.ndarray | None = None, nb_essais: int = 8) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Place les bateaux l'un après l'autre sur nb grilles à la fois, comme 'Grille.place_alea' :
+        chaque bateau est placé uniformément parmi ses placements possibles.
+        Tous les tirages d'un bateau sont faits en lot, seules les grilles avec une collision sont tirées à nouveau.
+        Après nb_essais tours de rejet, les grilles restantes tirent directement parmi leurs placements possibles.
+
+    Args:
+        n: Taille de la grille.
+        bateaux: Liste des bateaux à placer, dans l'ordre.
+        nb: Nombre de grilles.
+        rng: Générateur aléatoire de numpy.
+        bloquees: Tableau booléen (n*n,) des cases interdites sur toutes les grilles. Default = None (grille vide).
+        nb_essais: Nombre de tours de rejet avant le tirage direct. Default = 8.
+
+    Returns:
+        - Tableau (nb, len(bateaux)) des indices des placements dans la table de chaque bateau (-1 si impossible).
+        - Tableau booléen (nb, n*n) des cases occupées (bateaux et cases interdites).
+        - Tableau booléen (nb,), False pour les grilles sur lesquelles un bateau n'a pas pu être placé.
+    """
+
+    occupees = np.zeros((nb, n * n), dtype=bool)
+    if bloquees is not None:
+        occupees |= bloquees.reshape(n * n)
+    choisis = np.full((nb, len(bateaux)), -1, dtype=np.int64)
+    valides = np.ones(nb, dtype=bool)
+
+    for b, bateau in enumerate(bateaux):
+        index = index_placements(BAT_CASES[bateau], n)
+        en_attente = np.flatnonzero(valides)
+
+        # Les placements qui touchent une case interdite ne sont jamais tirés
+        candidats = np.arange(len(index)) if bloquees is None else np.flatnonzero(index.legaux(bloquees))
+        if len(candidats) == 0:
+            valides[:] = False
+            break
+
+        for _ in range(nb_essais):
+            if len(en_attente) == 0:
+                break
+            tirages = candidats[rng.integers(0, len(candidats), size=len(en_attente))]
+            collision = occupees[en_attente[:, None], index.cases[tirages]].any(axis=1)
+            places = en_attente[~collision]
+            choisis[places, b] = tirages[~collision]
+            occupees[places[:, None], index.cases[tirages[~collision]]] = True
+            en_attente = en_attente[collision]
+
+        if len(en_attente) == 0:
+            continue
+
+        # Tirage direct parmi les placements possibles pour les grilles restantes
+        possibles = ~occupees[en_attente[:, None, None], index.cases[candidats][None]].any(axis=2)
+        nb_possibles = possibles.sum(axis=1)
+        valides[en_attente[nb_possibles == 0]] = False
+        rangs = (rng.random(len(en_attente)) * nb_possibles).astype(np.int64)
+        tirages = candidats[np.argmax(np.cumsum(possibles, axis=1) > rangs[:, None], axis=1)]
+
+        ok = nb_possibles > 0
+        places, tirages = en_attente[ok], tirages[ok]
+        choisis[places, b] = tirages
+        occupees[places[:, None], index.cases[tirages]] = True
+
+    return choisis, occupees, valides
+
+
+def cles_placements(placements: np.ndarray, n: int) -> np.ndarray:
+    """Calcule la clé canonique de chaque grille à partir des placements de ses bateaux.
+        Chaque bateau est codé par 1 + 2 * (ligne * n + col) + (direction - HOR), 0 s'il n'est pas placé,
+        sur le même nombre de bits ; les codes sont concaténés dans l'ordre de BAT_CASES.
+
+    Args:
+        placements: Tableau (..., nb_bateaux, 3) des triplets (ligne, col, direction), dans l'ordre de BAT_CASES.
+            Un bateau non placé a une ligne égale à -1.
+        n: Taille des grilles.
+
+    Returns:
+        Tableau (...) des clés : uint64 si elles tiennent sur 64 bits, entiers Python (dtype object) sinon.
+    """
+
+    placements = np.asarray(placements, dtype=np.int64)
+    bits = (2 * n * n).bit_length()
+    nb_bateaux = placements.shape[-2]
+    dtype = np.uint64 if bits * nb_bateaux <= 64 else object
+
+    codes = 1 + 2 * (placements[..., 0] * n + placements[..., 1]) + (placements[..., 2] - HOR)
+    codes = np.where(placements[..., 0] < 0, 0, codes).astype(dtype)
+
+    cles = np.zeros(placements.shape[:-2], dtype=dtype)
+    for b in range(nb_bateaux):
+        cles = cles | (codes[..., b] << (dtype(bits * b) if dtype is np.uint64 else bits * b))
+    return cles
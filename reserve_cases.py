@@ -0,0 +1,60 @@
+from alea import Alea, vers_alea
+
+
+class ReserveCases:
+    """Ensemble des cases non encore tirées d'une grille n x n.
+        Les cases sont gardées dans une liste mélangée au départ : tirer une case au hasard revient à prendre
+        la dernière, retirer une case donnée se fait en l'échangeant avec la dernière. Les deux sont en O(1).
+    """
+
+    def __init__(self, n: int, rng: Alea | None = None):
+        self.n: int = n
+        self.alea: Alea = vers_alea(rng)
+        self.remplir()
+
+    def remplir(self) -> None:
+        """Remet toutes les cases dans la réserve (pour réutiliser la réserve dans un nouveau jeu)."""
+
+        self.cases: list[int] = self.alea.permutation(self.n * self.n)
+
+        # indices[c] = position de la case c dans self.cases, -1 si la case a été tirée
+        self.indices: list[int] = [0] * (self.n * self.n)
+        for i, case in enumerate(self.cases):
+            self.indices[case] = i
+
+    def __len__(self) -> int:
+        return len(self.cases)
+
+    def __contains__(self, position: tuple[int, int]) -> bool:
+        """Vérifie que la position est dans la grille et que la case n'a pas encore été tirée."""
+
+        ligne, col = position
+        return 0 <= ligne < self.n and 0 <= col < self.n and self.indices[ligne * self.n + col] >= 0
+
+    def tirer(self) -> tuple[int, int]:
+        """Tire une case au hasard parmi les cases restantes et la retire de la réserve.
+            Hypothèse: la réserve n'est pas vide.
+
+        Returns:
+            La position (ligne, col) de la case tirée.
+        """
+
+        case = self.cases.pop()
+        self.indices[case] = -1
+        return divmod(case, self.n)
+
+    def retirer(self, position: tuple[int, int]) -> None:
+        """Retire la case donnée de la réserve. Hypothèse: la case est dans la réserve.
+
+        Args:
+            position: (ligne, col) de la case.
+        """
+
+        ligne, col = position
+        case = ligne * self.n + col
+        i = self.indices[case]
+        derniere = self.cases.pop()
+        if derniere != case:
+            self.cases[i] = derniere
+            self.indices[derniere] = i
+        self.indices[case] = -1
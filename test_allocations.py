@@ -0,0 +1,40 @@
+import tracemalloc
+import pytest
+from Joueur import Joueur
+
+# Budget d'allocation d'un tour (octets) : quelques objets Python (vues, scalaires numpy), pas de tableau.
+# Une grille booléenne 60 x 60 occupe déjà 3600 octets.
+BUDGET_TOUR = 2048
+N = 60
+NB_TOURS_CHAUFFE = 50
+
+
+@pytest.mark.parametrize("incremental", [False, True])
+def test_proba_simple_sans_allocation_par_tour(incremental: bool):
+    # Boucle de tours de 'Joueur.jouer_proba_simple'
+    tours = Joueur("test", rng=0)._tours_proba_simple(N, incremental)
+    # Premier tour : les tableaux de travail sont alloués
+    next(tours)
+
+    # Seuls le pic maximal et le nombre de tours sont gardés (une liste des pics grandirait à chaque tour)
+    pic_max, nb_tours = 0, 0
+    tracemalloc.start()
+    try:
+        while True:
+            avant = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            if next(tours, None) is None:
+                break
+            pic_max = max(pic_max, tracemalloc.get_traced_memory()[1] - avant)
+            nb_tours += 1
+            # Référence de la mémoire après quelques tours (numpy garde un petit cache de scalaires)
+            if nb_tours == NB_TOURS_CHAUFFE:
+                reference = tracemalloc.get_traced_memory()[0]
+        fin = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+
+    assert nb_tours > 2 * NB_TOURS_CHAUFFE
+    # Aucun tour ne dépasse le budget et la mémoire ne grandit pas au fil des tours
+    assert pic_max <= BUDGET_TOUR
+    assert fin - reference <= BUDGET_TOUR
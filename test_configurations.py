@@ -0,0 +1,30 @@
+import numpy as np
+import pytest
+from grille import Grille
+from constants import *
+
+
+# Sous-flottes dont la méthode brute-force reste rapide, dont deux bateaux de même taille (3)
+FLOTTES = [BATEAUX[:1], BATEAUX[:2], BATEAUX[:3], BATEAUX[2:]]
+
+
+@pytest.mark.parametrize("n", [4, 5, 6])
+@pytest.mark.parametrize("bateaux", FLOTTES)
+def test_calc_nb_configurations_egal_brute_force(n: int, bateaux: list[int]):
+    grille = Grille(n)
+    assert grille.calc_nb_configurations(bateaux) == grille.calc_nb_placements_liste_bateaux(bateaux)
+
+
+@pytest.mark.parametrize("n", [5, 6])
+def test_calc_nb_configurations_grille_occupee(n: int):
+    rng = np.random.default_rng(n)
+    for _ in range(5):
+        # Le porte-avion déjà placé et quelques cases RATE : les bateaux restants sont comptés autour
+        grille = Grille(n, rng)
+        grille.place_alea(BATEAUX[0])
+        vides = np.argwhere(grille.grille == VIDE)
+        for ligne, col in vides[rng.random(len(vides)) < 0.2].tolist():
+            grille.marque_case((ligne, col), RATE)
+
+        bateaux = BATEAUX[2:]
+        assert grille.calc_nb_configurations(bateaux) == grille.calc_nb_placements_liste_bateaux(bateaux)
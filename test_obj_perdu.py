@@ -0,0 +1,31 @@
+import numpy as np
+import pytest
+from ObjPerdu import ObjPerdu
+
+N = 12
+
+
+@pytest.mark.parametrize("init", ["uniform", "center", "bords"])
+@pytest.mark.parametrize("ps", [0.3, 0.8])
+def test_recherche_tas_egale_grille_normalisee(init: str, ps: float):
+    for graine in range(5):
+        jeu = ObjPerdu(N, ps, graine)
+        getattr(jeu, "init_proba_" + init)()
+        somme = jeu.tmp_sum()
+        # Cases visitées par la recherche en tas, dans l'ordre
+        visites = []
+        senseur = jeu.senseur
+        jeu.senseur = lambda position: visites.append(position) or senseur(position)
+        count = jeu.recherche(tas=True)
+        assert count == len(visites)
+
+        # Même suite de cases sur la grille normalisée ('maj_grille_prob') : chaque case visitée est de proba max
+        reference = ObjPerdu(N, ps, graine)
+        getattr(reference, "init_proba_" + init)()
+        for position in visites[:-1]:
+            assert reference.grille_proba[position] == pytest.approx(reference.grille_proba.max(), rel=1e-9)
+            reference.maj_grille_prob(position)
+
+        assert np.allclose(jeu.grille_proba, reference.grille_proba, rtol=1e-9, atol=1e-15)
+        # 'maj_grille_prob' conserve la somme des probabilités
+        assert jeu.tmp_sum() == pytest.approx(somme)
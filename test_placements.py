@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+from grille import Grille
+from constants import *
+
+NB_GRILLES = 20
+
+
+def _nb_placements_reference(grille: Grille, bateau: int) -> np.ndarray:
+    """Grille-probabilité de la boucle d'origine de 'Grille.calc_nb_placements' : chaque placement possible
+        ('peut_placer' en mode proba simple) ajoute 1 + (nombre de cases BAT_TOUCHE couvertes) à ses cases non BAT_TOUCHE.
+    """
+
+    n, taille = grille.n, BAT_CASES[bateau]
+    grille_ps = np.zeros((n, n), dtype=np.int64)
+    for ligne in range(n):
+        for col in range(n):
+            for dir in (HOR, VER):
+                if not grille.peut_placer(bateau, (ligne, col), dir, proba_simple=True):
+                    continue
+                cases = [(ligne, col + k) if dir == HOR else (ligne + k, col) for k in range(taille)]
+                nb_touchees = sum(grille.grille[case] == BAT_TOUCHE for case in cases)
+                for case in cases:
+                    if grille.grille[case] != BAT_TOUCHE:
+                        grille_ps[case] += 1 + nb_touchees
+    return grille_ps
+
+
+def _grille_en_cours(n: int, rng: np.random.Generator) -> Grille:
+    """Grille d'un jeu en cours : quelques bateaux coulés, des cases RATE et BAT_TOUCHE au hasard."""
+
+    grille = Grille(n, rng)
+    grille.place_alea_list([bat for bat in BATEAUX if rng.random() < 0.3])
+    vides = np.argwhere(grille.grille == VIDE)
+    tirs = vides[rng.random(len(vides)) < 0.3]
+    for (ligne, col), valeur in zip(tirs.tolist(), rng.choice([RATE, BAT_TOUCHE], len(tirs), p=[0.7, 0.3])):
+        grille.marque_case((ligne, col), valeur)
+    return grille
+
+
+@pytest.mark.parametrize("n", [5, 7, 10])
+def test_calc_nb_placements_egal_reference(n: int):
+    rng = np.random.default_rng(n)
+    for _ in range(NB_GRILLES):
+        grille = _grille_en_cours(n, rng)
+        for bateau in BATEAUX:
+            grille_ps = np.zeros((n, n), dtype=np.int64)
+            position = grille.calc_nb_placements(bateau, grille_ps)
+            reference = _nb_placements_reference(grille, bateau)
+
+            assert np.array_equal(grille_ps, reference)
+            if reference.max() > 0:
+                assert grille_ps[position] == reference.max()
+            else:
+                assert position == (-1, -1)